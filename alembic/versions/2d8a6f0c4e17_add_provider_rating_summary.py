@@ -0,0 +1,50 @@
+"""Add provider rating summary table
+
+Revision ID: 2d8a6f0c4e17
+Revises: 9e1d3b7a5c42
+Create Date: 2026-10-19 12:47:09.318264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d8a6f0c4e17'
+down_revision: Union[str, Sequence[str], None] = '9e1d3b7a5c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('provider_rating_summary',
+    sa.Column('provider_id', sa.BigInteger(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('stars_sum', sa.Integer(), nullable=False),
+    sa.Column('stars_1', sa.Integer(), nullable=False),
+    sa.Column('stars_2', sa.Integer(), nullable=False),
+    sa.Column('stars_3', sa.Integer(), nullable=False),
+    sa.Column('stars_4', sa.Integer(), nullable=False),
+    sa.Column('stars_5', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['provider_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('provider_id')
+    )
+    # Backfill from existing reviews
+    op.execute("""
+        INSERT INTO provider_rating_summary
+            (provider_id, review_count, stars_sum, stars_1, stars_2, stars_3, stars_4, stars_5, updated_at)
+        SELECT provider_id, COUNT(id), COALESCE(SUM(stars), 0),
+               SUM(stars = 1), SUM(stars = 2), SUM(stars = 3), SUM(stars = 4), SUM(stars = 5),
+               CURRENT_TIMESTAMP
+        FROM reviews
+        GROUP BY provider_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('provider_rating_summary')
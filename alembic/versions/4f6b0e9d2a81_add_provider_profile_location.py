@@ -0,0 +1,28 @@
+"""Add location to provider_profiles
+
+Revision ID: 4f6b0e9d2a81
+Revises: 2d8a6f0c4e17
+Create Date: 2026-10-19 13:21:44.902716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6b0e9d2a81'
+down_revision: Union[str, Sequence[str], None] = '2d8a6f0c4e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('provider_profiles', sa.Column('location', sa.Enum('NORTH', 'SOUTH', 'EAST', 'WEST', 'MID', name='locationenum'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('provider_profiles', 'location')
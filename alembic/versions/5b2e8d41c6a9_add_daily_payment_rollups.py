@@ -0,0 +1,59 @@
+"""Add daily provider earnings and customer spending rollups
+
+Revision ID: 5b2e8d41c6a9
+Revises: a3c91e5d7f20
+Create Date: 2026-10-19 10:02:17.884210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8d41c6a9'
+down_revision: Union[str, Sequence[str], None] = 'a3c91e5d7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('provider_earnings_daily',
+    sa.Column('provider_id', sa.BigInteger(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('payment_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('provider_id', 'day')
+    )
+    op.create_table('customer_spending_daily',
+    sa.Column('customer_id', sa.BigInteger(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('payment_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('customer_id', 'day')
+    )
+    # Backfill from existing completed payments
+    op.execute("""
+        INSERT INTO provider_earnings_daily (provider_id, day, amount, payment_count)
+        SELECT provider_id, DATE(created_at), SUM(amount), COUNT(id)
+        FROM payments
+        WHERE provider_id IS NOT NULL AND status = 'completed'
+        GROUP BY provider_id, DATE(created_at)
+    """)
+    op.execute("""
+        INSERT INTO customer_spending_daily (customer_id, day, amount, payment_count)
+        SELECT customer_id, DATE(created_at), SUM(amount), COUNT(id)
+        FROM payments
+        WHERE status = 'completed'
+        GROUP BY customer_id, DATE(created_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('customer_spending_daily')
+    op.drop_table('provider_earnings_daily')
@@ -0,0 +1,52 @@
+"""Add customer balance ledger and snapshots
+
+Revision ID: 7c4f19a2e8b3
+Revises: 5b2e8d41c6a9
+Create Date: 2026-10-19 11:26:53.417902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4f19a2e8b3'
+down_revision: Union[str, Sequence[str], None] = '5b2e8d41c6a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customer_profiles', sa.Column('ledger_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_table('balance_ledger',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('customer_id', sa.BigInteger(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('entry_type', sa.Enum('recharge', 'payment', 'adjustment', name='balanceentrytype'), nullable=False),
+    sa.Column('amount', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('order_id', sa.BigInteger(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id', 'seq', name='uq_balance_ledger_customer_seq')
+    )
+    op.create_table('balance_snapshots',
+    sa.Column('customer_id', sa.BigInteger(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('balance', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('customer_id', 'seq')
+    )
+    # The opening snapshot (seq 0) is written with each customer's first ledger entry
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('balance_snapshots')
+    op.drop_table('balance_ledger')
+    op.drop_column('customer_profiles', 'ledger_seq')
@@ -0,0 +1,40 @@
+"""Add provider_skills and index provider_profiles.location
+
+Existing profiles are backfilled with `python maintenance.py rebuild-skills`
+(the skills text is parsed in Python).
+
+Revision ID: 8b1e5d7c3f20
+Revises: 6a3c8e1f0b59
+Create Date: 2026-10-19 15:48:12.630914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e5d7c3f20'
+down_revision: Union[str, Sequence[str], None] = '6a3c8e1f0b59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('provider_skills',
+    sa.Column('provider_id', sa.BigInteger(), nullable=False),
+    sa.Column('skill', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('provider_id', 'skill')
+    )
+    op.create_index('ix_provider_skills_skill_provider', 'provider_skills', ['skill', 'provider_id'], unique=False)
+    op.create_index(op.f('ix_provider_profiles_location'), 'provider_profiles', ['location'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_provider_profiles_location'), table_name='provider_profiles')
+    op.drop_index('ix_provider_skills_skill_provider', table_name='provider_skills')
+    op.drop_table('provider_skills')
@@ -0,0 +1,81 @@
+"""Store payment transaction ids as BINARY(16) UUIDs
+
+Existing uuid4 ids keep their value (payment_service finds them by
+created_at in time-range queries). The upgrade refuses to run while any
+transaction id is not a UUID, listing the offending payments, rather than
+dropping those ids.
+
+Revision ID: 9e1d3b7a5c42
+Revises: 7c4f19a2e8b3
+Create Date: 2026-10-19 12:08:35.261447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1d3b7a5c42'
+down_revision: Union[str, Sequence[str], None] = '7c4f19a2e8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$'
+
+
+def _check_convertible() -> None:
+    """Fail before any DDL when a transaction id cannot become BINARY(16)."""
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT id, transaction_id FROM payments"
+            " WHERE transaction_id IS NOT NULL AND transaction_id NOT REGEXP :pattern"
+            " ORDER BY id LIMIT 20"
+        ),
+        {'pattern': UUID_PATTERN},
+    ).all()
+    if rows:
+        listed = ', '.join(f'{row.id}={row.transaction_id!r}' for row in rows)
+        raise RuntimeError(
+            'payments.transaction_id values that are not UUIDs cannot be '
+            f'converted; fix or clear them first (payment id=transaction id, '
+            f'first {len(rows)}): {listed}'
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_convertible()
+    op.add_column('payments', sa.Column('transaction_uid', sa.BINARY(length=16), nullable=True))
+    # Existing uuid4 strings keep their value; _check_convertible ruled out the rest
+    op.execute(
+        sa.text("""
+            UPDATE payments
+            SET transaction_uid = UNHEX(REPLACE(transaction_id, '-', ''))
+            WHERE transaction_id REGEXP :pattern
+        """).bindparams(pattern=UUID_PATTERN)
+    )
+    op.drop_index('transaction_id', table_name='payments')
+    op.drop_column('payments', 'transaction_id')
+    op.alter_column('payments', 'transaction_uid', new_column_name='transaction_id',
+                    existing_type=sa.BINARY(length=16), existing_nullable=True)
+    op.create_unique_constraint('uq_payments_transaction_id', 'payments', ['transaction_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('payments', sa.Column('transaction_str', sa.String(length=255), nullable=True))
+    op.execute("""
+        UPDATE payments
+        SET transaction_str = LOWER(CONCAT_WS('-',
+            SUBSTR(HEX(transaction_id), 1, 8), SUBSTR(HEX(transaction_id), 9, 4),
+            SUBSTR(HEX(transaction_id), 13, 4), SUBSTR(HEX(transaction_id), 17, 4),
+            SUBSTR(HEX(transaction_id), 21, 12)))
+        WHERE transaction_id IS NOT NULL
+    """)
+    op.drop_constraint('uq_payments_transaction_id', 'payments', type_='unique')
+    op.drop_column('payments', 'transaction_id')
+    op.alter_column('payments', 'transaction_str', new_column_name='transaction_id',
+                    existing_type=sa.String(length=255), existing_nullable=True)
+    op.create_unique_constraint('transaction_id', 'payments', ['transaction_id'])
@@ -0,0 +1,45 @@
+"""Add provider earnings summary table
+
+Revision ID: a3c91e5d7f20
+Revises: 354d92b41893, add_service_fields
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5d7f20'
+down_revision: Union[str, Sequence[str], None] = ('354d92b41893', 'add_service_fields')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('provider_earnings_summary',
+    sa.Column('provider_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_earnings', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('paid_order_count', sa.Integer(), nullable=False),
+    sa.Column('last_payment_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['provider_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('provider_id')
+    )
+    # Backfill from existing completed payments
+    op.execute("""
+        INSERT INTO provider_earnings_summary
+            (provider_id, total_earnings, paid_order_count, last_payment_at, updated_at)
+        SELECT provider_id, COALESCE(SUM(amount), 0), COUNT(id), MAX(created_at), CURRENT_TIMESTAMP
+        FROM payments
+        WHERE provider_id IS NOT NULL AND status = 'completed'
+        GROUP BY provider_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('provider_earnings_summary')
@@ -0,0 +1,45 @@
+"""Add security_issue_tags
+
+Existing issues are backfilled with `python maintenance.py
+rebuild-security-tags` (the JSON tags text is parsed in Python). Like
+e2b7c4d9a610, nothing happens where security_issues does not exist yet:
+create_all makes both tables from the models.
+
+Revision ID: a7c5e2f9d318
+Revises: f3a8d2c6b415
+Create Date: 2026-10-19 23:02:41.377590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c5e2f9d318'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d2c6b415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('security_issues') or inspector.has_table('security_issue_tags'):
+        return
+    op.create_table('security_issue_tags',
+    sa.Column('issue_id', sa.BigInteger(), nullable=False),
+    sa.Column('tag', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['issue_id'], ['security_issues.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('issue_id', 'tag')
+    )
+    op.create_index('ix_security_issue_tags_tag_issue', 'security_issue_tags', ['tag', 'issue_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table('security_issue_tags'):
+        return
+    op.drop_index('ix_security_issue_tags_tag_issue', table_name='security_issue_tags')
+    op.drop_table('security_issue_tags')
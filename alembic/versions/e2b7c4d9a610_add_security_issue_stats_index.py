@@ -0,0 +1,43 @@
+"""Add covering index for security issue statistics
+
+security_issues is created by the application (Base.metadata.create_all),
+not by an earlier migration, so the index is only added where the table
+already exists; new tables get it from the model.
+
+Revision ID: e2b7c4d9a610
+Revises: c7e3a1f5d846
+Create Date: 2026-10-19 18:41:07.215864
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4d9a610'
+down_revision: Union[str, Sequence[str], None] = 'c7e3a1f5d846'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_stats_index() -> Union[bool, None]:
+    """None when security_issues does not exist, else whether the index does."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('security_issues'):
+        return None
+    names = {index['name'] for index in inspector.get_indexes('security_issues')}
+    return 'ix_security_issues_stats' in names
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_stats_index() is False:
+        op.create_index('ix_security_issues_stats', 'security_issues', ['issue_type', 'severity', 'status', 'confidence_score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_stats_index():
+        op.drop_index('ix_security_issues_stats', table_name='security_issues')
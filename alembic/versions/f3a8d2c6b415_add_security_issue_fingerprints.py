@@ -0,0 +1,156 @@
+"""Deduplicate security issues by fingerprint
+
+Adds fingerprint, occurrence_count and last_seen to security_issues,
+fingerprints existing rows, collapses rows sharing a fingerprint into the
+oldest one (summing their occurrences), then makes the fingerprint unique.
+Rows are read and rewritten CHUNK at a time so large tables never need
+one huge statement. Duplicates are collapsed under a plain index on
+fingerprint, walking it once in fingerprint order; the index is then
+replaced by the unique one. Like e2b7c4d9a610, nothing happens where the table
+does not exist yet or already has the column (created from the model).
+
+Downgrade drops the columns; collapsed rows are not restored.
+
+Revision ID: f3a8d2c6b415
+Revises: e2b7c4d9a610
+Create Date: 2026-10-19 21:14:52.608113
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d2c6b415'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c4d9a610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK = 1000
+
+issues = sa.table(
+    'security_issues',
+    sa.column('id', sa.BigInteger),
+    sa.column('title', sa.String),
+    sa.column('affected_component', sa.String),
+    sa.column('vulnerability_id', sa.String),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+    sa.column('fingerprint', sa.String),
+    sa.column('occurrence_count', sa.Integer),
+    sa.column('last_seen', sa.DateTime),
+)
+
+
+def fingerprint(vulnerability_id, affected_component, title) -> str:
+    """Frozen copy of app.models.models.security_issue_fingerprint."""
+    component = (affected_component or '').strip().lower()
+    if vulnerability_id and vulnerability_id.strip():
+        parts = ['id', vulnerability_id.strip().upper(), component]
+    else:
+        parts = ['title', ' '.join((title or '').lower().split()), component]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def _columns() -> Union[set, None]:
+    """None when security_issues does not exist, else its column names."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('security_issues'):
+        return None
+    return {column['name'] for column in inspector.get_columns('security_issues')}
+
+
+def _backfill(conn) -> None:
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(issues.c.id, issues.c.vulnerability_id,
+                      issues.c.affected_component, issues.c.title,
+                      issues.c.created_at, issues.c.updated_at)
+            .where(issues.c.id > last_id)
+            .order_by(issues.c.id)
+            .limit(CHUNK)
+        ).all()
+        if not rows:
+            return
+        conn.execute(
+            issues.update()
+            .where(issues.c.id == sa.bindparam('row_id'))
+            .values(fingerprint=sa.bindparam('fp'), last_seen=sa.bindparam('seen')),
+            [
+                {
+                    'row_id': row.id,
+                    'fp': fingerprint(row.vulnerability_id, row.affected_component, row.title),
+                    'seen': row.updated_at or row.created_at,
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def _collapse_duplicates(conn) -> None:
+    """Needs ix_security_issues_fingerprint; each chunk resumes after the last fingerprint."""
+    last_fp = ''
+    while True:
+        groups = conn.execute(
+            sa.select(issues.c.fingerprint, sa.func.min(issues.c.id),
+                      sa.func.sum(issues.c.occurrence_count),
+                      sa.func.max(issues.c.last_seen))
+            .where(issues.c.fingerprint > last_fp)
+            .group_by(issues.c.fingerprint)
+            .having(sa.func.count() > 1)
+            .order_by(issues.c.fingerprint)
+            .limit(CHUNK)
+        ).all()
+        if not groups:
+            return
+        conn.execute(
+            issues.update()
+            .where(issues.c.id == sa.bindparam('keep_id'))
+            .values(occurrence_count=sa.bindparam('occurrences'),
+                    last_seen=sa.bindparam('seen')),
+            [
+                {'keep_id': keep_id, 'occurrences': occurrences, 'seen': last_seen}
+                for _, keep_id, occurrences, last_seen in groups
+            ],
+        )
+        conn.execute(
+            issues.delete()
+            .where(issues.c.fingerprint.in_([group[0] for group in groups]))
+            .where(issues.c.id.not_in([group[1] for group in groups]))
+        )
+        last_fp = groups[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _columns()
+    if columns is None or 'fingerprint' in columns:
+        return
+    op.add_column('security_issues', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+    op.add_column('security_issues', sa.Column('occurrence_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('security_issues', sa.Column('last_seen', sa.DateTime(), nullable=True))
+    conn = op.get_bind()
+    _backfill(conn)
+    op.create_index('ix_security_issues_fingerprint', 'security_issues', ['fingerprint'])
+    _collapse_duplicates(conn)
+    op.alter_column('security_issues', 'fingerprint',
+                    existing_type=sa.String(length=64), nullable=False)
+    op.create_index('uq_security_issues_fingerprint', 'security_issues', ['fingerprint'], unique=True)
+    op.drop_index('ix_security_issues_fingerprint', table_name='security_issues')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = _columns()
+    if columns is None or 'fingerprint' not in columns:
+        return
+    op.drop_index('uq_security_issues_fingerprint', table_name='security_issues')
+    op.drop_column('security_issues', 'last_seen')
+    op.drop_column('security_issues', 'occurrence_count')
+    op.drop_column('security_issues', 'fingerprint')
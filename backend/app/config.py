@@ -27,6 +27,40 @@ class Settings(BaseSettings):
 
         return f"mysql+aiomysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
+    @property
+    def CACHE_INVALIDATION_SYNC(self) -> bool:
+        # Broadcast cache invalidations to other workers through the database
+        return os.getenv("CACHE_INVALIDATION_SYNC", "").lower() in ("1", "true", "yes")
+
+    @property
+    def CACHE_SYNC_INTERVAL_SECONDS(self) -> float:
+        return float(os.getenv("CACHE_SYNC_INTERVAL_SECONDS", "2"))
+
+    @property
+    def PROCESS_POOL_WORKERS(self) -> int:
+        # Processes for CPU-bound work such as bulk password hashing (0 = one per CPU)
+        return int(os.getenv("PROCESS_POOL_WORKERS", "0")) or os.cpu_count() or 1
+
+    @property
+    def BATCH_CLASSIFY_MAX_ISSUES(self) -> int:
+        # Largest batch accepted by /api/security/batch-classify
+        return int(os.getenv("BATCH_CLASSIFY_MAX_ISSUES", "10000"))
+
+    @property
+    def BATCH_CLASSIFY_TIME_BUDGET_SECONDS(self) -> float:
+        # Time one batch-classify request may spend before it is cut off
+        return float(os.getenv("BATCH_CLASSIFY_TIME_BUDGET_SECONDS", "30"))
+
+    @property
+    def SECURITY_STATS_CACHE_SECONDS(self) -> float:
+        # How long /api/security/statistics results are reused (0 = no cache)
+        return float(os.getenv("SECURITY_STATS_CACHE_SECONDS", "10"))
+
+    @property
+    def SECURITY_INGEST_MAX_FINDINGS(self) -> int:
+        # Most findings accepted from one report by /api/security/ingest
+        return int(os.getenv("SECURITY_INGEST_MAX_FINDINGS", "100000"))
+
 
 settings = Settings()
 
@@ -1,14 +1,16 @@
 from fastapi import HTTPException, Request
 from jose import JWTError, jwt
 
+from app.services.token_service import revocations
+
 SECRET_KEY = "your_secret_key"  # Recommended to read from environment variable
 ALGORITHM = "HS256"
 
 
-def get_current_user(request: Request):
+def get_token_payload(request: Request) -> dict:
     """
-    Parse JWT token from Authorization header to get current user ID
-    In actual projects, improve exception handling and user validation
+    Decode the JWT from the Authorization header and reject revoked tokens.
+    The revocation check is an in-memory lookup (no database query).
     """
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
@@ -16,7 +18,20 @@ def get_current_user(request: Request):
     token = auth_header.split(" ")[1]
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-        return user_id
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return payload
+
+
+def get_current_user(request: Request):
+    """
+    Parse JWT token from Authorization header to get current user ID
+    In actual projects, improve exception handling and user validation
+    """
+    payload = get_token_payload(request)
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
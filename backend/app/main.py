@@ -4,9 +4,11 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import engine
+from app.config import AsyncSessionLocal, engine
 from app.models.models import Base
 from app.routes import marketplace_router
+from app.routes.admin.cache import admin_cache_router
+from app.routes.admin.export import admin_export_router
 from app.routes.admin.orders import admin_orders_router
 from app.routes.admin.users import admin_users_router
 from app.routes.auth import auth_router
@@ -16,8 +18,12 @@ from app.routes.notification import notification_router
 from app.routes.profile import profile_router
 from app.routes.provider.earnings import provider_earnings_router
 from app.routes.provider.orders import provider_orders_router
+from app.routes.provider.search import provider_search_router
 from app.routes.review import review_router
 from app.routes.security import security_router
+from app.services.reference_service import refresh_reference_data
+from app.services.token_service import revocation_sync_loop
+from app.utils.process_pool import shutdown_process_pool
 
 app = FastAPI(
     title="FREELANCER MARKETPLACE", description="welcome to FREELANCER MARKETPLACE"
@@ -82,10 +88,13 @@ app.include_router(auth_router)
 app.include_router(orders_router)
 app.include_router(provider_orders_router)
 app.include_router(provider_earnings_router)
+app.include_router(provider_search_router)
 app.include_router(payments_router)
 app.include_router(profile_router)
 app.include_router(admin_orders_router)
 app.include_router(admin_users_router)
+app.include_router(admin_export_router)
+app.include_router(admin_cache_router)
 app.include_router(notification_router)
 app.include_router(review_router)
 app.include_router(security_router)
@@ -145,11 +154,30 @@ async def startup_event():
             print(f"⚠️  数据库初始化警告: {init_error}")
             # Continue anyway - admin account may already exist
 
+        # 加载角色等参考数据  # Load reference data (roles) once per worker
+        async with AsyncSessionLocal() as session:
+            await refresh_reference_data(session)
+
     except Exception as e:
         print(f"❌ 数据库启动错误: {e}")
         # Don't raise - allow app to start even if DB connection fails temporarily
         # AWS App Runner needs the app to respond to health checks
 
+    # 后台同步已撤销的令牌（持有引用以免任务被回收）
+    # Pull token revocations from other workers (keep a reference to the task)
+    app.state.revocation_sync = asyncio.create_task(
+        revocation_sync_loop(AsyncSessionLocal)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks started on startup."""
+    task = getattr(app.state, "revocation_sync", None)
+    if task is not None:
+        task.cancel()
+    shutdown_process_pool()
+
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,25 +1,56 @@
 # backend/app/models/models.py
 import enum
+import hashlib
+import json
+import uuid
 from datetime import datetime
 
 import bcrypt
 from sqlalchemy import (
+    BINARY,
     DECIMAL,
     TIMESTAMP,
     BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+# SQLite 只对 INTEGER PRIMARY KEY 自增（测试数据库使用 SQLite）
+# SQLite only autoincrements INTEGER PRIMARY KEY columns (the test database is SQLite)
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+
+
+class UUIDBinary(TypeDecorator):
+    """UUID stored as BINARY(16), read and written as the canonical string"""
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
+
 
 class ServiceType(enum.Enum):
     cleaning_repair = "cleaning_repair"
@@ -56,7 +87,7 @@ class Role(Base):
 
 class User(Base):
     __tablename__ = "users"
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigIntegerPK, primary_key=True)
     username = Column(String(100), unique=True, nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
@@ -89,6 +120,8 @@ class CustomerProfile(Base):
     address = Column(String(255))
     budget_preference = Column(DECIMAL(10, 2))
     balance = Column(DECIMAL(10, 2), default=0)  # 账户余额  # Account balance
+    # 余额流水序号，每次变动加一  # Balance ledger sequence, bumped on every change
+    ledger_seq = Column(BigInteger, nullable=False, default=0)
 
     user = relationship("User", back_populates="customer_profile")
 
@@ -100,10 +133,24 @@ class ProviderProfile(Base):
     experience_years = Column(Integer)
     hourly_rate = Column(DECIMAL(10, 2))
     availability = Column(String(100))
+    # 服务区域（可选）  # Service area (optional)
+    location = Column(Enum(LocationEnum), nullable=True, index=True)
 
     user = relationship("User", back_populates="provider_profile")
 
 
+class ProviderSkill(Base):
+    """Normalized provider skills, one row per (provider, skill)"""
+
+    __tablename__ = "provider_skills"
+    __table_args__ = (
+        # 按技能查服务商  # Providers by skill, in id order for keyset paging
+        Index("ix_provider_skills_skill_provider", "skill", "provider_id"),
+    )
+    provider_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    skill = Column(String(100), primary_key=True)
+
+
 class PaymentStatus(enum.Enum):
     unpaid = "unpaid"
     paid = "paid"
@@ -144,7 +191,7 @@ class PaymentStatusEnum(enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     order_id = Column(BigInteger, ForeignKey("orders.id"), nullable=False, unique=True)
     customer_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     provider_id = Column(BigInteger, ForeignKey("users.id"))
@@ -153,14 +200,129 @@ class Payment(Base):
         Enum(PaymentMethodEnum), default=PaymentMethodEnum.simulated
     )
     status = Column(Enum(PaymentStatusEnum), default=PaymentStatusEnum.pending)
-    transaction_id = Column(String(255), unique=True)
+    # UUIDv7：按时间递增，索引尾部追加  # Time-ordered UUIDv7, appended at the index edge
+    transaction_id = Column(UUIDBinary, unique=True)
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
 
 
+class BalanceEntryType(enum.Enum):
+    recharge = "recharge"
+    payment = "payment"
+    adjustment = "adjustment"
+
+
+class BalanceLedgerEntry(Base):
+    """Append-only record of every customer balance change"""
+
+    __tablename__ = "balance_ledger"
+    __table_args__ = (
+        UniqueConstraint("customer_id", "seq", name="uq_balance_ledger_customer_seq"),
+    )
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    customer_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    seq = Column(BigInteger, nullable=False)  # 客户内序号  # Per-customer sequence
+    entry_type = Column(Enum(BalanceEntryType), nullable=False)
+    amount = Column(DECIMAL(12, 2), nullable=False)  # 带符号变动  # Signed delta
+    order_id = Column(BigInteger, ForeignKey("orders.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BalanceSnapshot(Base):
+    """Customer balance right after ledger entry ``seq``, written periodically"""
+
+    __tablename__ = "balance_snapshots"
+    customer_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    seq = Column(BigInteger, primary_key=True)
+    balance = Column(DECIMAL(12, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ProviderEarningsSummary(Base):
+    """Running earnings totals per provider, maintained by pay_order"""
+
+    __tablename__ = "provider_earnings_summary"
+    provider_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    total_earnings = Column(DECIMAL(12, 2), nullable=False, default=0)
+    paid_order_count = Column(Integer, nullable=False, default=0)
+    last_payment_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ProviderRatingSummary(Base):
+    """Review count, star sum and 1-5 star histogram per provider"""
+
+    __tablename__ = "provider_rating_summary"
+    provider_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    stars_sum = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CacheInvalidation(Base):
+    """Cross-worker cache invalidation signal, polled by every worker"""
+
+    __tablename__ = "cache_invalidations"
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    cache_name = Column(String(64), nullable=False)
+    cache_key = Column(String(255), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class RevokedToken(Base):
+    """Revoked access tokens by jti, kept until the token would have expired"""
+
+    __tablename__ = "revoked_tokens"
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    jti = Column(String(36), unique=True, nullable=False)
+    user_id = Column(BigInteger, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class RefreshToken(Base):
+    """Rotating refresh tokens, stored as SHA-256 hashes; one family per login"""
+
+    __tablename__ = "refresh_tokens"
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    family_id = Column(String(36), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 已换新（再次出现即为重放）  # Set on rotation; seeing it again means reuse
+    used_at = Column(DateTime)
+    revoked_at = Column(DateTime)
+
+
+class ProviderEarningsDaily(Base):
+    """Per-provider daily earnings rollup, maintained by pay_order"""
+
+    __tablename__ = "provider_earnings_daily"
+    provider_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
+class CustomerSpendingDaily(Base):
+    """Per-customer daily spending rollup, maintained by pay_order"""
+
+    __tablename__ = "customer_spending_daily"
+    customer_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
 class Review(Base):
     __tablename__ = "reviews"
-    id = Column(BigInteger, primary_key=True)  # 评价ID  # Review ID
+    id = Column(BigIntegerPK, primary_key=True)  # 评价ID  # Review ID
     order_id = Column(
         BigInteger, ForeignKey("orders.id"), nullable=False, unique=True
     )  # 订单ID (唯一)  # Order ID (unique)
@@ -186,7 +348,7 @@ class Review(Base):
 
 class CustomerInbox(Base):
     __tablename__ = "customer_inbox"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     customer_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     order_id = Column(BigInteger, ForeignKey("orders.id"), nullable=True)
     message = Column(Text, nullable=False)
@@ -196,7 +358,7 @@ class CustomerInbox(Base):
 
 class ProviderInbox(Base):
     __tablename__ = "provider_inbox"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     provider_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     order_id = Column(BigInteger, ForeignKey("orders.id"), nullable=True)
     message = Column(Text, nullable=False)
@@ -232,12 +394,50 @@ class SecurityIssueStatus(enum.Enum):
     DISMISSED = "DISMISSED"
 
 
+def security_issue_fingerprint(
+    vulnerability_id: str, affected_component: str, title: str
+) -> str:
+    """
+    Identity of a security issue for deduplication: the vulnerability id and
+    the component it affects, or the title and component when there is no
+    id. Case and surrounding whitespace do not matter.
+    """
+    component = (affected_component or "").strip().lower()
+    if vulnerability_id and vulnerability_id.strip():
+        parts = ["id", vulnerability_id.strip().upper(), component]
+    else:
+        parts = ["title", " ".join((title or "").lower().split()), component]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def _default_fingerprint(context) -> str:
+    params = context.get_current_parameters()
+    return security_issue_fingerprint(
+        params.get("vulnerability_id"),
+        params.get("affected_component"),
+        params.get("title"),
+    )
+
+
 class SecurityIssue(Base):
     """Security issue tracking and classification"""
 
     __tablename__ = "security_issues"
+    __table_args__ = (
+        # 同一漏洞同一组件只保留一行  # One row per vulnerability and component
+        Index("uq_security_issues_fingerprint", "fingerprint", unique=True),
+        # 统计接口只读索引即可完成分组聚合
+        # Covering index: /security/statistics groups from the index alone
+        Index(
+            "ix_security_issues_stats",
+            "issue_type",
+            "severity",
+            "status",
+            "confidence_score",
+        ),
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=False)
 
@@ -259,6 +459,11 @@ class SecurityIssue(Base):
     remediation_priority = Column(Integer)
     estimated_effort = Column(String(50))
 
+    # Deduplication: repeated reports bump occurrence_count and last_seen
+    fingerprint = Column(String(64), nullable=False, default=_default_fingerprint)
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen = Column(DateTime, default=datetime.utcnow)
+
     # Tracking
     status = Column(Enum(SecurityIssueStatus), default=SecurityIssueStatus.OPEN)
     reported_by = Column(BigInteger, ForeignKey("users.id"), nullable=False)
@@ -272,3 +477,19 @@ class SecurityIssue(Base):
     # Relationships
     reporter = relationship("User", foreign_keys=[reported_by])
     assignee = relationship("User", foreign_keys=[assigned_to])
+
+
+class SecurityIssueTag(Base):
+    """Normalized security issue tags, one row per (issue, tag)"""
+
+    __tablename__ = "security_issue_tags"
+    __table_args__ = (
+        # 按标签查问题、按标签计数  # Issues by tag and tag counts from the index
+        Index("ix_security_issue_tags_tag_issue", "tag", "issue_id"),
+    )
+    issue_id = Column(
+        BigInteger,
+        ForeignKey("security_issues.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tag = Column(String(50), primary_key=True)
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_db
+from app.dependencies import get_current_user
+from app.services.cache_service import sync_status
+from app.services.profile_service import get_user_role
+from app.services.reference_service import refresh_reference_data
+from app.utils.cache import cache_stats
+
+admin_cache_router = APIRouter(prefix="/admin/cache", tags=["admin-cache"])
+
+
+async def _require_admin(db: AsyncSession, user_id: int) -> None:
+    if await get_user_role(db, user_id) != "admin":
+        raise HTTPException(status_code=403, detail="仅限管理员  // Admins only")
+
+
+@admin_cache_router.get("/stats")
+async def cache_stats_route(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    查看进程内缓存的命中统计
+    Hit/miss/eviction counters of this worker's in-process caches.
+    """
+    await _require_admin(db, current_user_id)
+    return {"caches": cache_stats(), "sync": sync_status()}
+
+
+@admin_cache_router.post("/reference/refresh")
+async def refresh_reference_route(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    重新加载角色等参考数据（修改 roles 表后调用）
+    Reload reference data (roles) in this worker after editing the roles table.
+    """
+    await _require_admin(db, current_user_id)
+    roles = await refresh_reference_data(db)
+    return {"roles": {str(role_id): name for role_id, name in roles.items()}}
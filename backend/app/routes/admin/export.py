@@ -0,0 +1,92 @@
+import enum
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_db
+from app.dependencies import get_current_user
+from app.services.export_service import build_export_query, stream_export
+from app.services.profile_service import get_user_role
+
+
+class ExportEntity(str, enum.Enum):
+    orders = "orders"
+    payments = "payments"
+    reviews = "reviews"
+
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+admin_export_router = APIRouter(prefix="/admin/export", tags=["admin-export"])
+
+
+@admin_export_router.get("/{entity}")
+async def export_route(
+    entity: ExportEntity,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+    format: ExportFormat = Query(default=ExportFormat.csv, description="csv or ndjson"),
+    gzip: bool = Query(default=False, description="Gzip-compress the export"),
+    status_filter: Optional[str] = Query(
+        default=None, alias="status", description="Order/payment status filter"
+    ),
+    customer_id: Optional[int] = Query(default=None),
+    provider_id: Optional[int] = Query(default=None),
+    created_from: Optional[datetime] = Query(
+        default=None, description="Created at or after (inclusive)"
+    ),
+    created_to: Optional[datetime] = Query(
+        default=None, description="Created before (exclusive)"
+    ),
+):
+    """
+    流式导出订单/支付/评价
+    Stream all matching rows as CSV or NDJSON, optionally gzip-compressed.
+    """
+    if await get_user_role(db, current_user_id) != "admin":
+        raise HTTPException(status_code=403, detail="仅限管理员  // Admins only")
+    filters = dict(
+        status=status_filter,
+        customer_id=customer_id,
+        provider_id=provider_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    # 在开始流式响应前校验过滤条件  # Validate filters before the stream starts
+    try:
+        build_export_query(entity.value, **filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"error": "Validation failed.", "details": str(e)},
+        )
+
+    async def body():
+        try:
+            async for chunk in stream_export(
+                db, entity.value, fmt=format.value, gzip=gzip, **filters
+            ):
+                yield chunk
+        finally:
+            # 释放流式游标占用的连接  # Release the connection held by the cursor
+            await db.close()
+
+    filename = f"{entity.value}.{format.value}"
+    media_type = MEDIA_TYPES[format.value]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
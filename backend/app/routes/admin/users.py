@@ -1,17 +1,22 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_db
 from app.dependencies import get_current_user
 from app.models.models import Role, User
+from app.schemas.schemas import ProviderRatingResponse
 from app.services.admin_service import (
     delete_user_by_id,
     get_user_by_id,
     list_users_by_role,
 )
+from app.services.profile_service import get_user_role
+from app.services.provisioning_service import parse_ndjson, provision_users
+from app.services.reference_service import get_role_id, get_role_name
+from app.services.review_service import get_provider_ratings
 
 
 class UserItem(BaseModel):
@@ -19,8 +24,11 @@ class UserItem(BaseModel):
     username: str
     email: str
     role_id: int
+    role: Optional[str] = None
     created_at: str
     updated_at: str
+    # 服务商评分（仅服务商）  # Provider rating, providers only
+    rating: Optional[ProviderRatingResponse] = None
 
     class Config:
         from_attributes = True
@@ -31,6 +39,21 @@ class UsersResponse(BaseModel):
     total: int
 
 
+class BulkUserResult(BaseModel):
+    line: int
+    status: str  # created / duplicate / invalid
+    email: Optional[str] = None
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkUsersResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[BulkUserResult]
+
+
 admin_users_router = APIRouter(prefix="/admin/users", tags=["admin-users"])
 
 
@@ -62,6 +85,9 @@ admin_users_router = APIRouter(prefix="/admin/users", tags=["admin-users"])
 )
 async def list_users_route(
     role_id: Optional[int] = Query(default=None, description="1=customer, 2=provider"),
+    role: Optional[str] = Query(
+        default=None, description="Role name: customer, provider or admin"
+    ),
     page: int = Query(default=1, ge=1, description="Page number"),
     limit: int = Query(default=20, ge=1, le=100, description="Items per page"),
     sort_by: Optional[str] = Query(default="created_at", description="Sort by field"),
@@ -71,7 +97,18 @@ async def list_users_route(
 ):
     try:
         users = await list_users_by_role(
-            db, role_id, page=page, limit=limit, sort_by=sort_by, order=order
+            db,
+            role_id,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            role_name=role,
+        )
+        provider_role_id = await get_role_id(db, "provider")
+        # 一次查询带出本页所有服务商评分  # One read for every provider on the page
+        ratings = await get_provider_ratings(
+            db, [u.id for u in users if u.role_id == provider_role_id]
         )
         items = [
             UserItem(
@@ -79,8 +116,10 @@ async def list_users_route(
                 username=u.username,
                 email=u.email,
                 role_id=u.role_id,
+                role=await get_role_name(db, u.role_id),
                 created_at=str(u.created_at),
                 updated_at=str(u.updated_at),
+                rating=ratings.get(u.id),
             )
             for u in users
         ]
@@ -99,6 +138,38 @@ async def list_users_route(
         )
 
 
+@admin_users_router.post("/bulk", response_model=BulkUsersResponse)
+async def bulk_create_users_route(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    批量创建用户：请求体为 NDJSON，每行一个 {username, email, password, role_id}
+    Bulk-create users from an NDJSON body, one account per line, with a
+    per-line result (created / duplicate / invalid).
+    """
+    if await get_user_role(db, current_user_id) != "admin":
+        raise HTTPException(status_code=403, detail="仅限管理员  // Admins only")
+    try:
+        body = (await request.body()).decode("utf-8")
+        entries = parse_ndjson(body)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 NDJSON")
+    except ValueError as ve:
+        raise HTTPException(status_code=413, detail=str(ve))
+    results = await provision_users(db, entries)
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return BulkUsersResponse(
+        created=counts["created"],
+        duplicates=counts["duplicate"],
+        invalid=counts["invalid"],
+        results=results,
+    )
+
+
 # New route to view a specific user
 @admin_users_router.get("/{id}", response_model=UserItem)
 async def get_user_route(
@@ -115,6 +186,7 @@ async def get_user_route(
             username=user.username,
             email=user.email,
             role_id=user.role_id,
+            role=await get_role_name(db, user.role_id),
             created_at=str(user.created_at),
             updated_at=str(user.updated_at),
         )
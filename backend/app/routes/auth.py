@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import delete
@@ -5,15 +7,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.config import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_token_payload
 from app.models.models import Order, User
 from app.services.auth_service import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
     authenticate_user,
     create_access_token,
     create_access_token_with_role,
     logout_user,
     register_user,
 )
+from app.services.token_service import (
+    RefreshTokenError,
+    issue_refresh_token,
+    rotate_refresh_token,
+)
 
 
 class RegisterRequest(BaseModel):
@@ -37,6 +45,17 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # 访问令牌有效秒数  # Access token lifetime in seconds
+    expires_in: int = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class UserMeResponse(BaseModel):
@@ -63,7 +82,26 @@ async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token_with_role(user.id, user.role_id)
-    return TokenResponse(access_token=token)
+    # 每次登录开启一个刷新令牌家族  # Each login starts a refresh token family
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    return TokenResponse(access_token=token, refresh_token=refresh_token)
+
+
+@auth_router.post("/refresh", response_model=TokenResponse)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """
+    用刷新令牌换取新的访问令牌与刷新令牌（旧刷新令牌作废）
+    Exchange a refresh token for a new access/refresh pair; the old one is spent.
+    """
+    try:
+        user_id, role_id, refresh_token = await rotate_refresh_token(
+            db, data.refresh_token
+        )
+    except RefreshTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    token = create_access_token_with_role(user_id, role_id)
+    return TokenResponse(access_token=token, refresh_token=refresh_token)
 
 
 @auth_router.get("/me", response_model=UserMeResponse)
@@ -81,5 +119,13 @@ async def get_me(
 
 
 @auth_router.post("/logout")
-async def logout():
-    return await logout_user()
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    db: AsyncSession = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """
+    注销：服务端撤销当前令牌及其刷新令牌
+    Revoke the current access token and, when given, its refresh token family.
+    """
+    return await logout_user(db, payload, data.refresh_token if data else None)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import get_db
 from app.dependencies import get_current_user  # 导入依赖 # Import dependency
 from app.models.models import LocationEnum, OrderStatus, ServiceType
+from app.schemas.schemas import ProviderRatingResponse
 from app.services.customer_service import (
     cancel_order,
     get_my_orders,
@@ -16,6 +17,7 @@ from app.services.customer_service import (
     publish_order,
     review_order,
 )
+from app.services.review_service import get_provider_ratings
 
 
 class PublishOrderRequest(BaseModel):
@@ -62,6 +64,28 @@ class OrderSummary(BaseModel):
     price: float
     location: str
     created_at: str
+    provider_id: Optional[int] = None
+    provider_rating: Optional[ProviderRatingResponse] = None
+
+
+async def _order_summaries(db: AsyncSession, orders) -> List[OrderSummary]:
+    # 一次查询带出所有服务商评分  # Embed provider ratings with a single read
+    ratings = await get_provider_ratings(db, [o.provider_id for o in orders])
+    return [
+        OrderSummary(
+            id=o.id,
+            title=o.title,
+            service_type=o.service_type.value,
+            status=o.status.value,
+            payment_status=o.payment_status.value,
+            price=float(o.price),
+            location=o.location.value,
+            created_at=str(o.created_at),
+            provider_id=o.provider_id,
+            provider_rating=ratings.get(o.provider_id),
+        )
+        for o in orders
+    ]
 
 
 class OrderDetail(BaseModel):
@@ -152,19 +176,7 @@ async def list_my_orders(
     db: AsyncSession = Depends(get_db), current_user_id: int = Depends(get_current_user)
 ):
     orders = await get_my_orders(db, current_user_id)
-    return [
-        OrderSummary(
-            id=o.id,
-            title=o.title,
-            service_type=o.service_type.value,
-            status=o.status.value,
-            payment_status=o.payment_status.value,
-            price=float(o.price),
-            location=o.location.value,
-            created_at=str(o.created_at),
-        )
-        for o in orders
-    ]
+    return await _order_summaries(db, orders)
 
 
 @orders_router.get("/my/{order_id}", response_model=OrderDetail)
@@ -184,19 +196,7 @@ async def list_order_history(
     db: AsyncSession = Depends(get_db), current_user_id: int = Depends(get_current_user)
 ):
     orders = await get_order_history(db, current_user_id)
-    return [
-        OrderSummary(
-            id=o.id,
-            title=o.title,
-            service_type=o.service_type.value,
-            status=o.status.value,
-            payment_status=o.payment_status.value,
-            price=float(o.price),
-            location=o.location.value,
-            created_at=str(o.created_at),
-        )
-        for o in orders
-    ]
+    return await _order_summaries(db, orders)
 
 
 @orders_router.post("/review", response_model=ReviewOrderResponse)
@@ -1,16 +1,16 @@
-import decimal
 import uuid
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.config import get_db
 from app.dependencies import get_current_user
 from app.models.models import (  # 导入所需模型 # Import necessary models
-    CustomerProfile,
     Order,
     OrderStatus,
     Payment,
@@ -18,10 +18,25 @@ from app.models.models import (  # 导入所需模型 # Import necessary models
     PaymentStatus,
     PaymentStatusEnum,
 )
+from app.schemas.schemas import SeriesResponse
+from app.services.balance_service import (
+    credit_balance,
+    debit_balance,
+    get_balance_history,
+)
+from app.services.earnings_service import get_customer_spending_series, record_payments
 from app.services.notification_service import (
     send_customer_notification,
     send_provider_notification,
 )
+from app.services.payment_service import (
+    MAX_BATCH_ORDERS,
+    MAX_TRANSACTION_PAGE,
+    get_payment_by_transaction,
+    list_payments_between,
+    settle_orders,
+)
+from app.utils.ids import uuid7
 
 payments_router = APIRouter(prefix="/customer/payments", tags=["payments"])
 
@@ -50,20 +65,16 @@ async def recharge_balance(
             status_code=400,
             detail="充值金额必须大于0  // Recharge amount must be greater than 0",
         )
-    result = await db.execute(
-        select(CustomerProfile).where(CustomerProfile.id == current_user_id)
-    )
-    profile = result.scalars().first()
-    if not profile:
+    # 原子加款并记入流水  # Atomic increment plus ledger entry
+    balance = await credit_balance(db, current_user_id, data.amount)
+    if balance is None:
         raise HTTPException(
             status_code=404, detail="未找到客户资料  // Customer profile not found"
         )
-    profile.balance += decimal.Decimal(str(data.amount))  # 修正类型，避免类型错误
     await db.commit()
-    await db.refresh(profile)
     return RechargeResponse(
-        balance=float(profile.balance),
-        message=f"充值成功，当前余额为 {profile.balance}  // Recharge successful, current balance is {profile.balance}",
+        balance=float(balance),
+        message=f"充值成功，当前余额为 {balance}  // Recharge successful, current balance is {balance}",
     )
 
 
@@ -104,7 +115,7 @@ async def pay_order(
         raise HTTPException(status_code=400, detail="订单已支付")
 
     # 生成交易ID
-    transaction_id = str(uuid.uuid4())
+    transaction_id = str(uuid7())
 
     # 创建支付记录
     payment = Payment(
@@ -118,10 +129,34 @@ async def pay_order(
         created_at=datetime.now(UTC),
         updated_at=datetime.now(UTC),
     )
-    db.add(payment)
+    # 先插入，payments.order_id 唯一约束拒绝并发重复支付
+    # Insert first: the unique payments.order_id rejects a concurrent double payment
+    try:
+        async with db.begin_nested():
+            db.add(payment)
+            await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="订单已支付")
+
+    # 从余额扣款，余额不足时不落任何数据  # Guarded debit; nothing is written when funds are short
+    try:
+        balance = await debit_balance(
+            db, current_user_id, order.price, order_id=order.id
+        )
+    except ValueError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="余额不足  // Insufficient balance")
+    if balance is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=404, detail="未找到客户资料  // Customer profile not found"
+        )
 
     # 更新订单支付状态
     order.payment_status = PaymentStatus.paid
+    # 同一事务内更新服务商收入汇总  # Update provider earnings in the same transaction
+    await record_payments(db, [payment])
     await db.commit()
     await db.refresh(payment)
     await db.refresh(order)
@@ -138,3 +173,150 @@ async def pay_order(
     return PayOrderResponse(
         order_id=order.id, transaction_id=transaction_id, message="支付成功"
     )
+
+
+class BatchPayRequest(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_ORDERS)
+
+
+class BatchPayResult(BaseModel):
+    order_id: int
+    success: bool
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchPayResponse(BaseModel):
+    paid_count: int
+    total_amount: float
+    balance: Optional[float] = None
+    results: List[BatchPayResult]
+
+
+@payments_router.post("/pay-batch", response_model=BatchPayResponse)
+async def pay_orders_batch(
+    data: BatchPayRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    客户批量支付已完成订单（单事务）
+    Customer pays many completed orders in one transaction; results are per order
+    """
+    try:
+        return await settle_orders(db, current_user_id, data.order_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class TransactionResponse(BaseModel):
+    transaction_id: str
+    order_id: int
+    provider_id: Optional[int] = None
+    amount: float
+    status: str
+    created_at: Optional[datetime] = None
+
+
+def _transaction_response(payment: Payment) -> TransactionResponse:
+    return TransactionResponse(
+        transaction_id=payment.transaction_id,
+        order_id=payment.order_id,
+        provider_id=payment.provider_id,
+        amount=float(payment.amount),
+        status=payment.status.value if payment.status else "",
+        created_at=payment.created_at,
+    )
+
+
+@payments_router.get("/transactions", response_model=List[TransactionResponse])
+async def list_transactions(
+    start: datetime,
+    end: datetime,
+    limit: int = Query(default=100, ge=1, le=MAX_TRANSACTION_PAGE),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    按时间区间查询客户交易 [start, end)
+    Customer transactions created in [start, end), oldest first
+    """
+    try:
+        payments = await list_payments_between(db, current_user_id, start, end, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [_transaction_response(p) for p in payments]
+
+
+@payments_router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
+async def get_transaction(
+    transaction_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+):
+    """
+    按交易号查询支付记录
+    Look up one of the customer's payments by transaction id
+    """
+    payment = await get_payment_by_transaction(db, current_user_id, str(transaction_id))
+    if not payment:
+        raise HTTPException(status_code=404, detail="交易不存在  // Transaction not found")
+    return _transaction_response(payment)
+
+
+class LedgerEntryResponse(BaseModel):
+    seq: int
+    entry_type: str
+    amount: float
+    balance_after: float
+    order_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
+@payments_router.get("/ledger", response_model=List[LedgerEntryResponse])
+async def get_ledger(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+    limit: int = Query(default=50, ge=1, le=500),
+    before_seq: Optional[int] = Query(
+        default=None, description="Return entries older than this sequence number"
+    ),
+):
+    """
+    客户余额流水（新到旧）
+    Customer balance ledger, newest first, with the balance after each entry
+    """
+    return await get_balance_history(db, current_user_id, limit, before_seq)
+
+
+@payments_router.get("/series", response_model=SeriesResponse)
+async def get_spending_series(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+    start: Optional[date] = Query(
+        default=None, description="First day (inclusive), defaults to end - 29 days"
+    ),
+    end: Optional[date] = Query(
+        default=None, description="Last day (inclusive), defaults to today (UTC)"
+    ),
+    granularity: str = Query(default="day", pattern="^(day|week|month)$"),
+):
+    """
+    客户按日/周/月统计支出
+    Customer spending bucketed by day, week or month
+    """
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=29)
+    try:
+        buckets = await get_customer_spending_series(
+            db, current_user_id, start, end, granularity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SeriesResponse(
+        granularity=granularity,
+        start=start,
+        end=end,
+        total_amount=round(sum(b["amount"] for b in buckets), 2),
+        buckets=buckets,
+    )
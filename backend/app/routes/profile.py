@@ -4,17 +4,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
 from app.config import get_db
 from app.dependencies import get_current_user
+from app.services.balance_service import adjust_balance
 from app.services.profile_service import (
     get_admin_profile,
     get_customer_profile,
     get_provider_profile,
+    get_user_role,
+    invalidate_profile,
     update_customer_profile,
     update_provider_profile,
 )
+from app.services.provider_search_service import set_provider_skills
 
 profile_router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -27,15 +30,9 @@ async def get_my_profile(
     获取当前用户个人信息
     Get current user profile info
     """
-    from app.models.models import User
-
-    result = await db.execute(
-        select(User).options(selectinload(User.role)).where(User.id == current_user_id)
-    )
-    user = result.scalars().first()
-    if not user or not user.role:
+    role_name = await get_user_role(db, current_user_id)
+    if not role_name:
         raise HTTPException(status_code=404, detail="用户不存在  // User not found")
-    role_name = user.role.role_name
     # 根据角色返回不同信息  # Return different info by role
     if role_name == "customer":
         profile = await get_customer_profile(db, current_user_id)
@@ -104,10 +101,12 @@ async def update_customer_profile_api(
             profile.budget_preference = data.budget_preference
 
         if data.balance is not None:
-            profile.balance = data.balance
+            # 余额变动走流水  # Balance edits go through the ledger as an adjustment
+            await adjust_balance(db, current_user_id, data.balance)
 
         # 标记对象已修改并提交
         db.add(profile)
+        await invalidate_profile(db, current_user_id)
         await db.flush()  # 先 flush 确保更改被检测
         await db.commit()
         await db.refresh(profile)
@@ -131,6 +130,7 @@ class UpdateProviderProfileRequest(BaseModel):
     experience_years: Optional[int] = None
     hourly_rate: Optional[float] = None
     availability: Optional[str] = None
+    location: Optional[str] = None
 
 
 @profile_router.put("/update_provider_profile")
@@ -144,7 +144,10 @@ async def update_provider_profile_api(
     Update provider profile API
     """
     # 只允许当前用户更新自己的 profile
-    from app.models.models import ProviderProfile, User
+    from app.models.models import LocationEnum, ProviderProfile, User
+
+    if data.location is not None and data.location not in LocationEnum.__members__:
+        raise HTTPException(status_code=400, detail="无效的区域  // Invalid location")
 
     result = await db.execute(select(User).where(User.id == current_user_id))
     user = result.scalars().first()
@@ -166,6 +169,8 @@ async def update_provider_profile_api(
     try:
         if data.skills is not None:
             profile.skills = data.skills
+            # 同步规范化技能表  # Keep provider_skills in step
+            await set_provider_skills(db, current_user_id, data.skills)
 
         if data.experience_years is not None:
             profile.experience_years = data.experience_years
@@ -176,8 +181,12 @@ async def update_provider_profile_api(
         if data.availability is not None:
             profile.availability = data.availability
 
+        if data.location is not None:
+            profile.location = LocationEnum[data.location]
+
         # 标记对象已修改并提交
         db.add(profile)
+        await invalidate_profile(db, current_user_id)
         await db.flush()  # 先 flush 确保更改被检测
         await db.commit()
         await db.refresh(profile)
@@ -211,6 +220,7 @@ async def update_user_info_api(
     # 更新用户基本信息
     user.username = data.username
     user.email = data.email
+    await invalidate_profile(db, current_user_id)
     await db.commit()
     await db.refresh(user)
 
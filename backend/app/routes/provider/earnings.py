@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import UTC, date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_db
 from app.dependencies import get_current_user
-from app.services.provider_service import calculate_provider_total_earnings
+from app.schemas.schemas import SeriesResponse
+from app.services.earnings_service import (
+    get_provider_earnings_series,
+    get_provider_earnings_summary,
+)
 
 
 class EarningsResponse(BaseModel):
     total_earnings: float
+    paid_order_count: int = 0
+    last_payment_at: Optional[datetime] = None
     currency: str = "USD"  # TBD: make configurable when integrating payments
 
 
@@ -24,8 +33,48 @@ async def get_total_earnings(
     current_user_id: int = Depends(get_current_user),
 ):
     try:
-        total = await calculate_provider_total_earnings(db, provider_id=current_user_id)
+        summary = await get_provider_earnings_summary(db, current_user_id)
     except Exception as e:
         # Generic fallback; adjust error handling if needed
         raise HTTPException(status_code=500, detail=str(e))
-    return EarningsResponse(total_earnings=total)
+    if summary is None:
+        return EarningsResponse(total_earnings=0.0)
+    return EarningsResponse(
+        total_earnings=float(summary.total_earnings or 0),
+        paid_order_count=summary.paid_order_count or 0,
+        last_payment_at=summary.last_payment_at,
+    )
+
+
+@provider_earnings_router.get("/series", response_model=SeriesResponse)
+async def get_earnings_series(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+    start: Optional[date] = Query(
+        default=None, description="First day (inclusive), defaults to end - 29 days"
+    ),
+    end: Optional[date] = Query(
+        default=None, description="Last day (inclusive), defaults to today (UTC)"
+    ),
+    granularity: str = Query(default="day", pattern="^(day|week|month)$"),
+):
+    """
+    服务商按日/周/月统计收入
+    Provider earnings bucketed by day, week or month
+    """
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=29)
+    try:
+        buckets = await get_provider_earnings_series(
+            db, current_user_id, start, end, granularity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SeriesResponse(
+        granularity=granularity,
+        start=start,
+        end=end,
+        total_amount=round(sum(b["amount"] for b in buckets), 2),
+        buckets=buckets,
+    )
@@ -0,0 +1,77 @@
+import enum
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_db
+from app.dependencies import get_current_user
+from app.models.models import LocationEnum
+from app.services.provider_search_service import MAX_SEARCH_PAGE, search_providers
+
+
+class SkillMatch(str, enum.Enum):
+    any = "any"
+    all = "all"
+
+
+class ProviderSearchItem(BaseModel):
+    provider_id: int
+    username: str
+    skills: List[str]
+    experience_years: Optional[int] = None
+    hourly_rate: float
+    availability: Optional[str] = None
+    location: Optional[str] = None
+    average_rating: float
+    total_reviews: int
+
+
+class ProviderSearchResponse(BaseModel):
+    items: List[ProviderSearchItem]
+    next_cursor: Optional[int] = None
+
+
+provider_search_router = APIRouter(prefix="/providers", tags=["providers"])
+
+
+@provider_search_router.get("/search", response_model=ProviderSearchResponse)
+async def search_providers_route(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user),
+    skills: Optional[str] = Query(
+        default=None, description="Comma separated skills, e.g. plumbing,painting"
+    ),
+    match: SkillMatch = Query(
+        default=SkillMatch.any, description="Match any or all of the skills"
+    ),
+    location: Optional[LocationEnum] = Query(default=None),
+    min_rate: Optional[float] = Query(default=None, ge=0),
+    max_rate: Optional[float] = Query(default=None, ge=0),
+    min_experience: Optional[int] = Query(default=None, ge=0),
+    after: Optional[int] = Query(
+        default=None, description="next_cursor from the previous page"
+    ),
+    limit: int = Query(default=20, ge=1, le=MAX_SEARCH_PAGE),
+):
+    """
+    按技能/区域/时薪/经验搜索服务商
+    Search providers; page with the returned next_cursor.
+    """
+    try:
+        items, next_cursor = await search_providers(
+            db,
+            skills=skills.split(",") if skills else (),
+            match_all=match == SkillMatch.all,
+            location=location,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            min_experience=min_experience,
+            after_id=after,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ProviderSearchResponse(items=items, next_cursor=next_cursor)
@@ -1,38 +1,67 @@
-from datetime import UTC, datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.config import get_db
 from app.dependencies import get_current_user
-from app.models.models import Order, OrderStatus, PaymentStatus, Review
+from app.models.models import LocationEnum, Review
+from app.schemas.schemas import ProviderRatingResponse
+from app.services.leaderboard_service import get_leaderboard
+from app.services.review_service import (
+    DuplicateReviewError,
+    OrderNotCompletedError,
+    OrderNotPaidError,
+    ReviewError,
+    ReviewForbiddenError,
+    ReviewNotFoundError,
+    create_review as submit_review,
+    get_provider_rating as load_provider_rating,
+    get_provider_ratings,
+)
 
 review_router = APIRouter(prefix="/reviews", tags=["reviews"])
 
+# 公开批量评分接口的服务商上限  # Largest number of providers per public batch lookup
+MAX_RATING_BATCH = 500
+
+# 本接口原有的错误信息  # This endpoint's own error messages
+REVIEW_ERROR_DETAILS = {
+    DuplicateReviewError: "This order has already been reviewed",
+    ReviewNotFoundError: (
+        "Order not found or you don't have permission to review this order"
+    ),
+    ReviewForbiddenError: "You can only review your own orders",
+    OrderNotCompletedError: "You can only review completed orders",
+    OrderNotPaidError: "You can only review paid orders",
+}
+
 
 class CreateReviewRequest(BaseModel):
     order_id: int
     stars: int
-    content: str = None
+    content: Optional[str] = None
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    provider_id: int
+    score: float
+    average_rating: float
+    total_reviews: int
+    location: Optional[str] = None
 
 
 class CreateReviewResponse(BaseModel):
     review_id: int
     order_id: int
     stars: int
-    content: str = None
+    content: Optional[str] = None
     message: str
 
 
-class ProviderRatingResponse(BaseModel):
-    provider_id: int
-    average_rating: float
-    total_reviews: int
-
-
 @review_router.post(
     "/", response_model=CreateReviewResponse, status_code=status.HTTP_201_CREATED
 )
@@ -42,66 +71,61 @@ async def create_review(
     db: AsyncSession = Depends(get_db),
 ):
     """创建评价（需要认证）"""
-    # 检查该订单是否已评价
-    result = await db.execute(select(Review).where(Review.order_id == data.order_id))
-    existing = result.scalars().first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This order has already been reviewed",
+    try:
+        new_review = await submit_review(
+            db,
+            current_user_id,
+            data.order_id,
+            data.stars,
+            data.content,
+            require_completed=True,
         )
+    except ReviewError as e:
+        detail = REVIEW_ERROR_DETAILS.get(type(e), str(e))
+        raise HTTPException(status_code=e.status_code, detail=detail)
 
-    # 获取订单信息
-    order_result = await db.execute(select(Order).where(Order.id == data.order_id))
-    order = order_result.scalars().first()
+    return CreateReviewResponse(
+        review_id=new_review.id,
+        order_id=new_review.order_id,
+        stars=new_review.stars,
+        content=new_review.content,
+        message="Review created successfully.",
+    )
 
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found or you don't have permission to review this order",
-        )
 
-    # 验证订单属于当前用户（customer）
-    if order.customer_id != current_user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only review your own orders",
-        )
+@review_router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def get_provider_leaderboard(
+    location: Optional[LocationEnum] = None,
+    skill: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """服务商排行榜（贝叶斯加权评分，公开接口）"""
+    return await get_leaderboard(
+        db, limit, location.value if location else None, skill
+    )
+
 
-    # 验证订单已完成且已支付
-    if order.status != OrderStatus.completed:
+@review_router.get("/providers/ratings", response_model=List[ProviderRatingResponse])
+async def get_providers_ratings(
+    ids: str = Query(..., description="Comma-separated provider ids"),
+    db: AsyncSession = Depends(get_db),
+):
+    """批量获取服务商评分（公开接口）"""
+    try:
+        provider_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You can only review completed orders",
+            detail="ids must be a comma-separated list of integers",
         )
-
-    if order.payment_status != PaymentStatus.paid:
+    if len(set(provider_ids)) > MAX_RATING_BATCH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You can only review paid orders",
+            detail=f"At most {MAX_RATING_BATCH} providers can be requested at once.",
         )
-
-    # 创建评价
-    new_review = Review(
-        order_id=data.order_id,
-        customer_id=order.customer_id,
-        provider_id=order.provider_id,
-        stars=data.stars,
-        content=data.content,
-        created_at=datetime.now(UTC),
-    )
-
-    db.add(new_review)
-    await db.commit()
-    await db.refresh(new_review)
-
-    return CreateReviewResponse(
-        review_id=new_review.id,
-        order_id=new_review.order_id,
-        stars=new_review.stars,
-        content=new_review.content,
-        message="Review created successfully.",
-    )
+    ratings = await get_provider_ratings(db, provider_ids)
+    return list(ratings.values())
 
 
 @review_router.get("/provider/me/rating", response_model=ProviderRatingResponse)
@@ -109,20 +133,7 @@ async def get_my_provider_rating(
     current_user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """获取当前 Provider 的评分（需要认证）"""
-    from sqlalchemy import func
-
-    result = await db.execute(
-        select(func.avg(Review.stars), func.count(Review.id)).where(
-            Review.provider_id == current_user_id
-        )
-    )
-    avg_rating, total_reviews = result.first()
-
-    return ProviderRatingResponse(
-        provider_id=current_user_id,
-        average_rating=float(avg_rating) if avg_rating else 0.0,
-        total_reviews=total_reviews if total_reviews else 0,
-    )
+    return await load_provider_rating(db, current_user_id)
 
 
 @review_router.get("/provider/me/reviews", response_model=List[dict])
@@ -152,20 +163,7 @@ async def get_my_provider_reviews(
 )
 async def get_provider_rating(provider_id: int, db: AsyncSession = Depends(get_db)):
     """获取服务商评分（公开接口）"""
-    from sqlalchemy import func
-
-    result = await db.execute(
-        select(func.avg(Review.stars), func.count(Review.id)).where(
-            Review.provider_id == provider_id
-        )
-    )
-    avg_rating, total_reviews = result.first()
-
-    return ProviderRatingResponse(
-        provider_id=provider_id,
-        average_rating=float(avg_rating) if avg_rating else 0.0,
-        total_reviews=total_reviews if total_reviews else 0,
-    )
+    return await load_provider_rating(db, provider_id)
 
 
 @review_router.get("/provider/{provider_id}", response_model=List[dict])
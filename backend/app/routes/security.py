@@ -7,21 +7,48 @@ import json
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.config import get_db
 from app.models.models import (
     SecurityIssue,
     SecurityIssueStatus,
+    SecurityIssueTag,
     SecurityIssueType,
     SecuritySeverity,
     User,
 )
 from app.routes.auth import get_current_user
-from app.services.security_classifier_service import SecurityClassifierService
+from app.services.batch_classification_service import (
+    BatchTimeBudgetExceeded,
+    BatchTooLarge,
+    check_batch_size,
+    classify_batch,
+    iter_batch_classification,
+)
+from app.services.profile_service import get_user_role
+from app.services.scanner_ingestion_service import (
+    ReportTooLarge,
+    UnknownReportFormat,
+    ingest_report,
+)
+from app.services.security_classifier_service import (
+    SecurityClassifierService,
+    classification_cache,
+)
+from app.services.security_issue_service import (
+    delete_issue_tags,
+    get_issue_statistics,
+    get_tag_counts,
+    invalidate_issue_statistics,
+    load_issue_tags,
+    upsert_issues,
+)
 
 
 # Pydantic models for request/response
@@ -47,6 +74,8 @@ class SecurityIssueResponse(BaseModel):
     remediation_priority: Optional[int]
     estimated_effort: Optional[str]
     status: str
+    occurrence_count: int = 1
+    last_seen: Optional[datetime] = None
     reported_by: int
     assigned_to: Optional[int]
     created_at: datetime
@@ -66,12 +95,29 @@ class BatchClassifyRequest(BaseModel):
     issues: List[SecurityIssueCreate]
 
 
+class IngestionSummary(BaseModel):
+    format: str
+    findings: int
+    inserted: int
+    merged: int
+    skipped: int
+    by_type: dict
+    by_severity: dict
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
 class SecurityStatistics(BaseModel):
     total: int
     by_type: dict
     by_severity: dict
     by_status: dict
     avg_confidence: float
+    # Hit/miss counters of this worker's classification cache
+    classification_cache: Optional[dict] = None
 
 
 # Initialize router
@@ -86,7 +132,7 @@ classifier_service = SecurityClassifierService()
 )
 async def create_security_issue(
     issue_data: SecurityIssueCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -97,6 +143,10 @@ async def create_security_issue(
     2. Uses AI to classify the issue type (SCA/SAST/DAST)
     3. Determines severity and provides remediation suggestions
     4. Stores the classified issue in the database
+
+    Reporting an issue that already exists (same vulnerability id and
+    affected component) returns the existing issue with its occurrence
+    count and last_seen bumped instead of creating a duplicate.
     """
     try:
         # Use AI to classify the issue
@@ -106,39 +156,34 @@ async def create_security_issue(
             affected_component=issue_data.affected_component or "",
         )
 
-        # Create security issue
-        security_issue = SecurityIssue(
-            title=issue_data.title,
-            description=issue_data.description,
-            affected_component=issue_data.affected_component,
-            issue_type=SecurityIssueType[classification["issue_type"]],
-            severity=SecuritySeverity[classification["severity"]],
-            confidence_score=classification["confidence_score"],
-            vulnerability_id=classification["vulnerability_id"],
-            detection_method=classification["detection_method"],
-            tags=classification["tags"],
-            remediation_suggestion=classification["remediation_suggestion"],
-            remediation_priority=classification["remediation_priority"],
-            estimated_effort=classification["estimated_effort"],
-            reported_by=current_user.id,
-            assigned_to=issue_data.assigned_to,
-            status=SecurityIssueStatus.OPEN,
-        )
-
-        db.add(security_issue)
-        await db.commit()
-        await db.refresh(security_issue)
-
-        # Parse tags for response
-        response_data = {
-            **security_issue.__dict__,
-            "issue_type": security_issue.issue_type.value,
-            "severity": security_issue.severity.value,
-            "status": security_issue.status.value,
-            "tags": json.loads(security_issue.tags) if security_issue.tags else [],
+        # Create security issue, or count another occurrence of it
+        values = {
+            "title": issue_data.title,
+            "description": issue_data.description,
+            "affected_component": issue_data.affected_component,
+            "issue_type": SecurityIssueType[classification["issue_type"]],
+            "severity": SecuritySeverity[classification["severity"]],
+            "confidence_score": classification["confidence_score"],
+            "vulnerability_id": classification["vulnerability_id"],
+            "detection_method": classification["detection_method"],
+            "tags": classification["tags"],
+            "remediation_suggestion": classification["remediation_suggestion"],
+            "remediation_priority": classification["remediation_priority"],
+            "estimated_effort": classification["estimated_effort"],
+            "reported_by": current_user_id,
+            "assigned_to": issue_data.assigned_to,
+            "status": SecurityIssueStatus.OPEN,
         }
-
-        return SecurityIssueResponse(**response_data)
+        await upsert_issues(db, [values])
+        await db.commit()
+        invalidate_issue_statistics()
+        security_issue = await db.scalar(
+            select(SecurityIssue).where(
+                SecurityIssue.fingerprint == values["fingerprint"]
+            )
+        )
+        tags = await load_issue_tags(db, [security_issue.id])
+        return _issue_response(security_issue, tags[security_issue.id])
 
     except Exception as e:
         await db.rollback()
@@ -148,14 +193,51 @@ async def create_security_issue(
         )
 
 
+def _issue_conditions(
+    issue_type: Optional[str],
+    severity: Optional[str],
+    status_filter: Optional[str],
+    tag: Optional[str],
+) -> list:
+    conditions = []
+    if issue_type:
+        conditions.append(SecurityIssue.issue_type == SecurityIssueType[issue_type])
+    if severity:
+        conditions.append(SecurityIssue.severity == SecuritySeverity[severity])
+    if status_filter:
+        conditions.append(SecurityIssue.status == SecurityIssueStatus[status_filter])
+    if tag:
+        # 先从 (tag, issue_id) 索引取 id，再按主键取行
+        # Ids come from the (tag, issue_id) index, rows by primary key
+        conditions.append(
+            SecurityIssue.id.in_(
+                select(SecurityIssueTag.issue_id).where(SecurityIssueTag.tag == tag)
+            )
+        )
+    return conditions
+
+
+def _issue_response(issue: SecurityIssue, tags: List[str]) -> SecurityIssueResponse:
+    return SecurityIssueResponse(
+        **{
+            **issue.__dict__,
+            "issue_type": issue.issue_type.value,
+            "severity": issue.severity.value,
+            "status": issue.status.value,
+            "tags": tags,
+        }
+    )
+
+
 @security_router.get("/issues", response_model=List[SecurityIssueResponse])
 async def get_security_issues(
     issue_type: Optional[str] = None,
     severity: Optional[str] = None,
     status_filter: Optional[str] = None,
+    tag: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -165,21 +247,14 @@ async def get_security_issues(
     - issue_type: SCA, SAST, DAST, UNKNOWN
     - severity: CRITICAL, HIGH, MEDIUM, LOW, INFO
     - status: OPEN, IN_PROGRESS, RESOLVED, DISMISSED
+    - tag: issues carrying this tag (see /tags for the tags in use)
     """
     try:
-        query = select(SecurityIssue)
+        # 标签取自标签表，不读 JSON 列  # Tags come from the tag table, not the JSON
+        query = select(SecurityIssue).options(defer(SecurityIssue.tags))
 
         # Apply filters
-        conditions = []
-        if issue_type:
-            conditions.append(SecurityIssue.issue_type == SecurityIssueType[issue_type])
-        if severity:
-            conditions.append(SecurityIssue.severity == SecuritySeverity[severity])
-        if status_filter:
-            conditions.append(
-                SecurityIssue.status == SecurityIssueStatus[status_filter]
-            )
-
+        conditions = _issue_conditions(issue_type, severity, status_filter, tag)
         if conditions:
             query = query.where(and_(*conditions))
 
@@ -190,23 +265,10 @@ async def get_security_issues(
 
         result = await db.execute(query)
         issues = result.scalars().all()
+        tags = await load_issue_tags(db, [issue.id for issue in issues])
 
         # Format response
-        response = []
-        for issue in issues:
-            response.append(
-                SecurityIssueResponse(
-                    **{
-                        **issue.__dict__,
-                        "issue_type": issue.issue_type.value,
-                        "severity": issue.severity.value,
-                        "status": issue.status.value,
-                        "tags": json.loads(issue.tags) if issue.tags else [],
-                    }
-                )
-            )
-
-        return response
+        return [_issue_response(issue, tags[issue.id]) for issue in issues]
 
     except Exception as e:
         raise HTTPException(
@@ -215,6 +277,30 @@ async def get_security_issues(
         )
 
 
+@security_router.get("/tags", response_model=List[TagCount])
+async def get_security_tag_counts(
+    issue_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    current_user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Tag facet: number of issues per tag, most used first
+
+    Takes the same issue_type, severity and status filters as /issues.
+    """
+    try:
+        conditions = _issue_conditions(issue_type, severity, status_filter, None)
+        return await get_tag_counts(db, conditions)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to count security issue tags: {str(e)}",
+        )
+
+
 @security_router.get("/issues/{issue_id}", response_model=SecurityIssueResponse)
 async def get_security_issue(
     issue_id: int,
@@ -233,15 +319,8 @@ async def get_security_issue(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Security issue not found"
             )
 
-        return SecurityIssueResponse(
-            **{
-                **issue.__dict__,
-                "issue_type": issue.issue_type.value,
-                "severity": issue.severity.value,
-                "status": issue.status.value,
-                "tags": json.loads(issue.tags) if issue.tags else [],
-            }
-        )
+        tags = await load_issue_tags(db, [issue.id])
+        return _issue_response(issue, tags[issue.id])
 
     except HTTPException:
         raise
@@ -283,17 +362,11 @@ async def update_security_issue(
         issue.updated_at = datetime.utcnow()
 
         await db.commit()
+        invalidate_issue_statistics()
         await db.refresh(issue)
 
-        return SecurityIssueResponse(
-            **{
-                **issue.__dict__,
-                "issue_type": issue.issue_type.value,
-                "severity": issue.severity.value,
-                "status": issue.status.value,
-                "tags": json.loads(issue.tags) if issue.tags else [],
-            }
-        )
+        tags = await load_issue_tags(db, [issue.id])
+        return _issue_response(issue, tags[issue.id])
 
     except HTTPException:
         raise
@@ -305,6 +378,17 @@ async def update_security_issue(
         )
 
 
+def _batch_issues(batch_request: BatchClassifyRequest) -> List[dict]:
+    return [
+        {
+            "title": issue.title,
+            "description": issue.description,
+            "component": issue.affected_component or "",
+        }
+        for issue in batch_request.issues
+    ]
+
+
 @security_router.post("/batch-classify", response_model=List[dict])
 async def batch_classify_issues(
     batch_request: BatchClassifyRequest, current_user: User = Depends(get_current_user)
@@ -316,28 +400,19 @@ async def batch_classify_issues(
     - Testing the classifier
     - Previewing classifications before saving
     - Batch processing external security scan results
+
+    Large batches are classified in a process pool so other requests are
+    not blocked; use /batch-classify/stream to receive results as they finish.
     """
     try:
-        issues = [
-            {
-                "title": issue.title,
-                "description": issue.description,
-                "component": issue.affected_component or "",
-            }
-            for issue in batch_request.issues
-        ]
-
-        results = classifier_service.batch_classify(issues)
-
-        # Convert Decimal to float for JSON serialization
-        for result in results:
-            if "confidence_score" in result:
-                result["confidence_score"] = float(result["confidence_score"])
-            if "tags" in result:
-                result["tags"] = json.loads(result["tags"])
-
-        return results
+        return await classify_batch(_batch_issues(batch_request))
 
+    except BatchTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except BatchTimeBudgetExceeded as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -345,6 +420,80 @@ async def batch_classify_issues(
         )
 
 
+@security_router.post("/batch-classify/stream")
+async def stream_batch_classify_issues(
+    batch_request: BatchClassifyRequest, current_user: User = Depends(get_current_user)
+):
+    """
+    Classify a batch and stream the results as NDJSON while chunks finish
+
+    Each line is one classified issue with its ``index`` in the request;
+    lines arrive in completion order, not request order. If the time budget
+    runs out, the last line is ``{"error": ..., "completed": n}``.
+    """
+    issues = _batch_issues(batch_request)
+    try:
+        check_batch_size(len(issues))
+    except BatchTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+
+    async def lines():
+        completed = 0
+        try:
+            async for chunk in iter_batch_classification(issues):
+                completed += len(chunk)
+                yield "".join(
+                    json.dumps({"index": index, **row}) + "\n" for index, row in chunk
+                )
+        except BatchTimeBudgetExceeded as e:
+            yield json.dumps({"error": str(e), "completed": completed}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@security_router.post(
+    "/ingest/{report_format}",
+    response_model=IngestionSummary,
+    status_code=status.HTTP_201_CREATED,
+)
+async def ingest_scanner_report(
+    report_format: str,
+    request: Request,
+    current_user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import a scanner report as security issues
+
+    Formats: snyk (snyk test --json), bandit (bandit -f json), safety
+    (safety check --json). The body is the report itself; it is parsed as
+    it arrives, classified in batches and inserted in one transaction.
+    Returns how many findings were read, inserted and skipped.
+    """
+    try:
+        return await ingest_report(
+            db, report_format, request.stream(), reported_by=current_user_id
+        )
+
+    except UnknownReportFormat as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ReportTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except BatchTimeBudgetExceeded as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ingest report: {str(e)}",
+        )
+
+
 @security_router.get("/statistics", response_model=SecurityStatistics)
 async def get_security_statistics(
     current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
@@ -358,49 +507,16 @@ async def get_security_statistics(
     - Distribution by severity
     - Distribution by status
     - Average confidence score
+    - Classification cache hit rate (this worker)
     """
     try:
-        # Get all issues
-        result = await db.execute(select(SecurityIssue))
-        issues = result.scalars().all()
-
-        total = len(issues)
-
-        if total == 0:
-            return SecurityStatistics(
-                total=0, by_type={}, by_severity={}, by_status={}, avg_confidence=0.0
-            )
-
-        # Calculate distributions
-        by_type = {}
-        by_severity = {}
-        by_status = {}
-        total_confidence = 0.0
-
-        for issue in issues:
-            # Type distribution
-            type_key = issue.issue_type.value
-            by_type[type_key] = by_type.get(type_key, 0) + 1
-
-            # Severity distribution
-            severity_key = issue.severity.value
-            by_severity[severity_key] = by_severity.get(severity_key, 0) + 1
-
-            # Status distribution
-            status_key = issue.status.value
-            by_status[status_key] = by_status.get(status_key, 0) + 1
-
-            # Confidence
-            total_confidence += float(issue.confidence_score)
-
-        avg_confidence = total_confidence / total
-
+        stats = await get_issue_statistics(db)
         return SecurityStatistics(
-            total=total,
-            by_type=by_type,
-            by_severity=by_severity,
-            by_status=by_status,
-            avg_confidence=round(avg_confidence, 2),
+            **stats,
+            classification_cache={
+                **classification_cache.stats(),
+                "ruleset_version": classifier_service.ruleset_version(),
+            },
         )
 
     except Exception as e:
@@ -413,13 +529,13 @@ async def get_security_statistics(
 @security_router.delete("/issues/{issue_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_security_issue(
     issue_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a security issue (admin only)"""
     try:
         # Check if user is admin
-        if current_user.role.role_name not in ["admin", "provider"]:
+        if await get_user_role(db, current_user_id) not in ["admin", "provider"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can delete security issues",
@@ -435,8 +551,10 @@ async def delete_security_issue(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Security issue not found"
             )
 
+        await delete_issue_tags(db, issue_id)
         await db.delete(issue)
         await db.commit()
+        invalidate_issue_statistics()
 
     except HTTPException:
         raise
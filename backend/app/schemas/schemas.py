@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Dict, List
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -28,3 +31,27 @@ class UserLogin(BaseModel):
 class UserLoginResponse(BaseModel):
     access_token: str
     token_type: str
+
+
+# 收入/支出时间序列的单个桶
+class SeriesBucket(BaseModel):
+    period_start: date
+    amount: float
+    payment_count: int
+
+
+# 收入/支出时间序列响应
+class SeriesResponse(BaseModel):
+    granularity: str
+    start: date
+    end: date
+    total_amount: float
+    buckets: List[SeriesBucket]
+
+
+# 服务商评分汇总（可嵌入其它列表响应）
+class ProviderRatingResponse(BaseModel):
+    provider_id: int
+    average_rating: float
+    total_reviews: int
+    histogram: Dict[str, int] = {}
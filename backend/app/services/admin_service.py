@@ -2,6 +2,7 @@ from datetime import UTC, datetime
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.models.models import (
     CustomerInbox,
@@ -10,10 +11,28 @@ from app.models.models import (
     OrderStatus,
     ProviderInbox,
     ProviderProfile,
+    ProviderSkill,
     Review,
     User,
 )
 from app.services.notification_service import send_customer_notification
+from app.services.profile_service import invalidate_profile
+from app.services.reference_service import get_role_id
+
+# 管理员订单列表只加载 AdminOrderItem 需要的列，不加载 description
+# Admin order lists load only the columns AdminOrderItem needs (never description)
+ADMIN_ORDER_LIST_COLUMNS = (
+    Order.id,
+    Order.title,
+    Order.price,
+    Order.location,
+    Order.address,
+    Order.status,
+    Order.customer_id,
+    Order.provider_id,
+    Order.created_at,
+    Order.updated_at,
+)
 
 
 async def list_all_orders(
@@ -27,7 +46,7 @@ async def list_all_orders(
     """
     Fetch all orders from the database for admin view, with pagination and sorting.
     """
-    stmt = select(Order)
+    stmt = select(Order).options(load_only(*ADMIN_ORDER_LIST_COLUMNS))
     if status:
         stmt = stmt.where(Order.status == status)
     # Sorting
@@ -50,10 +69,16 @@ async def list_users_by_role(
     limit: int = 20,
     sort_by: str = "created_at",
     order: str = "desc",
+    role_name: str = None,
 ):
     """
-    Fetch users filtered by role_id (1=customer, 2=provider), with pagination and sorting. If role_id is None, return all users.
+    Fetch users filtered by role_id (1=customer, 2=provider) or role_name, with pagination and sorting. If neither is given, return all users.
     """
+    if role_name is not None:
+        # 角色名由参考数据解析，无需联表  # Resolved from reference data, no join
+        role_id = await get_role_id(db, role_name)
+        if role_id is None:
+            raise ValueError(f"Unknown role: {role_name}")
     stmt = select(User)
     if role_id is not None:
         stmt = stmt.where(User.role_id == role_id)
@@ -81,7 +106,8 @@ async def delete_user_by_id(db: AsyncSession, id: int):
     """
     Delete a user by id, including related provider/customer profiles, orders, and reviews.
     """
-    # Delete related provider profile first
+    # Delete related provider profile and skills first
+    await db.execute(delete(ProviderSkill).where(ProviderSkill.provider_id == id))
     await db.execute(delete(ProviderProfile).where(ProviderProfile.id == id))
     # Delete related customer profile if needed
     await db.execute(delete(CustomerProfile).where(CustomerProfile.id == id))
@@ -109,6 +135,7 @@ async def delete_user_by_id(db: AsyncSession, id: int):
     await db.execute(delete(Order).where(Order.provider_id == id))
     # Now delete the user
     await db.execute(delete(User).where(User.id == id))
+    await invalidate_profile(db, id)
     await db.commit()
 
 
@@ -116,6 +143,7 @@ async def get_pending_review_orders(db: AsyncSession):
     """Get all pending review orders"""
     result = await db.execute(
         select(Order)
+        .options(load_only(*ADMIN_ORDER_LIST_COLUMNS))
         .where(Order.status == OrderStatus.pending_review)
         .order_by(Order.created_at.desc())
     )
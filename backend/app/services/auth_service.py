@@ -1,83 +1,86 @@
+import asyncio
 from datetime import UTC, datetime, timedelta
 
-import bcrypt
 from fastapi import HTTPException
 from jose import jwt
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.models.models import CustomerProfile, LocationEnum, ProviderProfile, Role, User
+from app.models.models import CustomerProfile, LocationEnum, ProviderProfile, User
+from app.services.reference_service import get_role_name
+from app.services.token_service import revoke_refresh_token, revoke_token
+from app.utils.ids import uuid7
+from app.utils.security import get_password_hash
 
 SECRET_KEY = (
     "your_secret_key"  # 建议放到环境变量 # Recommended to put in environment variable
 )
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# 访问令牌短期有效，过期后用刷新令牌换新
+# Access tokens are short-lived; clients renew them with a refresh token
+ACCESS_TOKEN_EXPIRE_MINUTES = 15
 
 
 async def register_user(
     db: AsyncSession, username: str, email: str, password: str, role_id: int
 ):
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode(
-        "utf-8"
-    )
+    """
+    Create the user and its role's profile in a single commit, so a failed
+    signup never leaves a user without a profile. bcrypt runs in a worker
+    thread to keep the event loop free.
+    """
+    # 角色名取自内存参考数据  # Role name from the in-memory reference data
+    role_name = await get_role_name(db, role_id)
+    if role_name is None:
+        raise HTTPException(status_code=400, detail="无效的角色")  # Invalid role
+    # bcrypt 为 CPU 密集操作，放到线程池  # bcrypt is CPU bound, run it off-loop
+    hashed_pw = await asyncio.to_thread(get_password_hash, password)
+    now = datetime.now(UTC)
     user = User(
         username=username,
         email=email,
         password_hash=hashed_pw,
         role_id=role_id,
-        created_at=datetime.now(UTC),
-        updated_at=datetime.now(UTC),
+        created_at=now,
+        updated_at=now,
     )
-    db.add(user)
-    try:
-        await db.commit()
-    except IntegrityError:
-        await db.rollback()
-        raise HTTPException(
-            status_code=400, detail="用户名或邮箱已存在"
-        )  # Username or email already exists
-    await db.refresh(user)
-
-    # 查询角色名，避免懒加载
-    result = await db.execute(select(Role).where(Role.id == role_id))
-    role = result.scalar_one_or_none()
-    role_name = role.role_name if role else None
 
     if role_name == "customer":
         # 初始化客户资料
-        profile = CustomerProfile(
-            id=user.id,
+        user.customer_profile = CustomerProfile(
             location=LocationEnum.NORTH,  # 默认值
             address=None,  # 可为null
             budget_preference=0,  # 默认值
             balance=0,  # 默认值
         )
-        db.add(profile)
-        await db.commit()
-        await db.refresh(profile)
     elif role_name == "provider":
         # 初始化服务商资料
-        profile = ProviderProfile(
-            id=user.id,
+        user.provider_profile = ProviderProfile(
             skills="",  # 可为null或空字符串
             experience_years=0,  # 默认值
             hourly_rate=0,  # 默认值
             availability=None,  # 可为null
         )
-        db.add(profile)
-        await db.commit()
-        await db.refresh(profile)
     # 管理员不需要 profile
 
+    # 用户与资料同一事务提交  # User and profile are committed together
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400, detail="用户名或邮箱已存在"
+        )  # Username or email already exists
     return user
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str):
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalars().first()
-    if user and user.verify_password(password):
+    # bcrypt 校验放到线程池  # bcrypt verify runs off the event loop
+    if user and await asyncio.to_thread(user.verify_password, password):
         return user
     return None
 
@@ -87,7 +90,7 @@ async def create_access_token(data: dict, expires_delta: timedelta = None):
     expire = datetime.now(UTC) + (
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": str(uuid7())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -98,11 +101,25 @@ def create_access_token_with_role(user_id: int, role_id: int):
         "sub": str(user_id),
         "role": role_id,
         "exp": datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        # 令牌唯一 id，用于服务端撤销  # Token id, used for server-side revocation
+        "jti": str(uuid7()),
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def logout_user():
-    # JWT 无法在服务端失效，通常前端清除 token 即可
-    # JWT cannot be invalidated on server side, usually frontend just clears the token
+async def logout_user(db: AsyncSession, payload: dict, refresh_token: str = None):
+    """
+    Revoke the token described by ``payload`` (its decoded claims) so it is
+    rejected until it expires, and the refresh token family of the session
+    when given. Tokens without a jti just expire.
+    """
+    if refresh_token:
+        await revoke_refresh_token(db, refresh_token)
+    if payload.get("jti"):
+        await revoke_token(
+            db,
+            payload["jti"],
+            int(payload["sub"]),
+            datetime.fromtimestamp(payload["exp"], UTC).replace(tzinfo=None),
+        )
     return {"msg": "Logout successful"}
@@ -0,0 +1,217 @@
+"""
+Customer balance ledger.
+
+Every balance change is a single atomic
+``UPDATE customer_profiles SET balance = balance + :delta, ledger_seq = ledger_seq + 1``
+followed by an append to ``balance_ledger`` in the same transaction, so
+concurrent recharges and payments can never lose an update. Debits carry a
+``WHERE balance >= :amount`` guard instead of a Python-side check.
+
+Every ``SNAPSHOT_INTERVAL`` entries the resulting balance is written to
+``balance_snapshots``; history pages start from the nearest snapshot and only
+sum the entries in between instead of replaying the whole ledger.
+"""
+
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.models.models import (
+    BalanceEntryType,
+    BalanceLedgerEntry,
+    BalanceSnapshot,
+    CustomerProfile,
+)
+from app.services.cache_service import PROFILE_CACHE, publish_invalidation
+
+# 每隔多少条流水写一次快照  # Write a snapshot every N ledger entries
+SNAPSHOT_INTERVAL = 50
+
+
+def _to_amount(value) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+async def _apply_delta(
+    db: AsyncSession,
+    customer_id: int,
+    delta: Decimal,
+    entry_type: BalanceEntryType,
+    order_id: Optional[int] = None,
+    require_funds: bool = False,
+) -> Optional[Decimal]:
+    profile = CustomerProfile
+    current = func.coalesce(profile.balance, 0)
+    stmt = (
+        update(profile)
+        .where(profile.id == customer_id)
+        .values(balance=current + delta, ledger_seq=profile.ledger_seq + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if require_funds:
+        stmt = stmt.where(current >= -delta)
+    result = await db.execute(stmt)
+    if not result.rowcount:
+        return None
+
+    # 同一事务内读回，行锁保证序号唯一  # Read back under the row lock taken by the UPDATE
+    balance, seq = (
+        await db.execute(
+            select(profile.balance, profile.ledger_seq).where(profile.id == customer_id)
+        )
+    ).one()
+    db.add(
+        BalanceLedgerEntry(
+            customer_id=customer_id,
+            seq=seq,
+            entry_type=entry_type,
+            amount=delta,
+            order_id=order_id,
+        )
+    )
+    if seq == 1:
+        # 首条流水前的开户余额  # Opening balance for profiles funded outside the ledger
+        db.add(BalanceSnapshot(customer_id=customer_id, seq=0, balance=balance - delta))
+    if seq % SNAPSHOT_INTERVAL == 0:
+        db.add(BalanceSnapshot(customer_id=customer_id, seq=seq, balance=balance))
+    await db.flush()
+
+    # 同步会话中已加载的资料对象  # Keep an already-loaded profile in step
+    loaded = db.identity_map.get(identity_key(CustomerProfile, customer_id))
+    if loaded is not None:
+        set_committed_value(loaded, "balance", balance)
+        set_committed_value(loaded, "ledger_seq", seq)
+    # 缓存的客户资料含余额  # Cached customer profiles include the balance
+    await publish_invalidation(db, PROFILE_CACHE, customer_id)
+    return balance
+
+
+async def credit_balance(
+    db: AsyncSession,
+    customer_id: int,
+    amount,
+    entry_type: BalanceEntryType = BalanceEntryType.recharge,
+    order_id: Optional[int] = None,
+) -> Optional[Decimal]:
+    """
+    Add ``amount`` to the customer's balance and record it in the ledger.
+    Returns the new balance, or None when the customer has no profile.
+    Does not commit.
+    """
+    amount = _to_amount(amount)
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0.")
+    return await _apply_delta(db, customer_id, amount, entry_type, order_id)
+
+
+async def debit_balance(
+    db: AsyncSession,
+    customer_id: int,
+    amount,
+    entry_type: BalanceEntryType = BalanceEntryType.payment,
+    order_id: Optional[int] = None,
+) -> Optional[Decimal]:
+    """
+    Subtract ``amount`` from the customer's balance if it is covered.
+    Returns the new balance, None when the customer has no profile, and
+    raises ValueError when the balance is insufficient. Does not commit.
+    """
+    amount = _to_amount(amount)
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0.")
+    balance = await _apply_delta(
+        db, customer_id, -amount, entry_type, order_id, require_funds=True
+    )
+    if balance is not None:
+        return balance
+    exists = await db.execute(
+        select(CustomerProfile.id).where(CustomerProfile.id == customer_id)
+    )
+    if exists.scalar() is None:
+        return None
+    raise ValueError("Insufficient balance.")
+
+
+async def adjust_balance(
+    db: AsyncSession, customer_id: int, target
+) -> Optional[Decimal]:
+    """
+    Move the balance to ``target`` through an adjustment entry.
+    Returns the new balance, or None when the customer has no profile.
+    Does not commit.
+    """
+    result = await db.execute(
+        select(CustomerProfile.balance).where(CustomerProfile.id == customer_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    delta = _to_amount(target) - _to_amount(row[0] or 0)
+    if not delta:
+        return row[0]
+    return await _apply_delta(
+        db, customer_id, delta, BalanceEntryType.adjustment
+    )
+
+
+async def get_balance_history(
+    db: AsyncSession,
+    customer_id: int,
+    limit: int = 50,
+    before_seq: Optional[int] = None,
+) -> List[dict]:
+    """
+    Newest-first ledger entries with the balance after each one.
+    Pass the smallest ``seq`` of a page as ``before_seq`` to fetch the next.
+    """
+    ledger = BalanceLedgerEntry
+    query = select(ledger).where(ledger.customer_id == customer_id)
+    if before_seq is not None:
+        query = query.where(ledger.seq < before_seq)
+    result = await db.execute(query.order_by(ledger.seq.desc()).limit(limit))
+    entries = result.scalars().all()
+    if not entries:
+        return []
+
+    # 从最近快照开始，只累加中间的流水  # Start from the nearest snapshot below the page
+    oldest = entries[-1].seq
+    snapshot = (
+        await db.execute(
+            select(BalanceSnapshot.seq, BalanceSnapshot.balance)
+            .where(
+                BalanceSnapshot.customer_id == customer_id,
+                BalanceSnapshot.seq < oldest,
+            )
+            .order_by(BalanceSnapshot.seq.desc())
+            .limit(1)
+        )
+    ).first()
+    base_seq, running = snapshot if snapshot else (0, Decimal("0"))
+    gap = await db.execute(
+        select(func.coalesce(func.sum(ledger.amount), 0)).where(
+            ledger.customer_id == customer_id,
+            ledger.seq > base_seq,
+            ledger.seq < oldest,
+        )
+    )
+    running = _to_amount(running) + _to_amount(gap.scalar() or 0)
+
+    history = []
+    for entry in reversed(entries):
+        running += entry.amount
+        history.append(
+            {
+                "seq": entry.seq,
+                "entry_type": entry.entry_type.value,
+                "amount": float(entry.amount),
+                "balance_after": float(running),
+                "order_id": entry.order_id,
+                "created_at": entry.created_at,
+            }
+        )
+    history.reverse()
+    return history
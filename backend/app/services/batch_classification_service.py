@@ -0,0 +1,148 @@
+"""
+Batch security issue classification that keeps the event loop free.
+
+Issues already in the classification cache are answered first, and
+identical issues within a batch are classified once. If at most
+INLINE_MAX_ISSUES remain, they are classified inline; shipping them to
+another process would cost more than classifying them. Otherwise they are
+split into CHUNK_SIZE chunks classified in the shared process pool. Each
+chunk is handed back, and cached in this process, as soon as it finishes,
+so results can be streamed.
+
+settings.BATCH_CLASSIFY_MAX_ISSUES caps the size of a batch and
+settings.BATCH_CLASSIFY_TIME_BUDGET_SECONDS the time one request may take.
+When the budget runs out, chunks that have not started are cancelled and
+BatchTimeBudgetExceeded is raised; chunks already running finish in the
+pool and are discarded.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.security_classifier_service import (
+    SecurityClassifierService,
+    classification_cache,
+)
+from app.utils.process_pool import get_process_pool
+
+# 不超过此数量时直接在当前进程分类  # Batches this small are classified inline
+INLINE_MAX_ISSUES = 50
+# 每个进程任务处理的问题数  # Issues per process pool task
+CHUNK_SIZE = 250
+
+_classifier = SecurityClassifierService()
+
+
+class BatchTooLarge(ValueError):
+    """The batch has more issues than BATCH_CLASSIFY_MAX_ISSUES."""
+
+
+class BatchTimeBudgetExceeded(TimeoutError):
+    """The batch did not finish within its time budget."""
+
+
+def check_batch_size(count: int) -> None:
+    """Raise BatchTooLarge when ``count`` issues exceed the configured maximum."""
+    limit = settings.BATCH_CLASSIFY_MAX_ISSUES
+    if count > limit:
+        raise BatchTooLarge(f"At most {limit} issues per batch")
+
+
+def classify_chunk(issues: List[Dict]) -> List[Dict]:
+    """Classify ``issues`` without the cache; runs in a pool process."""
+    return [
+        _classifier.classify_issue_uncached(
+            issue["title"], issue["description"], issue["component"]
+        )
+        for issue in issues
+    ]
+
+
+def _row(issue: Dict, result: Dict) -> Dict:
+    """Issue plus its classification, ready for JSON (float confidence, tag list)."""
+    row = {**issue, **result}
+    row["confidence_score"] = float(row["confidence_score"])
+    row["tags"] = json.loads(row["tags"])
+    return row
+
+
+async def iter_batch_classification(
+    issues: List[Dict], time_budget: Optional[float] = None
+) -> AsyncIterator[List[Tuple[int, Dict]]]:
+    """
+    Yield lists of (index in ``issues``, classified row) as results become
+    available: cached ones first, then one list per classified chunk.
+    Raises BatchTooLarge before any work, BatchTimeBudgetExceeded when the
+    budget (default: the configured one) runs out.
+    """
+    check_batch_size(len(issues))
+    cached: List[Tuple[int, Dict]] = []
+    # 按缓存键合并相同问题  # Identical issues share one key and one classification
+    pending: Dict[str, List[int]] = {}
+    for index, issue in enumerate(issues):
+        key = _classifier.classification_key(
+            issue["title"], issue["description"], issue["component"]
+        )
+        if key in pending:
+            pending[key].append(index)
+            continue
+        result = classification_cache.get(key)
+        if result is None:
+            pending[key] = [index]
+        else:
+            cached.append((index, _row(issue, result)))
+    if cached:
+        yield cached
+
+    keys = list(pending)
+
+    def finish(chunk_keys: List[str], results: List[Dict]) -> List[Tuple[int, Dict]]:
+        rows = []
+        for key, result in zip(chunk_keys, results):
+            classification_cache.set(key, result)
+            rows.extend((i, _row(issues[i], result)) for i in pending[key])
+        return rows
+
+    if len(keys) <= INLINE_MAX_ISSUES:
+        if keys:
+            yield finish(keys, classify_chunk([issues[pending[k][0]] for k in keys]))
+        return
+
+    if time_budget is None:
+        time_budget = settings.BATCH_CLASSIFY_TIME_BUDGET_SECONDS
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+
+    async def run_chunk(chunk_keys: List[str]):
+        chunk = [issues[pending[k][0]] for k in chunk_keys]
+        return chunk_keys, await loop.run_in_executor(pool, classify_chunk, chunk)
+
+    tasks = [
+        asyncio.ensure_future(run_chunk(keys[start : start + CHUNK_SIZE]))
+        for start in range(0, len(keys), CHUNK_SIZE)
+    ]
+    try:
+        for next_chunk in asyncio.as_completed(tasks, timeout=time_budget):
+            yield finish(*await next_chunk)
+    except asyncio.TimeoutError:
+        raise BatchTimeBudgetExceeded(
+            f"Batch not classified within {time_budget:g}s"
+        ) from None
+    finally:
+        # 预算耗尽或客户端断开时，取消尚未开始的块
+        # Out of budget or client gone: cancel chunks that have not started
+        for task in tasks:
+            task.cancel()
+
+
+async def classify_batch(
+    issues: List[Dict], time_budget: Optional[float] = None
+) -> List[Dict]:
+    """Classify ``issues`` and return the rows in input order."""
+    rows: List[Optional[Dict]] = [None] * len(issues)
+    async for chunk in iter_batch_classification(issues, time_budget):
+        for index, row in chunk:
+            rows[index] = row
+    return rows
@@ -0,0 +1,157 @@
+"""
+Cache invalidation, locally and across workers.
+
+Every worker keeps its own in-process TTLCache instances. Writers call
+publish_invalidation inside their transaction: the key is evicted from this
+worker immediately and again once the session commits. Every eviction also
+bumps the key's generation; readers take generation() before loading and
+skip the cache write if it changed, so a read that started before the commit
+cannot put the pre-commit value back.
+
+With settings.CACHE_INVALIDATION_SYNC enabled, publish_invalidation also adds
+a cache_invalidations row to the caller's transaction, so the signal becomes
+visible exactly when the write does. sync_invalidations polls that table at
+most every CACHE_SYNC_INTERVAL_SECONDS and applies the rows it has not seen
+through the handler registered for the cache. Without it, other workers pick
+up changes when their entries expire.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import delete, event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.models import CacheInvalidation
+
+# 资料缓存名（余额变动等也需失效）  # Profile cache name, also invalidated by balance changes
+PROFILE_CACHE = "profiles"
+
+# 自增 id 在提交前分配，重读最近的信号以免漏掉晚提交的行
+# Ids are allocated before commit, so recent rows are re-read for late commits
+SYNC_LOOKBACK = timedelta(seconds=10)
+# 单次同步读取的最大行数  # Rows read per sync
+SYNC_BATCH = 1000
+# 信号保留时长  # How long signal rows are kept
+SIGNAL_RETENTION = timedelta(days=1)
+
+_PENDING_KEY = "pending_cache_invalidations"
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+# 每个键被失效的次数  # How many times each (cache name, key) was evicted
+_generations: Dict[Tuple[str, str], int] = {}
+_sync_state = {"last_id": None, "checked_at": 0.0}
+
+
+def register_invalidation_handler(
+    cache_name: str, handler: Callable[[str], None]
+) -> None:
+    """Register the function that evicts ``key`` (a string) from ``cache_name``."""
+    _handlers[cache_name] = handler
+
+
+def generation(cache_name: str, key) -> int:
+    """
+    Eviction count of ``key`` in ``cache_name``. Read it before loading and
+    only store the loaded value if it is unchanged afterwards.
+    """
+    return _generations.get((cache_name, str(key)), 0)
+
+
+def _evict(cache_name: str, key: str) -> None:
+    _generations[(cache_name, key)] = _generations.get((cache_name, key), 0) + 1
+    handler = _handlers.get(cache_name)
+    if handler is not None:
+        handler(key)
+
+
+async def publish_invalidation(db: AsyncSession, cache_name: str, key) -> None:
+    """
+    Evict ``key`` from ``cache_name`` now and after the session commits, and
+    queue the cross-worker signal when enabled. Does not commit.
+    """
+    key = str(key)
+    _evict(cache_name, key)
+    db.sync_session.info.setdefault(_PENDING_KEY, set()).add((cache_name, key))
+    if settings.CACHE_INVALIDATION_SYNC:
+        db.add(CacheInvalidation(cache_name=cache_name, cache_key=key))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session: Session) -> None:
+    for cache_name, key in session.info.pop(_PENDING_KEY, ()):
+        _evict(cache_name, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def sync_invalidations(db: AsyncSession, force: bool = False) -> int:
+    """
+    Apply invalidations published by other workers. Rate limited to one
+    query per CACHE_SYNC_INTERVAL_SECONDS unless ``force``; returns rows read.
+    """
+    if not settings.CACHE_INVALIDATION_SYNC:
+        return 0
+    now = time.monotonic()
+    interval = settings.CACHE_SYNC_INTERVAL_SECONDS
+    if not force and now - _sync_state["checked_at"] < interval:
+        return 0
+    _sync_state["checked_at"] = now
+
+    if _sync_state["last_id"] is None:
+        # 首次同步：从当前位置开始  # First sync starts from the current tail
+        result = await db.execute(select(func.max(CacheInvalidation.id)))
+        _sync_state["last_id"] = result.scalar() or 0
+        return 0
+
+    result = await db.execute(
+        select(
+            CacheInvalidation.id,
+            CacheInvalidation.cache_name,
+            CacheInvalidation.cache_key,
+        )
+        .where(
+            or_(
+                CacheInvalidation.id > _sync_state["last_id"],
+                CacheInvalidation.created_at >= datetime.utcnow() - SYNC_LOOKBACK,
+            )
+        )
+        .order_by(CacheInvalidation.id)
+        .limit(SYNC_BATCH)
+    )
+    rows = result.all()
+    for row in rows:
+        _evict(row.cache_name, row.cache_key)
+    if rows:
+        _sync_state["last_id"] = max(_sync_state["last_id"], rows[-1].id)
+    return len(rows)
+
+
+def sync_status() -> dict:
+    return {
+        "enabled": settings.CACHE_INVALIDATION_SYNC,
+        "interval_seconds": settings.CACHE_SYNC_INTERVAL_SECONDS,
+        "last_seen_id": _sync_state["last_id"],
+    }
+
+
+def reset_sync_state() -> None:
+    _sync_state["last_id"] = None
+    _sync_state["checked_at"] = 0.0
+
+
+async def prune_invalidations(db: AsyncSession) -> int:
+    """Delete signal rows older than SIGNAL_RETENTION and commit."""
+    result = await db.execute(
+        delete(CacheInvalidation).where(
+            CacheInvalidation.created_at < datetime.utcnow() - SIGNAL_RETENTION
+        )
+    )
+    await db.commit()
+    return result.rowcount or 0
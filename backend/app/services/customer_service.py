@@ -3,12 +3,32 @@ from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only
 
 from app.models.models import Order, OrderStatus, PaymentStatus, Review
 from app.services.notification_service import (
     send_customer_notification,
     send_provider_notification,
 )
+from app.services.review_service import (
+    ReviewForbiddenError,
+    ReviewNotFoundError,
+    create_review,
+)
+
+# 列表接口只加载 OrderSummary 需要的列，不加载 description
+# List endpoints load only the columns OrderSummary needs (never description)
+ORDER_SUMMARY_COLUMNS = (
+    Order.id,
+    Order.title,
+    Order.service_type,
+    Order.status,
+    Order.payment_status,
+    Order.price,
+    Order.location,
+    Order.created_at,
+    Order.provider_id,
+)
 
 
 async def publish_order(db: AsyncSession, customer_id: int, data):
@@ -81,6 +101,7 @@ async def cancel_order(db: AsyncSession, customer_id: int, order_id: int):
 async def get_my_orders(db: AsyncSession, customer_id: int) -> List[Order]:
     result = await db.execute(
         select(Order)
+        .options(load_only(*ORDER_SUMMARY_COLUMNS))
         .where(
             Order.customer_id == customer_id,
             Order.status.in_(
@@ -151,6 +172,7 @@ async def get_order_history(db: AsyncSession, customer_id: int) -> List[Order]:
     """
     result = await db.execute(
         select(Order)
+        .options(load_only(*ORDER_SUMMARY_COLUMNS))
         .where(Order.customer_id == customer_id)
         .order_by(Order.created_at.desc())
     )
@@ -165,40 +187,19 @@ class ReviewData:
 
 
 async def review_order(db: AsyncSession, customer_id: int, data: ReviewData):
-    # 查找订单  # Find order
-    result = await db.execute(
-        select(Order).where(Order.id == data.order_id, Order.customer_id == customer_id)
-    )
-    order = result.scalars().first()
-    if not order:
+    # 与 /reviews/ 共用同一写入路径  # Shares the write path with POST /reviews/
+    try:
+        review = await create_review(
+            db, customer_id, data.order_id, data.stars, data.content
+        )
+    except (ReviewNotFoundError, ReviewForbiddenError):
         raise ValueError("Order not found or permission denied.")
-    # 仅允许已完成且已支付订单评价  # Only allow review for completed and paid orders
-    if order.payment_status != PaymentStatus.paid:
-        raise ValueError("Only paid orders can be reviewed!")
-    # 检查是否已评价  # Check if already reviewed
-    review_result = await db.execute(
-        select(Review).where(Review.order_id == data.order_id)
-    )
-    if review_result.scalars().first():
-        raise ValueError("Order already reviewed!")
-    # 创建评价  # Create review
-    review = Review(
-        order_id=data.order_id,
-        customer_id=customer_id,
-        provider_id=order.provider_id,
-        stars=data.stars,
-        content=data.content,
-        created_at=datetime.now(UTC),
-    )
-    db.add(review)
-    await db.commit()
-    await db.refresh(review)
     # 通知服务商
-    if order.provider_id:
+    if review.provider_id:
         await send_provider_notification(
             db,
-            order.provider_id,
-            order.id,
-            f"客户对订单 #{order.id} 进行了评价（{data.stars}星）",
+            review.provider_id,
+            review.order_id,
+            f"客户对订单 #{review.order_id} 进行了评价（{review.stars}星）",
         )
     return review
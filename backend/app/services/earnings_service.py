@@ -0,0 +1,289 @@
+"""
+Materialized provider earnings and payment rollups.
+
+provider_earnings_summary holds one row per provider with the running
+total, paid-order count and last payment time. provider_earnings_daily and
+customer_spending_daily hold one row per (user, day). All three are
+updated in the same transaction that inserts the Payment rows, so reading
+totals is a single-row lookup and a time series costs one row per day in
+the requested range, regardless of how many payments it covers.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    CustomerSpendingDaily,
+    Payment,
+    PaymentStatusEnum,
+    ProviderEarningsDaily,
+    ProviderEarningsSummary,
+)
+
+GRANULARITIES = ("day", "week", "month")
+
+# 单次查询允许的最大日期跨度  # Largest date range a single series query may span
+MAX_SERIES_DAYS = 366 * 5
+
+
+async def increment_row(
+    db: AsyncSession,
+    model,
+    keys: dict,
+    increments: dict,
+    update_extra: Optional[dict] = None,
+    insert_extra: Optional[dict] = None,
+) -> None:
+    """
+    UPDATE model SET col = col + :delta for the keyed row, inserting the row
+    when it does not exist yet (falling back to the UPDATE on an insert race).
+    """
+    values = {name: getattr(model, name) + delta for name, delta in increments.items()}
+    values.update(update_extra or {})
+    stmt = (
+        update(model)
+        .where(*(getattr(model, name) == value for name, value in keys.items()))
+        .values(**values)
+    )
+    result = await db.execute(stmt)
+    if result.rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(
+                insert(model).values(**keys, **increments, **(insert_extra or {}))
+            )
+    except IntegrityError:
+        await db.execute(stmt)
+
+
+def _payment_day(payment) -> date:
+    paid_at = payment.created_at or datetime.now(UTC)
+    if paid_at.tzinfo is not None:
+        paid_at = paid_at.astimezone(UTC)
+    return paid_at.date()
+
+
+def _aggregate(payments: Iterable, key) -> dict:
+    """Group payments into {key: [amount, count, last_paid_at]}."""
+    totals = {}
+    for payment in payments:
+        group = key(payment)
+        if group is None:
+            continue
+        entry = totals.setdefault(group, [0, 0, None])
+        entry[0] += payment.amount
+        entry[1] += 1
+        if payment.created_at and (entry[2] is None or payment.created_at > entry[2]):
+            entry[2] = payment.created_at
+    return totals
+
+
+async def record_payments(db: AsyncSession, payments: Iterable) -> None:
+    """
+    Apply new payments to the earnings summary and the daily rollups.
+    Does not commit: the caller commits together with the Payment rows.
+    """
+    payments = list(payments)
+    summary = ProviderEarningsSummary
+
+    for provider_id, (amount, count, paid_at) in _aggregate(
+        payments, lambda p: p.provider_id
+    ).items():
+        update_extra = {}
+        if paid_at is not None:
+            update_extra["last_payment_at"] = case(
+                (
+                    (summary.last_payment_at.is_(None))
+                    | (summary.last_payment_at < paid_at),
+                    paid_at,
+                ),
+                else_=summary.last_payment_at,
+            )
+        await increment_row(
+            db,
+            summary,
+            {"provider_id": provider_id},
+            {"total_earnings": amount, "paid_order_count": count},
+            update_extra=update_extra,
+            insert_extra={"last_payment_at": paid_at},
+        )
+
+    provider_days = _aggregate(
+        payments,
+        lambda p: (p.provider_id, _payment_day(p)) if p.provider_id else None,
+    )
+    for (provider_id, day), (amount, count, _) in provider_days.items():
+        await increment_row(
+            db,
+            ProviderEarningsDaily,
+            {"provider_id": provider_id, "day": day},
+            {"amount": amount, "payment_count": count},
+        )
+
+    customer_days = _aggregate(payments, lambda p: (p.customer_id, _payment_day(p)))
+    for (customer_id, day), (amount, count, _) in customer_days.items():
+        await increment_row(
+            db,
+            CustomerSpendingDaily,
+            {"customer_id": customer_id, "day": day},
+            {"amount": amount, "payment_count": count},
+        )
+
+
+async def get_provider_earnings_summary(
+    db: AsyncSession, provider_id: int
+) -> Optional[ProviderEarningsSummary]:
+    """Single-row read of a provider's earnings summary."""
+    return await db.get(ProviderEarningsSummary, provider_id)
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the week (Monday) or month containing ``day``."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+async def _load_series(
+    db: AsyncSession, model, owner_column, owner_id: int, start: date, end: date, granularity: str
+) -> List[dict]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if start > end:
+        raise ValueError("start must not be after end")
+    if (end - start).days >= MAX_SERIES_DAYS:
+        raise ValueError(f"Date range must be shorter than {MAX_SERIES_DAYS} days")
+
+    result = await db.execute(
+        select(model.day, model.amount, model.payment_count)
+        .where(owner_column == owner_id, model.day >= start, model.day <= end)
+        .order_by(model.day)
+    )
+    # 由日汇总推导周/月桶  # Coarser buckets are derived from the daily rows
+    buckets = {}
+    for day, amount, count in result.all():
+        entry = buckets.setdefault(bucket_start(day, granularity), [0, 0])
+        entry[0] += amount or 0
+        entry[1] += count or 0
+
+    series = []
+    period = bucket_start(start, granularity)
+    while period <= end:
+        amount, count = buckets.get(period, (0, 0))
+        series.append(
+            {"period_start": period, "amount": float(amount), "payment_count": count}
+        )
+        period = _next_bucket(period, granularity)
+    return series
+
+
+async def get_provider_earnings_series(
+    db: AsyncSession, provider_id: int, start: date, end: date, granularity: str = "day"
+) -> List[dict]:
+    """Provider earnings per day/week/month between start and end (inclusive)."""
+    return await _load_series(
+        db,
+        ProviderEarningsDaily,
+        ProviderEarningsDaily.provider_id,
+        provider_id,
+        start,
+        end,
+        granularity,
+    )
+
+
+async def get_customer_spending_series(
+    db: AsyncSession, customer_id: int, start: date, end: date, granularity: str = "day"
+) -> List[dict]:
+    """Customer spending per day/week/month between start and end (inclusive)."""
+    return await _load_series(
+        db,
+        CustomerSpendingDaily,
+        CustomerSpendingDaily.customer_id,
+        customer_id,
+        start,
+        end,
+        granularity,
+    )
+
+
+def _completed_payments():
+    return Payment.status == PaymentStatusEnum.completed
+
+
+async def rebuild_provider_earnings(db: AsyncSession) -> int:
+    """
+    Rebuild the whole summary table from completed payments and commit.
+    Returns the number of provider rows written.
+    """
+    await db.execute(delete(ProviderEarningsSummary))
+    source = (
+        select(
+            Payment.provider_id,
+            func.coalesce(func.sum(Payment.amount), 0),
+            func.count(Payment.id),
+            func.max(Payment.created_at),
+        )
+        .where(Payment.provider_id.is_not(None), _completed_payments())
+        .group_by(Payment.provider_id)
+    )
+    await db.execute(
+        insert(ProviderEarningsSummary).from_select(
+            [
+                ProviderEarningsSummary.provider_id,
+                ProviderEarningsSummary.total_earnings,
+                ProviderEarningsSummary.paid_order_count,
+                ProviderEarningsSummary.last_payment_at,
+            ],
+            source,
+        )
+    )
+    await db.commit()
+    result = await db.execute(select(func.count()).select_from(ProviderEarningsSummary))
+    return result.scalar() or 0
+
+
+async def rebuild_daily_rollups(db: AsyncSession) -> int:
+    """
+    Rebuild both daily rollup tables from completed payments and commit.
+    Returns the number of rollup rows written.
+    """
+    await db.execute(delete(ProviderEarningsDaily))
+    await db.execute(delete(CustomerSpendingDaily))
+    for model, owner in (
+        (ProviderEarningsDaily, Payment.provider_id),
+        (CustomerSpendingDaily, Payment.customer_id),
+    ):
+        day = func.date(Payment.created_at)
+        source = (
+            select(owner, day, func.sum(Payment.amount), func.count(Payment.id))
+            .where(owner.is_not(None), _completed_payments())
+            .group_by(owner, day)
+        )
+        owner_key = "provider_id" if model is ProviderEarningsDaily else "customer_id"
+        await db.execute(
+            insert(model).from_select(
+                [owner_key, "day", "amount", "payment_count"], source
+            )
+        )
+    await db.commit()
+    total = 0
+    for model in (ProviderEarningsDaily, CustomerSpendingDaily):
+        result = await db.execute(select(func.count()).select_from(model))
+        total += result.scalar() or 0
+    return total
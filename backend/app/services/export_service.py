@@ -0,0 +1,181 @@
+"""
+Streaming export of orders, payments and reviews for admins.
+
+Rows are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and encoded one partition at a time, so memory use stays
+constant no matter how many rows are exported.
+"""
+
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Order, OrderStatus, Payment, PaymentStatusEnum, Review
+
+# 每批从游标读取的行数  # Rows fetched from the cursor per partition
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = {
+    "orders": [
+        Order.id,
+        Order.customer_id,
+        Order.provider_id,
+        Order.title,
+        Order.description,
+        Order.service_type,
+        Order.status,
+        Order.price,
+        Order.location,
+        Order.address,
+        Order.service_start_time,
+        Order.service_end_time,
+        Order.payment_status,
+        Order.created_at,
+        Order.updated_at,
+    ],
+    "payments": [
+        Payment.id,
+        Payment.order_id,
+        Payment.customer_id,
+        Payment.provider_id,
+        Payment.amount,
+        Payment.payment_method,
+        Payment.status,
+        Payment.transaction_id,
+        Payment.created_at,
+        Payment.updated_at,
+    ],
+    "reviews": [
+        Review.id,
+        Review.order_id,
+        Review.customer_id,
+        Review.provider_id,
+        Review.stars,
+        Review.content,
+        Review.created_at,
+    ],
+}
+
+EXPORT_MODELS = {"orders": Order, "payments": Payment, "reviews": Review}
+
+# 各实体 status 过滤使用的枚举  # Enum used by the status filter of each entity
+STATUS_ENUMS = {"orders": OrderStatus, "payments": PaymentStatusEnum}
+
+
+def build_export_query(
+    entity: str,
+    *,
+    status: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    provider_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    Build the column-only SELECT for an export, ordered by primary key.
+    Raises ValueError for an unknown entity or an invalid status filter.
+    """
+    if entity not in EXPORT_MODELS:
+        raise ValueError(f"Unknown export entity: {entity}")
+    model = EXPORT_MODELS[entity]
+    stmt = select(*EXPORT_COLUMNS[entity])
+
+    if status:
+        status_enum = STATUS_ENUMS.get(entity)
+        if status_enum is None:
+            raise ValueError(f"Status filter is not supported for {entity}")
+        try:
+            stmt = stmt.where(model.status == status_enum(status))
+        except ValueError:
+            raise ValueError(f"Invalid status for {entity}: {status}")
+    if customer_id is not None:
+        stmt = stmt.where(model.customer_id == customer_id)
+    if provider_id is not None:
+        stmt = stmt.where(model.provider_id == provider_id)
+    if created_from is not None:
+        stmt = stmt.where(model.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(model.created_at < created_to)
+
+    return stmt.order_by(model.id)
+
+
+def _plain_value(value):
+    """Convert a column value to a JSON/CSV friendly scalar."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, header: Optional[list] = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    for row in rows:
+        writer.writerow(["" if v is None else _plain_value(v) for v in row])
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows, keys: list) -> str:
+    return "".join(
+        json.dumps(
+            {k: _plain_value(v) for k, v in zip(keys, row)}, ensure_ascii=False
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(
+    db: AsyncSession,
+    entity: str,
+    *,
+    fmt: str = "csv",
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    **filters,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the encoded export as byte chunks, one chunk per cursor partition.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    stmt = build_export_query(entity, **filters)
+    keys = [column.key for column in EXPORT_COLUMNS[entity]]
+    # wbits=31 -> gzip 容器格式  # wbits=31 produces a gzip container
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        yield emit(_encode_csv([], header=keys))
+
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for partition in result.partitions():
+            if fmt == "csv":
+                chunk = emit(_encode_csv(partition))
+            else:
+                chunk = emit(_encode_ndjson(partition, keys))
+            if chunk:
+                yield chunk
+    finally:
+        await result.close()
+
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,268 @@
+"""
+In-memory provider leaderboard.
+
+Providers are ranked by a Bayesian-adjusted rating
+
+    score = (PRIOR_WEIGHT * prior_mean + stars_sum) / (PRIOR_WEIGHT + review_count)
+
+which pulls providers with few reviews towards the marketplace mean, so a
+single five-star review does not outrank a long track record.
+
+The ranking keeps the best LEADERBOARD_CAPACITY providers in a sorted list.
+It is rebuilt from provider_rating_summary on first use and again once it is
+older than REBUILD_INTERVAL_SECONDS. In between, refresh_provider re-reads a
+single provider after each new review and moves it in place. prior_mean is
+fixed between rebuilds so an incremental update never reorders anyone else.
+
+The structure lives in process memory: each worker keeps its own copy, and
+profile location/skill edits show up at the next rebuild.
+
+Location and skill filters run over the in-memory providers. Once more
+providers are rated than LEADERBOARD_CAPACITY, a filtered page that comes
+back short may be missing providers ranked below the cut, so
+get_leaderboard answers it from provider_rating_summary instead (skills
+via provider_skills).
+"""
+
+import asyncio
+import bisect
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    LocationEnum,
+    ProviderProfile,
+    ProviderRatingSummary,
+    ProviderSkill,
+)
+
+# 先验权重（相当于多少条平均评价）  # Prior weight, in "average reviews"
+PRIOR_WEIGHT = 5
+# 内存中保留的服务商数量  # Providers kept in memory
+LEADERBOARD_CAPACITY = 5000
+# 全量重建间隔  # Full rebuild interval
+REBUILD_INTERVAL_SECONDS = 600
+
+
+def parse_skills(skills: Optional[str]) -> FrozenSet[str]:
+    """Normalize ProviderProfile.skills (JSON list or comma separated) to a set."""
+    if not skills:
+        return frozenset()
+    try:
+        values = json.loads(skills)
+    except ValueError:
+        values = skills.split(",")
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list):
+        return frozenset()
+    return frozenset(str(v).strip().lower() for v in values if str(v).strip())
+
+
+@dataclass
+class _Entry:
+    provider_id: int
+    review_count: int
+    stars_sum: int
+    location: Optional[str] = None
+    skills: FrozenSet[str] = field(default_factory=frozenset)
+    score: float = 0.0
+
+    @property
+    def sort_key(self):
+        return (-self.score, -self.review_count, self.provider_id)
+
+
+class Leaderboard:
+    """Top-K providers by Bayesian rating, kept sorted in memory."""
+
+    def __init__(self, capacity: int = LEADERBOARD_CAPACITY):
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self) -> None:
+        self.prior_mean = 0.0
+        self.built_at: Optional[float] = None
+        self._entries: Dict[int, _Entry] = {}
+        self._ranking: List[tuple] = []
+        # 是否所有有评价的服务商都在内存中  # Every rated provider is held
+        self.complete = True
+        self._lock = asyncio.Lock()
+
+    def _score(self, review_count: int, stars_sum: int) -> float:
+        return (PRIOR_WEIGHT * self.prior_mean + stars_sum) / (
+            PRIOR_WEIGHT + review_count
+        )
+
+    def _remove(self, provider_id: int) -> None:
+        entry = self._entries.pop(provider_id, None)
+        if entry is None:
+            return
+        index = bisect.bisect_left(self._ranking, entry.sort_key)
+        if index < len(self._ranking) and self._ranking[index] == entry.sort_key:
+            del self._ranking[index]
+
+    def _place(self, entry: _Entry) -> None:
+        self._remove(entry.provider_id)
+        if not entry.review_count:
+            return
+        entry.score = self._score(entry.review_count, entry.stars_sum)
+        full = len(self._ranking) >= self.capacity
+        if full and entry.sort_key > self._ranking[-1]:
+            self.complete = False
+            return
+        bisect.insort(self._ranking, entry.sort_key)
+        self._entries[entry.provider_id] = entry
+        if len(self._ranking) > self.capacity:
+            self._entries.pop(self._ranking.pop()[2], None)
+            self.complete = False
+
+    @staticmethod
+    def _rating_query():
+        return select(
+            ProviderRatingSummary.provider_id,
+            ProviderRatingSummary.review_count,
+            ProviderRatingSummary.stars_sum,
+            ProviderProfile.location,
+            ProviderProfile.skills,
+        ).outerjoin(
+            ProviderProfile, ProviderProfile.id == ProviderRatingSummary.provider_id
+        )
+
+    @staticmethod
+    def _entry(row) -> _Entry:
+        return _Entry(
+            provider_id=row.provider_id,
+            review_count=row.review_count or 0,
+            stars_sum=row.stars_sum or 0,
+            location=row.location.value if row.location else None,
+            skills=parse_skills(row.skills),
+        )
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Reload every provider from the rating summary; returns providers kept."""
+        rows = (await db.execute(self._rating_query())).all()
+        total_count = sum(r.review_count or 0 for r in rows)
+        total_stars = sum(r.stars_sum or 0 for r in rows)
+        self.prior_mean = total_stars / total_count if total_count else 0.0
+        self._entries = {}
+        self._ranking = []
+        self.complete = True
+        for row in rows:
+            self._place(self._entry(row))
+        self.built_at = time.monotonic()
+        return len(self._ranking)
+
+    def _stale(self) -> bool:
+        return (
+            self.built_at is None
+            or time.monotonic() - self.built_at >= REBUILD_INTERVAL_SECONDS
+        )
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Rebuild when never built or older than REBUILD_INTERVAL_SECONDS."""
+        if not self._stale():
+            return
+        async with self._lock:
+            if self._stale():
+                await self.rebuild(db)
+
+    async def refresh_provider(self, db: AsyncSession, provider_id: int) -> None:
+        """Re-rank one provider from its summary row (call after the review commits)."""
+        if self.built_at is None:
+            return  # 尚未构建，首次读取时全量加载  # Loaded in full on first read
+        row = (
+            await db.execute(
+                self._rating_query().where(
+                    ProviderRatingSummary.provider_id == provider_id
+                )
+            )
+        ).first()
+        if row is None:
+            self._remove(provider_id)
+        else:
+            self._place(self._entry(row))
+
+    def top(
+        self, limit: int = 20, location: str = None, skill: str = None
+    ) -> List[dict]:
+        skill = skill.strip().lower() if skill else None
+        results = []
+        for _, _, provider_id in self._ranking:
+            entry = self._entries[provider_id]
+            if location and entry.location != location:
+                continue
+            if skill and skill not in entry.skills:
+                continue
+            results.append(_result(len(results) + 1, entry))
+            if len(results) >= limit:
+                break
+        return results
+
+    async def query_top(
+        self,
+        db: AsyncSession,
+        limit: int = 20,
+        location: str = None,
+        skill: str = None,
+    ) -> List[dict]:
+        """top() computed from provider_rating_summary instead of the top K."""
+        score = (PRIOR_WEIGHT * self.prior_mean + ProviderRatingSummary.stars_sum) / (
+            PRIOR_WEIGHT + ProviderRatingSummary.review_count
+        )
+        query = self._rating_query().where(ProviderRatingSummary.review_count > 0)
+        if location:
+            query = query.where(ProviderProfile.location == LocationEnum(location))
+        if skill:
+            query = query.where(
+                ProviderRatingSummary.provider_id.in_(
+                    select(ProviderSkill.provider_id).where(
+                        ProviderSkill.skill == skill.strip().lower()
+                    )
+                )
+            )
+        rows = await db.execute(
+            query.order_by(
+                score.desc(),
+                ProviderRatingSummary.review_count.desc(),
+                ProviderRatingSummary.provider_id,
+            ).limit(limit)
+        )
+        results = []
+        for row in rows.all():
+            entry = self._entry(row)
+            entry.score = self._score(entry.review_count, entry.stars_sum)
+            results.append(_result(len(results) + 1, entry))
+        return results
+
+
+def _result(rank: int, entry: _Entry) -> dict:
+    return {
+        "rank": rank,
+        "provider_id": entry.provider_id,
+        "score": round(entry.score, 4),
+        "average_rating": entry.stars_sum / entry.review_count,
+        "total_reviews": entry.review_count,
+        "location": entry.location,
+    }
+
+
+leaderboard = Leaderboard()
+
+
+async def get_leaderboard(
+    db: AsyncSession, limit: int = 20, location: str = None, skill: str = None
+) -> List[dict]:
+    """Top providers by Bayesian rating, optionally filtered by location/skill."""
+    await leaderboard.ensure_fresh(db)
+    results = leaderboard.top(limit, location, skill)
+    if len(results) < limit and (location or skill) and not leaderboard.complete:
+        # 内存只有前 K 名，过滤后不足一页时查汇总表
+        # Only the top K are in memory; a short filtered page may miss providers
+        results = await leaderboard.query_top(db, limit, location, skill)
+    return results
@@ -1,5 +1,7 @@
 from datetime import datetime
+from typing import Iterable, Tuple
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.models import CustomerInbox, ProviderInbox
@@ -31,3 +33,32 @@ async def send_provider_notification(
     )
     db.add(notification)
     await db.commit()
+
+
+async def send_notifications_bulk(
+    db: AsyncSession,
+    customer_notifications: Iterable[Tuple[int, int, str]] = (),
+    provider_notifications: Iterable[Tuple[int, int, str]] = (),
+):
+    """
+    Insert many (user_id, order_id, message) notifications with one
+    INSERT per inbox table and a single commit.
+    """
+    now = datetime.utcnow()
+    for model, owner, items in (
+        (CustomerInbox, "customer_id", customer_notifications),
+        (ProviderInbox, "provider_id", provider_notifications),
+    ):
+        rows = [
+            {
+                owner: user_id,
+                "order_id": order_id,
+                "message": message,
+                "created_at": now,
+                "is_read": False,
+            }
+            for user_id, order_id, message in items
+        ]
+        if rows:
+            await db.execute(insert(model), rows)
+    await db.commit()
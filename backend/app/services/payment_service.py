@@ -0,0 +1,233 @@
+"""
+Batch settlement of completed orders.
+
+settle_orders pays many orders in one transaction: one SELECT validates
+every requested order, one INSERT writes all Payment rows, one UPDATE flips
+payment_status, the customer balance is debited once for the total, and the
+notifications go out with one INSERT per inbox table afterwards.
+
+Transaction ids are UUIDv7 stored as BINARY(16); since they sort by creation
+time, lookups by id and by time range are both served by the unique index.
+Payments from before UUIDv7 keep their random uuid4 ids; time-range queries
+find those by created_at instead.
+"""
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    Order,
+    OrderStatus,
+    Payment,
+    PaymentMethodEnum,
+    PaymentStatus,
+    PaymentStatusEnum,
+)
+from app.services.balance_service import debit_balance
+from app.services.earnings_service import record_payments
+from app.services.notification_service import send_notifications_bulk
+from app.utils.ids import uuid7, uuid7_floor
+
+# 单次批量结算的订单上限  # Largest number of orders settled per request
+MAX_BATCH_ORDERS = 200
+
+# 按时间区间查询的返回上限  # Row cap for time-range transaction queries
+MAX_TRANSACTION_PAGE = 500
+
+
+def _result(order_id: int, error: str = None, transaction_id: str = None) -> dict:
+    return {
+        "order_id": order_id,
+        "success": error is None,
+        "transaction_id": transaction_id,
+        "error": error,
+    }
+
+
+async def settle_orders(
+    db: AsyncSession, customer_id: int, order_ids: Iterable[int]
+) -> dict:
+    """
+    Pay every payable order in ``order_ids`` for ``customer_id``.
+
+    Orders that are missing, not completed or already paid are reported
+    individually and do not block the rest. If the balance cannot cover the
+    payable total, nothing is written and every payable order is reported
+    as failed. Commits on success.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        raise ValueError("order_ids must not be empty.")
+    if len(order_ids) > MAX_BATCH_ORDERS:
+        raise ValueError(f"At most {MAX_BATCH_ORDERS} orders can be paid at once.")
+
+    result = await db.execute(
+        select(
+            Order.id, Order.status, Order.payment_status, Order.price, Order.provider_id
+        )
+        .where(Order.id.in_(order_ids), Order.customer_id == customer_id)
+        .with_for_update()
+    )
+    found = {row.id: row for row in result.all()}
+
+    results = {}
+    payable = []
+    for order_id in order_ids:
+        row = found.get(order_id)
+        if row is None:
+            results[order_id] = _result(order_id, "Order not found.")
+        elif row.status != OrderStatus.completed:
+            results[order_id] = _result(order_id, "Order is not completed.")
+        elif row.payment_status == PaymentStatus.paid:
+            results[order_id] = _result(order_id, "Order is already paid.")
+        else:
+            payable.append(row)
+
+    def summary(balance=None, total=Decimal("0")):
+        return {
+            "paid_count": sum(1 for r in results.values() if r["success"]),
+            "total_amount": float(total),
+            "balance": float(balance) if balance is not None else None,
+            "results": [results[order_id] for order_id in order_ids],
+        }
+
+    if not payable:
+        return summary()
+
+    total = sum((Decimal(str(row.price)) for row in payable), Decimal("0"))
+    try:
+        balance = await debit_balance(db, customer_id, total)
+        error = None if balance is not None else "Customer profile not found."
+    except ValueError:
+        error = "Insufficient balance."
+    if error:
+        await db.rollback()
+        for row in payable:
+            results[row.id] = _result(row.id, error)
+        return summary()
+
+    now = datetime.now(UTC)
+    payments: List[Payment] = []
+    for row in payable:
+        payment = Payment(
+            order_id=row.id,
+            customer_id=customer_id,
+            provider_id=row.provider_id,
+            amount=row.price,
+            payment_method=PaymentMethodEnum.simulated,
+            status=PaymentStatusEnum.completed,
+            transaction_id=str(uuid7()),
+            created_at=now,
+            updated_at=now,
+        )
+        payments.append(payment)
+        results[row.id] = _result(row.id, transaction_id=payment.transaction_id)
+
+    columns = [c.key for c in Payment.__table__.columns if c.key != "id"]
+    try:
+        await db.execute(
+            insert(Payment), [{c: getattr(p, c) for c in columns} for p in payments]
+        )
+    except IntegrityError:
+        # 并发的单笔支付抢先写入  # A concurrent payment got there first
+        await db.rollback()
+        raise ValueError("Orders changed during settlement, please retry.")
+    paid_ids = [row.id for row in payable]
+    flipped = await db.execute(
+        update(Order)
+        .where(Order.id.in_(paid_ids), Order.payment_status != PaymentStatus.paid)
+        .values(payment_status=PaymentStatus.paid)
+    )
+    if flipped.rowcount != len(paid_ids):
+        await db.rollback()
+        raise ValueError("Orders changed during settlement, please retry.")
+    await record_payments(db, payments)
+    await db.commit()
+
+    await send_notifications_bulk(
+        db,
+        customer_notifications=[
+            (customer_id, row.id, f"订单 #{row.id} 支付成功") for row in payable
+        ],
+        provider_notifications=[
+            (row.provider_id, row.id, f"订单 #{row.id} 已收到付款")
+            for row in payable
+            if row.provider_id
+        ],
+    )
+    return summary(balance, total)
+
+
+async def get_payment_by_transaction(
+    db: AsyncSession, customer_id: int, transaction_id: str
+) -> Optional[Payment]:
+    """Unique-index lookup of one of the customer's payments."""
+    result = await db.execute(
+        select(Payment).where(
+            Payment.transaction_id == transaction_id,
+            Payment.customer_id == customer_id,
+        )
+    )
+    return result.scalars().first()
+
+
+async def list_payments_between(
+    db: AsyncSession,
+    customer_id: int,
+    start: datetime,
+    end: datetime,
+    limit: int = 100,
+) -> List[Payment]:
+    """
+    The customer's payments created in [start, end), oldest first.
+    UUIDv7 payments are found by a range on transaction_id, so the scan runs
+    on its index; created_at only screens out legacy ids that happen to fall
+    in that range. Legacy payments (random uuid4 ids, or none) are found by
+    customer and created_at.
+    """
+    if start >= end:
+        raise ValueError("start must be before end")
+    limit = max(1, min(limit, MAX_TRANSACTION_PAGE))
+    created_from, created_to = (
+        moment.astimezone(UTC).replace(tzinfo=None) if moment.tzinfo else moment
+        for moment in (start, end)
+    )
+    in_range = (
+        Payment.customer_id == customer_id,
+        Payment.created_at >= created_from,
+        Payment.created_at < created_to,
+    )
+    result = await db.execute(
+        select(Payment)
+        .where(
+            Payment.transaction_id >= uuid7_floor(start),
+            Payment.transaction_id < uuid7_floor(end),
+            *in_range,
+        )
+        .order_by(Payment.transaction_id)
+        .limit(limit)
+    )
+    payments = list(result.scalars().all())
+    # 迁移前的 uuid4 交易号不按时间排序，按创建时间查找
+    # Pre-UUIDv7 ids do not sort by time; find those by created_at
+    legacy = await db.execute(
+        select(Payment)
+        .where(*in_range, _legacy_transaction_id())
+        .order_by(Payment.created_at, Payment.id)
+        .limit(limit)
+    )
+    payments.extend(legacy.scalars().all())
+    payments.sort(key=lambda payment: payment.created_at)
+    return payments[:limit]
+
+
+def _legacy_transaction_id():
+    """Payments whose transaction id is missing or not a UUIDv7."""
+    # 版本号是第 13 个十六进制位  # The version is the 13th hex digit
+    version = func.substr(func.hex(Payment.transaction_id), 13, 1)
+    return or_(Payment.transaction_id.is_(None), version != "7")
@@ -3,16 +3,96 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
-from app.models.models import CustomerProfile, ProviderProfile, Role, User
+from app.models.models import CustomerProfile, ProviderProfile, User
+from app.services.balance_service import adjust_balance
+from app.services.cache_service import (
+    PROFILE_CACHE,
+    generation,
+    publish_invalidation,
+    register_invalidation_handler,
+    sync_invalidations,
+)
+from app.services.provider_search_service import set_provider_skills
+from app.services.reference_service import get_role_name
+from app.utils.cache import TTLCache
+
+# 资料缓存，按 (类型, 用户 id) 存放  # Profile cache keyed by (kind, user id)
+PROFILE_CACHE_SIZE = 10_000
+PROFILE_CACHE_TTL = 300
+PROFILE_KINDS = ("role", "customer", "provider", "admin")
+
+profile_cache = TTLCache(PROFILE_CACHE, PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+
+
+def _evict_profile(key: str) -> None:
+    user_id = int(key)
+    for kind in PROFILE_KINDS:
+        profile_cache.invalidate((kind, user_id))
+
+
+register_invalidation_handler(PROFILE_CACHE, _evict_profile)
+
+
+async def invalidate_profile(db: AsyncSession, user_id: int) -> None:
+    """
+    Drop every cached view of ``user_id``; call before committing a change
+    to the user, its role or its profile.
+    """
+    await publish_invalidation(db, PROFILE_CACHE, user_id)
+
+
+async def _cached(db: AsyncSession, kind: str, user_id: int, loader):
+    await sync_invalidations(db)
+    key = (kind, user_id)
+    value = profile_cache.get(key)
+    if value is None:
+        started = generation(PROFILE_CACHE, user_id)
+        value = await loader(db, user_id)
+        # 不缓存“不存在”，资料可能随后创建  # Misses are not cached; the profile may be created later
+        # 读取期间被失效则不回写旧值  # Not stored if invalidated while loading
+        if value is not None and generation(PROFILE_CACHE, user_id) == started:
+            profile_cache.set(key, value)
+    # 返回副本，调用方修改不影响缓存  # Callers get a copy they may modify
+    return dict(value) if isinstance(value, dict) else value
+
+
+async def get_user_role(db: AsyncSession, user_id: int):
+    """
+    Get the role name of a user (cached)
+    """
+    return await _cached(db, "role", user_id, _load_user_role)
 
 
 async def get_customer_profile(db: AsyncSession, user_id: int):
     """
-    Get customer profile info
+    Get customer profile info (cached)
+    """
+    return await _cached(db, "customer", user_id, _load_customer_profile)
+
+
+async def get_provider_profile(db: AsyncSession, user_id: int):
+    """
+    Get provider profile info (cached)
+    """
+    return await _cached(db, "provider", user_id, _load_provider_profile)
+
+
+async def get_admin_profile(db: AsyncSession, user_id: int):
+    """
+    Get admin profile info (cached)
     """
+    return await _cached(db, "admin", user_id, _load_admin_profile)
+
+
+async def _load_user_role(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User.role_id).where(User.id == user_id))
+    return await get_role_name(db, result.scalar())
+
+
+async def _load_customer_profile(db: AsyncSession, user_id: int):
     result = await db.execute(
         select(User)
-        .options(selectinload(User.role), selectinload(User.customer_profile))
+        .options(selectinload(User.customer_profile))
         .where(User.id == user_id)
     )
     user = result.scalars().first()
@@ -24,7 +104,7 @@ async def get_customer_profile(db: AsyncSession, user_id: int):
         "user_id": user.id,
         "username": user.username,
         "email": user.email,
-        "role": user.role.role_name if user.role else None,
+        "role": await get_role_name(db, user.role_id),
         "location": getattr(
             user.customer_profile.location, "value", user.customer_profile.location
         ),
@@ -36,13 +116,10 @@ async def get_customer_profile(db: AsyncSession, user_id: int):
     }
 
 
-async def get_provider_profile(db: AsyncSession, user_id: int):
-    """
-    Get provider profile info
-    """
+async def _load_provider_profile(db: AsyncSession, user_id: int):
     result = await db.execute(
         select(User)
-        .options(selectinload(User.role), selectinload(User.provider_profile))
+        .options(selectinload(User.provider_profile))
         .where(User.id == user_id)
     )
     user = result.scalars().first()
@@ -54,31 +131,34 @@ async def get_provider_profile(db: AsyncSession, user_id: int):
         "user_id": user.id,
         "username": user.username,
         "email": user.email,
-        "role": user.role.role_name if user.role else None,
+        "role": await get_role_name(db, user.role_id),
         "skills": user.provider_profile.skills,
         "experience_years": user.provider_profile.experience_years,
         "hourly_rate": float(user.provider_profile.hourly_rate or 0),
         "availability": user.provider_profile.availability,
+        "location": (
+            user.provider_profile.location.value
+            if user.provider_profile.location
+            else None
+        ),
         "created_at": str(user.created_at),
         "updated_at": str(user.updated_at),
     }
 
 
-async def get_admin_profile(db: AsyncSession, user_id: int):
-    """
-    Get admin profile info
-    """
-    result = await db.execute(
-        select(User).options(selectinload(User.role)).where(User.id == user_id)
-    )
+async def _load_admin_profile(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
-    if not user or (user.role and user.role.role_name != "admin"):
+    if not user:
+        return None
+    role_name = await get_role_name(db, user.role_id)
+    if role_name and role_name != "admin":
         return None
     return {
         "id": user.id,
         "username": user.username,
         "email": user.email,
-        "role": user.role.role_name if user.role else None,
+        "role": role_name,
         "created_at": str(user.created_at),
         "updated_at": str(user.updated_at),
     }
@@ -106,7 +186,7 @@ async def update_customer_profile(
             location=location,
             address=address,
             budget_preference=budget_preference,
-            balance=balance,
+            balance=0,
         )
         db.add(profile)
     else:
@@ -114,7 +194,9 @@ async def update_customer_profile(
         profile.location = location
         profile.address = address
         profile.budget_preference = budget_preference
-        profile.balance = balance
+    # Balance changes are recorded in the ledger as an adjustment
+    await adjust_balance(db, user_id, balance)
+    await invalidate_profile(db, user_id)
     await db.commit()
     await db.refresh(profile)
     return profile
@@ -151,6 +233,8 @@ async def update_provider_profile(
         profile.experience_years = experience_years
         profile.hourly_rate = hourly_rate
         profile.availability = availability
+    await set_provider_skills(db, user_id, skills)
+    await invalidate_profile(db, user_id)
     await db.commit()
     await db.refresh(profile)
     return profile
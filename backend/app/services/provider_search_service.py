@@ -0,0 +1,170 @@
+"""
+Provider search backed by the normalized provider_skills table.
+
+ProviderProfile.skills stays the free-form text the provider edits (a JSON
+list or comma separated). Every write of that text goes through
+set_provider_skills, which replaces the provider's provider_skills rows in
+the same transaction, so "providers who know X" is an index lookup on
+(skill, provider_id) instead of parsing every profile.
+
+search_providers pages by provider id (keyset): pass the returned
+next_cursor as ``after_id`` to get the next page, so deep pages cost the
+same as the first.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import LocationEnum, ProviderProfile, ProviderSkill, User
+from app.services.leaderboard_service import parse_skills
+from app.services.review_service import get_provider_ratings
+
+# 技能名最大长度  # Longest skill name stored
+MAX_SKILL_LENGTH = 100
+# 单次搜索最多的技能数  # Most skills in one search
+MAX_SEARCH_SKILLS = 20
+# 每页最多返回的服务商数  # Largest page size
+MAX_SEARCH_PAGE = 100
+# 重建时每批读取的资料数  # Profiles read per rebuild batch
+REBUILD_BATCH = 1000
+
+
+def normalize_skills(skills: Optional[str]) -> List[str]:
+    """Skills text to the sorted, lower-cased values stored in provider_skills."""
+    return sorted({skill[:MAX_SKILL_LENGTH] for skill in parse_skills(skills)})
+
+
+async def set_provider_skills(
+    db: AsyncSession, provider_id: int, skills: Optional[str]
+) -> None:
+    """
+    Replace the provider_skills rows of ``provider_id`` with the skills in
+    ``skills``. Does not commit: call it in the transaction that writes
+    ProviderProfile.skills.
+    """
+    await db.execute(
+        delete(ProviderSkill).where(ProviderSkill.provider_id == provider_id)
+    )
+    values = [
+        {"provider_id": provider_id, "skill": skill}
+        for skill in normalize_skills(skills)
+    ]
+    if values:
+        await db.execute(insert(ProviderSkill), values)
+
+
+async def rebuild_provider_skills(db: AsyncSession) -> int:
+    """
+    Rebuild provider_skills from every ProviderProfile.skills and commit.
+    Returns the number of skill rows written.
+    """
+    await db.execute(delete(ProviderSkill))
+    last_id, total = 0, 0
+    while True:
+        result = await db.execute(
+            select(ProviderProfile.id, ProviderProfile.skills)
+            .where(ProviderProfile.id > last_id)
+            .order_by(ProviderProfile.id)
+            .limit(REBUILD_BATCH)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        values = [
+            {"provider_id": row.id, "skill": skill}
+            for row in rows
+            for skill in normalize_skills(row.skills)
+        ]
+        if values:
+            await db.execute(insert(ProviderSkill), values)
+        total += len(values)
+        last_id = rows[-1].id
+    await db.commit()
+    return total
+
+
+async def search_providers(
+    db: AsyncSession,
+    *,
+    skills: Iterable[str] = (),
+    match_all: bool = False,
+    location: Optional[LocationEnum] = None,
+    min_rate: Optional[float] = None,
+    max_rate: Optional[float] = None,
+    min_experience: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = 20,
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    Providers matching any (or, with ``match_all``, every) of ``skills`` and
+    the other filters, in provider id order. Returns the page and the
+    cursor for the next one (None on the last page).
+    """
+    wanted = sorted(
+        {s.strip().lower()[:MAX_SKILL_LENGTH] for s in skills if s and s.strip()}
+    )
+    if len(wanted) > MAX_SEARCH_SKILLS:
+        raise ValueError(f"At most {MAX_SEARCH_SKILLS} skills can be searched at once.")
+    if min_rate is not None and max_rate is not None and min_rate > max_rate:
+        raise ValueError("min_rate cannot be greater than max_rate.")
+    limit = max(1, min(limit, MAX_SEARCH_PAGE))
+
+    query = select(
+        ProviderProfile.id,
+        User.username,
+        ProviderProfile.skills,
+        ProviderProfile.experience_years,
+        ProviderProfile.hourly_rate,
+        ProviderProfile.availability,
+        ProviderProfile.location,
+    ).join(User, User.id == ProviderProfile.id)
+
+    if wanted and match_all:
+        # 每个技能一次主键查找  # One primary-key probe per skill
+        for skill in wanted:
+            query = query.where(
+                exists().where(
+                    ProviderSkill.provider_id == ProviderProfile.id,
+                    ProviderSkill.skill == skill,
+                )
+            )
+    elif wanted:
+        query = query.where(
+            ProviderProfile.id.in_(
+                select(ProviderSkill.provider_id).where(ProviderSkill.skill.in_(wanted))
+            )
+        )
+    if location is not None:
+        query = query.where(ProviderProfile.location == location)
+    if min_rate is not None:
+        query = query.where(ProviderProfile.hourly_rate >= min_rate)
+    if max_rate is not None:
+        query = query.where(ProviderProfile.hourly_rate <= max_rate)
+    if min_experience is not None:
+        query = query.where(ProviderProfile.experience_years >= min_experience)
+    if after_id is not None:
+        query = query.where(ProviderProfile.id > after_id)
+
+    result = await db.execute(query.order_by(ProviderProfile.id).limit(limit + 1))
+    rows = result.all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    rows = rows[:limit]
+
+    ratings = await get_provider_ratings(db, [row.id for row in rows])
+    items = [
+        {
+            "provider_id": row.id,
+            "username": row.username,
+            "skills": normalize_skills(row.skills),
+            "experience_years": row.experience_years,
+            "hourly_rate": float(row.hourly_rate or 0),
+            "availability": row.availability,
+            "location": row.location.value if row.location else None,
+            "average_rating": ratings[row.id]["average_rating"],
+            "total_reviews": ratings[row.id]["total_reviews"],
+        }
+        for row in rows
+    ]
+    return items, next_cursor
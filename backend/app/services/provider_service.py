@@ -1,16 +1,28 @@
 from datetime import UTC, datetime
 from typing import List, Optional
 
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only
 
-from app.models.models import LocationEnum, Order, OrderStatus, PaymentStatus, Review
+from app.models.models import LocationEnum, Order, OrderStatus, Review
+from app.services.earnings_service import get_provider_earnings_summary
 from app.services.notification_service import (
     send_customer_notification,
     send_provider_notification,
 )
 
+# 列表接口只加载响应需要的列，不加载 description
+# List endpoints load only the columns their responses need (never description)
+ORDER_LIST_COLUMNS = (
+    Order.id,
+    Order.title,
+    Order.price,
+    Order.location,
+    Order.address,
+    Order.status,
+)
+
 
 async def list_available_orders(
     db: AsyncSession,
@@ -24,7 +36,11 @@ async def list_available_orders(
     Return orders that are currently pending (available to providers),
     with optional filters.
     """
-    query = select(Order).where(Order.status == OrderStatus.pending)
+    query = (
+        select(Order)
+        .options(load_only(*ORDER_LIST_COLUMNS))
+        .where(Order.status == OrderStatus.pending)
+    )
 
     if location is not None:
         query = query.where(Order.location == location)
@@ -161,6 +177,7 @@ async def list_provider_order_history(
     """
     result = await db.execute(
         select(Order)
+        .options(load_only(*ORDER_LIST_COLUMNS, Order.updated_at))
         .where(Order.provider_id == provider_id)
         .order_by(Order.updated_at.desc())
     )
@@ -173,17 +190,13 @@ async def calculate_provider_total_earnings(
     provider_id: int,
 ):
     """
-    Calculate the provider's total earnings as the sum of prices for orders
-    that have been paid. Returns 0.0 when none.
+    Return the provider's total earnings from the materialized earnings
+    summary (a single-row read). Returns 0.0 when none.
     """
-    result = await db.execute(
-        select(func.coalesce(func.sum(Order.price), 0)).where(
-            (Order.provider_id == provider_id)
-            & (Order.payment_status == PaymentStatus.paid)
-        )
-    )
-    total = result.scalar() or 0
-    return float(total)
+    summary = await get_provider_earnings_summary(db, provider_id)
+    if summary is None:
+        return 0.0
+    return float(summary.total_earnings or 0)
 
 
 async def get_order_detail_for_provider(
@@ -0,0 +1,256 @@
+"""
+Bulk user provisioning for admins and migrations.
+
+Input is NDJSON, one {"username", "email", "password", "role_id"} object
+per line. Compared with one /auth/register call per account:
+
+- every line is validated up front, and duplicates (inside the upload and
+  against existing users) come from a single pre-check query; usernames
+  and emails compare case-insensitively, like the MySQL unique indexes;
+- bcrypt runs in the shared process pool, so hashing uses every core and
+  never blocks the event loop;
+- users and profiles are written with multi-row INSERTs, one transaction
+  per BATCH_SIZE accounts.
+
+Every input line gets a result: created (with the new id), duplicate or
+invalid. A batch that hits a unique constraint anyway (a concurrent
+signup) is rolled back and retried one account at a time, so only the
+colliding accounts are reported as duplicates.
+"""
+
+import asyncio
+import json
+from datetime import UTC, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import CustomerProfile, LocationEnum, ProviderProfile, User
+from app.services.reference_service import get_role_name
+from app.utils.process_pool import get_process_pool, worker_count
+from app.utils.security import get_password_hashes
+
+# 单次上传最多行数  # Most accounts accepted in one upload
+MAX_BULK_ROWS = 10000
+# 每个事务写入的账号数  # Accounts written per transaction
+BATCH_SIZE = 500
+REQUIRED_FIELDS = ("username", "email", "password")
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """bcrypt ``passwords`` across the process pool, in input order."""
+    if not passwords:
+        return []
+    workers = worker_count()
+    # 每个进程分几块，块间负载更均衡  # A few chunks per process to balance load
+    size = max(1, -(-len(passwords) // (workers * 4)))
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, get_password_hashes, passwords[i : i + size])
+            for i in range(0, len(passwords), size)
+        )
+    )
+    return [hashed for chunk in chunks for hashed in chunk]
+
+
+def parse_ndjson(body: str) -> List[dict]:
+    """
+    Parse and validate an upload. Returns one entry per non-blank line:
+    {"line", "row"} when valid, {"line", "status": "invalid", "error"} when not.
+    Raises ValueError when there are more than MAX_BULK_ROWS lines.
+    """
+    entries = []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        if len(entries) >= MAX_BULK_ROWS:
+            raise ValueError(f"At most {MAX_BULK_ROWS} users per upload")
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            entries.append({"line": number, "status": "invalid", "error": "Invalid JSON"})
+            continue
+        error = _validate(row)
+        if error:
+            entries.append({"line": number, "status": "invalid", "error": error})
+        else:
+            entries.append({"line": number, "row": row})
+    return entries
+
+
+def _validate(row) -> Optional[str]:
+    if not isinstance(row, dict):
+        return "Expected a JSON object"
+    for field in REQUIRED_FIELDS:
+        if not isinstance(row.get(field), str) or not row[field].strip():
+            return f"Missing or empty field: {field}"
+    if not isinstance(row.get("role_id"), int) or isinstance(row["role_id"], bool):
+        return "Missing or invalid field: role_id"
+    return None
+
+
+async def provision_users(db: AsyncSession, entries: List[dict]) -> List[dict]:
+    """
+    Create the valid accounts of ``entries`` (from parse_ndjson) with their
+    profiles. Returns one result per entry, in input order.
+    """
+    results: Dict[int, dict] = {}
+    pending = []
+    role_names: Dict[int, Optional[str]] = {}
+    for entry in entries:
+        if "row" not in entry:
+            results[entry["line"]] = entry
+            continue
+        role_id = entry["row"]["role_id"]
+        if role_id not in role_names:
+            role_names[role_id] = await get_role_name(db, role_id)
+        if role_names[role_id] is None:
+            results[entry["line"]] = _result(entry, "invalid", error="无效的角色")
+        else:
+            pending.append(entry)
+
+    # 一次查询找出已存在的用户名和邮箱（不区分大小写）
+    # One query for taken usernames and emails, ignoring case as the
+    # case-insensitive MySQL collation of the unique indexes does
+    taken_names, taken_emails = set(), set()
+    if pending:
+        existing = await db.execute(
+            select(User.username, User.email).where(
+                or_(
+                    func.lower(User.username).in_(
+                        {e["row"]["username"].lower() for e in pending}
+                    ),
+                    func.lower(User.email).in_(
+                        {e["row"]["email"].lower() for e in pending}
+                    ),
+                )
+            )
+        )
+        for username, email in existing.all():
+            taken_names.add(username.lower())
+            taken_emails.add(email.lower())
+
+    accepted = []
+    for entry in pending:
+        username = entry["row"]["username"].lower()
+        email = entry["row"]["email"].lower()
+        if username in taken_names or email in taken_emails:
+            results[entry["line"]] = _result(
+                entry, "duplicate", error="用户名或邮箱已存在"
+            )
+            continue
+        # 上传内部重复也算重复  # Repeats within the upload are duplicates too
+        taken_names.add(username)
+        taken_emails.add(email)
+        accepted.append(entry)
+
+    hashes = await hash_passwords([e["row"]["password"] for e in accepted])
+    for start in range(0, len(accepted), BATCH_SIZE):
+        batch = accepted[start : start + BATCH_SIZE]
+        batch_hashes = hashes[start : start + BATCH_SIZE]
+        try:
+            ids = await _insert_batch(db, batch, batch_hashes, role_names)
+        except IntegrityError:
+            # 预检查之后被并发注册占用：逐个重试，只报告冲突的行
+            # Taken since the pre-check: retry one by one so that only the
+            # colliding rows are reported
+            await db.rollback()
+            for entry, hashed in zip(batch, batch_hashes):
+                results[entry["line"]] = await _insert_one(
+                    db, entry, hashed, role_names
+                )
+            continue
+        for entry in batch:
+            results[entry["line"]] = _result(
+                entry, "created", id=ids[entry["row"]["email"]]
+            )
+
+    return [results[entry["line"]] for entry in entries]
+
+
+async def _insert_one(
+    db: AsyncSession,
+    entry: dict,
+    hashed: str,
+    role_names: Dict[int, Optional[str]],
+) -> dict:
+    try:
+        ids = await _insert_batch(db, [entry], [hashed], role_names)
+    except IntegrityError:
+        await db.rollback()
+        return _result(entry, "duplicate", error="用户名或邮箱已存在")
+    return _result(entry, "created", id=ids[entry["row"]["email"]])
+
+
+async def _insert_batch(
+    db: AsyncSession,
+    batch: List[dict],
+    hashes: List[str],
+    role_names: Dict[int, Optional[str]],
+) -> Dict[str, int]:
+    now = datetime.now(UTC)
+    await db.execute(
+        insert(User),
+        [
+            {
+                "username": e["row"]["username"],
+                "email": e["row"]["email"],
+                "password_hash": hashed,
+                "role_id": e["row"]["role_id"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for e, hashed in zip(batch, hashes)
+        ],
+    )
+    # 多行 INSERT 不返回自增 id，按邮箱取回  # Multi-row INSERT ids, fetched by email
+    result = await db.execute(
+        select(User.email, User.id).where(
+            User.email.in_([e["row"]["email"] for e in batch])
+        )
+    )
+    ids = dict(result.all())
+
+    customers, providers = [], []
+    for entry in batch:
+        role_name = role_names[entry["row"]["role_id"]]
+        user_id = ids[entry["row"]["email"]]
+        if role_name == "customer":
+            customers.append(
+                {
+                    "id": user_id,
+                    "location": LocationEnum.NORTH,
+                    "budget_preference": 0,
+                    "balance": 0,
+                    "ledger_seq": 0,
+                }
+            )
+        elif role_name == "provider":
+            providers.append(
+                {
+                    "id": user_id,
+                    "skills": "",
+                    "experience_years": 0,
+                    "hourly_rate": 0,
+                }
+            )
+    if customers:
+        await db.execute(insert(CustomerProfile), customers)
+    if providers:
+        await db.execute(insert(ProviderProfile), providers)
+    await db.commit()
+    return ids
+
+
+def _result(entry: dict, status: str, **extra) -> dict:
+    result = {
+        "line": entry["line"],
+        "status": status,
+        "email": entry["row"]["email"],
+    }
+    result.update(extra)
+    return result
@@ -0,0 +1,82 @@
+"""
+Reference data held in memory: role ids <-> role names.
+
+Roles are seeded by init_db and practically never change, so they are
+loaded once (at startup, or lazily on first use) instead of being joined
+or queried on every registration and profile read. An unknown id or name
+reloads the table at most once per MISS_RELOAD_SECONDS, so invalid input
+(?role=foo, role_id 99) cannot turn the cache back into a query per
+request; refresh_reference_data (also exposed to admins) picks up a new
+role immediately.
+"""
+
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Role
+
+# 未知角色触发重新加载的最短间隔  # Least time between reloads caused by misses
+MISS_RELOAD_SECONDS = 60.0
+
+
+class RoleCache:
+    """Bidirectional role id/name map."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._by_id: Dict[int, str] = {}
+        self._by_name: Dict[str, int] = {}
+        self.loaded = False
+        self._loaded_at = 0.0
+
+    async def load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Role.id, Role.role_name))
+        rows = result.all()
+        self._by_id = {row.id: row.role_name for row in rows}
+        self._by_name = {row.role_name: row.id for row in rows}
+        self.loaded = True
+        self._loaded_at = time.monotonic()
+
+    async def _ensure(self, db: AsyncSession, found: bool) -> None:
+        """Load on first use; on a miss, reload unless one happened recently."""
+        if not self.loaded or (
+            not found and time.monotonic() - self._loaded_at >= MISS_RELOAD_SECONDS
+        ):
+            await self.load(db)
+
+    async def name(self, db: AsyncSession, role_id: Optional[int]) -> Optional[str]:
+        if role_id is None:
+            return None
+        await self._ensure(db, role_id in self._by_id)
+        return self._by_id.get(role_id)
+
+    async def id(self, db: AsyncSession, role_name: str) -> Optional[int]:
+        await self._ensure(db, role_name in self._by_name)
+        return self._by_name.get(role_name)
+
+    def snapshot(self) -> Dict[int, str]:
+        return dict(self._by_id)
+
+
+role_cache = RoleCache()
+
+
+async def get_role_name(db: AsyncSession, role_id: Optional[int]) -> Optional[str]:
+    """Role name for ``role_id``, None when no such role exists."""
+    return await role_cache.name(db, role_id)
+
+
+async def get_role_id(db: AsyncSession, role_name: str) -> Optional[int]:
+    """Role id for ``role_name``, None when no such role exists."""
+    return await role_cache.id(db, role_name)
+
+
+async def refresh_reference_data(db: AsyncSession) -> Dict[int, str]:
+    """Reload every reference table; returns the role map now in use."""
+    await role_cache.load(db)
+    return role_cache.snapshot()
@@ -0,0 +1,211 @@
+"""
+Materialized provider rating summary.
+
+provider_rating_summary holds one row per provider with the review count,
+the sum of stars and a 1-5 star histogram. It is updated in the same
+transaction that inserts the Review row, so rating reads are a single-row
+lookup instead of AVG/COUNT over every review.
+
+create_review is the single write path for reviews. It inserts first and
+lets the unique reviews.order_id constraint reject duplicates, instead of
+a SELECT-then-INSERT that costs a round trip and still races. Rejections
+are ReviewError subclasses; each endpoint maps them to its own messages.
+"""
+
+from datetime import UTC, datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import (
+    Order,
+    OrderStatus,
+    PaymentStatus,
+    ProviderRatingSummary,
+    Review,
+)
+from app.services.earnings_service import increment_row
+from app.services.leaderboard_service import leaderboard
+
+STAR_VALUES = (1, 2, 3, 4, 5)
+
+# 每条 IN 查询的服务商数  # Provider ids per IN query in batch rating lookups
+RATING_QUERY_CHUNK = 500
+
+
+class ReviewError(ValueError):
+    """Review rejected; status_code is the HTTP status routes should use."""
+
+    status_code = 400
+
+
+class ReviewNotFoundError(ReviewError):
+    status_code = 404
+
+
+class ReviewForbiddenError(ReviewError):
+    status_code = 403
+
+
+class OrderNotCompletedError(ReviewError):
+    pass
+
+
+class OrderNotPaidError(ReviewError):
+    pass
+
+
+class DuplicateReviewError(ReviewError):
+    pass
+
+
+def validate_stars(stars: int) -> None:
+    if stars not in STAR_VALUES:
+        raise ValueError("Stars must be an integer between 1 and 5.")
+
+
+async def record_review(db: AsyncSession, review: Review) -> None:
+    """
+    Apply a new review to its provider's rating summary.
+    Does not commit: the caller commits together with the Review row.
+    """
+    if not review.provider_id:
+        return
+    validate_stars(review.stars)
+    await increment_row(
+        db,
+        ProviderRatingSummary,
+        {"provider_id": review.provider_id},
+        {"review_count": 1, "stars_sum": review.stars, f"stars_{review.stars}": 1},
+        insert_extra={f"stars_{n}": 0 for n in STAR_VALUES if n != review.stars},
+    )
+
+
+async def create_review(
+    db: AsyncSession,
+    customer_id: int,
+    order_id: int,
+    stars: int,
+    content: Optional[str] = None,
+    require_completed: bool = False,
+) -> Review:
+    """
+    Review a paid order owned by ``customer_id`` (and completed, when
+    ``require_completed``), update the provider's rating summary in the same
+    transaction, commit, then re-rank the provider. Raises a ReviewError
+    subclass (a ValueError); notifying the provider is up to the caller.
+    """
+    try:
+        validate_stars(stars)
+    except ValueError as e:
+        raise ReviewError(str(e))
+
+    order = await db.get(Order, order_id)
+    if not order:
+        raise ReviewNotFoundError("Order not found.")
+    if order.customer_id != customer_id:
+        raise ReviewForbiddenError("You can only review your own orders.")
+    if require_completed and order.status != OrderStatus.completed:
+        raise OrderNotCompletedError("You can only review completed orders.")
+    if order.payment_status != PaymentStatus.paid:
+        raise OrderNotPaidError("Only paid orders can be reviewed!")
+
+    review = Review(
+        order_id=order_id,
+        customer_id=customer_id,
+        provider_id=order.provider_id,
+        stars=stars,
+        content=content,
+        created_at=datetime.now(UTC),
+    )
+    # 先插入，由唯一约束拒绝重复评价  # Insert first; the unique order_id rejects duplicates
+    try:
+        async with db.begin_nested():
+            db.add(review)
+            await db.flush()
+    except IntegrityError:
+        raise DuplicateReviewError("Order already reviewed!")
+    # 同一事务内更新评分汇总  # Update the rating summary in the same transaction
+    await record_review(db, review)
+    await db.commit()
+    await db.refresh(review)
+
+    await leaderboard.refresh_provider(db, review.provider_id)
+    return review
+
+
+def summary_to_rating(
+    provider_id: int, summary: Optional[ProviderRatingSummary]
+) -> dict:
+    """Rating payload for a provider, zeros when it has no reviews yet."""
+    count = summary.review_count if summary else 0
+    stars_sum = summary.stars_sum if summary else 0
+    return {
+        "provider_id": provider_id,
+        "average_rating": stars_sum / count if count else 0.0,
+        "total_reviews": count,
+        "histogram": {
+            str(n): (getattr(summary, f"stars_{n}") or 0) if summary else 0
+            for n in STAR_VALUES
+        },
+    }
+
+
+async def get_provider_rating(db: AsyncSession, provider_id: int) -> dict:
+    """Single-row read of a provider's rating summary."""
+    summary = await db.get(ProviderRatingSummary, provider_id)
+    return summary_to_rating(provider_id, summary)
+
+
+async def get_provider_ratings(
+    db: AsyncSession, provider_ids: Iterable[int]
+) -> Dict[int, dict]:
+    """
+    Ratings for many providers from the summary table, keyed by provider
+    id, read RATING_QUERY_CHUNK ids per query so any number of ids is
+    accepted. Providers without reviews get a zero rating.
+    """
+    provider_ids = list(dict.fromkeys(pid for pid in provider_ids if pid is not None))
+    summaries = {}
+    for start in range(0, len(provider_ids), RATING_QUERY_CHUNK):
+        chunk = provider_ids[start:start + RATING_QUERY_CHUNK]
+        result = await db.execute(
+            select(ProviderRatingSummary).where(
+                ProviderRatingSummary.provider_id.in_(chunk)
+            )
+        )
+        summaries.update((s.provider_id, s) for s in result.scalars().all())
+    return {pid: summary_to_rating(pid, summaries.get(pid)) for pid in provider_ids}
+
+
+async def rebuild_provider_ratings(db: AsyncSession) -> int:
+    """
+    Rebuild the whole rating summary table from the reviews table and commit.
+    Returns the number of provider rows written.
+    """
+    await db.execute(delete(ProviderRatingSummary))
+    source = (
+        select(
+            Review.provider_id,
+            func.count(Review.id),
+            func.coalesce(func.sum(Review.stars), 0),
+            *(
+                func.sum(case((Review.stars == n, 1), else_=0))
+                for n in STAR_VALUES
+            ),
+        )
+        .where(Review.provider_id.is_not(None))
+        .group_by(Review.provider_id)
+    )
+    await db.execute(
+        insert(ProviderRatingSummary).from_select(
+            ["provider_id", "review_count", "stars_sum"]
+            + [f"stars_{n}" for n in STAR_VALUES],
+            source,
+        )
+    )
+    await db.commit()
+    result = await db.execute(select(func.count()).select_from(ProviderRatingSummary))
+    return result.scalar() or 0
@@ -0,0 +1,261 @@
+"""
+Import of scanner reports (snyk test --json, bandit -f json, safety check
+--json) into security_issues.
+
+The report is read as it arrives: json_stream yields one finding at a
+time, each is mapped to classifier input, and every INGEST_BATCH_SIZE
+findings are classified together (classification cache, process pool for
+large batches) and written with one executemany upsert: findings already
+stored (same fingerprint) bump the existing issue's occurrence_count
+instead of adding a row. The whole report is one transaction; a malformed
+report stores nothing.
+
+Severity and vulnerability id come from the scanner when it reports them,
+the classifier supplies the rest (type, tags, remediation).
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.models import (
+    SecurityIssueStatus,
+    SecurityIssueType,
+    SecuritySeverity,
+)
+from app.services.batch_classification_service import classify_batch
+from app.services.security_classifier_service import SecurityClassifierService
+from app.services.security_issue_service import (
+    invalidate_issue_statistics,
+    upsert_issues,
+)
+from app.utils.json_stream import iter_array_items
+
+# 每批分类并写入的发现数  # Findings classified and inserted together
+INGEST_BATCH_SIZE = 500
+
+_classifier = SecurityClassifierService()
+
+
+class UnknownReportFormat(ValueError):
+    """No parser for the requested report format."""
+
+
+class ReportTooLarge(ValueError):
+    """The report has more findings than SECURITY_INGEST_MAX_FINDINGS."""
+
+
+def _severity(value) -> Optional[str]:
+    """Scanner severity as a SecuritySeverity name, None when unknown."""
+    if isinstance(value, str) and value.upper() in SecuritySeverity.__members__:
+        return value.upper()
+    return None
+
+
+def _finding(title, description, component, vulnerability_id, severity) -> Dict:
+    return {
+        "title": title[:500],
+        "description": description,
+        "component": component[:500],
+        "vulnerability_id": vulnerability_id[:100] if vulnerability_id else None,
+        "severity": _severity(severity),
+    }
+
+
+def parse_snyk(item) -> Optional[Dict]:
+    """One entry of snyk's "vulnerabilities" array."""
+    if not isinstance(item, dict) or not item.get("title"):
+        return None
+    package = f"{item.get('packageName', '')}@{item.get('version', '')}"
+    identifiers = item.get("identifiers") or {}
+    ids = (identifiers.get("CVE") or []) + (identifiers.get("GHSA") or [])
+    description = (
+        f"Vulnerable package {package} ({item.get('packageManager', '')}). "
+        f"{item.get('description') or ''}"
+    )
+    return _finding(
+        f"{item['title']} in {package}",
+        description,
+        package,
+        ids[0] if ids else item.get("id"),
+        item.get("severity"),
+    )
+
+
+def parse_bandit(item) -> Optional[Dict]:
+    """One entry of bandit's "results" array."""
+    if not isinstance(item, dict) or not item.get("issue_text"):
+        return None
+    cwe = (item.get("issue_cwe") or {}).get("id")
+    location = f"{item.get('filename', '')}:{item.get('line_number', '')}"
+    description = (
+        f"Static analysis finding ({item.get('test_id', '')} "
+        f"{item.get('test_name', '')}): {item['issue_text']} at {location}\n"
+        f"{item.get('code') or ''}"
+    )
+    # 组件带行号：同一文件中同一 CWE 的不同位置是不同的问题
+    # The line is part of the component so that findings of one CWE at
+    # different places in a file stay separate issues
+    return _finding(
+        item["issue_text"],
+        description,
+        location,
+        f"CWE-{cwe}" if cwe else item.get("test_id"),
+        item.get("issue_severity"),
+    )
+
+
+def parse_safety(item) -> Optional[Dict]:
+    """
+    One entry of safety's "vulnerabilities" array, or one
+    [package, spec, version, advisory, id, ...] row of the 1.x format.
+    """
+    if isinstance(item, list) and len(item) >= 5:
+        package, spec, version, advisory, vuln_id = item[:5]
+        cve, severity = None, None
+    elif isinstance(item, dict) and item.get("package_name"):
+        package = item["package_name"]
+        spec = item.get("vulnerable_spec", "")
+        version = item.get("analyzed_version", "")
+        advisory = item.get("advisory", "")
+        vuln_id = item.get("vulnerability_id", "")
+        cve = item.get("CVE")
+        cvss = (item.get("severity") or {}).get("cvssv3") or {}
+        severity = cvss.get("base_severity")
+    else:
+        return None
+    component = f"{package}@{version}"
+    return _finding(
+        f"Vulnerable package {component} ({vuln_id})",
+        f"Vulnerable package {package} {version}, affected {spec}. {advisory}",
+        component,
+        cve or (f"PYUP-{vuln_id}" if vuln_id else None),
+        severity,
+    )
+
+
+class ReportFormat(NamedTuple):
+    tool: str
+    # 发现所在数组的键  # Key of the array holding the findings
+    key: str
+    parse: Callable[[object], Optional[Dict]]
+
+
+REPORT_FORMATS: Dict[str, ReportFormat] = {
+    "snyk": ReportFormat("Snyk", "vulnerabilities", parse_snyk),
+    "bandit": ReportFormat("Bandit", "results", parse_bandit),
+    "safety": ReportFormat("Safety", "vulnerabilities", parse_safety),
+}
+
+
+async def ingest_report(
+    db: AsyncSession,
+    report_format: str,
+    chunks: AsyncIterator[bytes],
+    reported_by: int,
+) -> Dict:
+    """
+    Classify and store every finding of the report read from ``chunks``.
+
+    Returns a summary: findings read, new issues inserted, findings merged
+    into existing issues, entries skipped as unusable, and the stored
+    findings by type and severity. Raises
+    UnknownReportFormat, ReportTooLarge, json_stream.JSONStreamError or
+    batch_classification_service.BatchTimeBudgetExceeded; nothing is stored
+    in those cases.
+    """
+    fmt = REPORT_FORMATS.get(report_format)
+    if fmt is None:
+        raise UnknownReportFormat(f"Unknown report format: {report_format}")
+
+    summary = {
+        "format": report_format,
+        "findings": 0,
+        "inserted": 0,
+        "merged": 0,
+        "skipped": 0,
+        "by_type": {},
+        "by_severity": {},
+    }
+    limit = settings.SECURITY_INGEST_MAX_FINDINGS
+    batch: List[Dict] = []
+    try:
+        async for item in iter_array_items(chunks, fmt.key):
+            summary["findings"] += 1
+            if summary["findings"] > limit:
+                raise ReportTooLarge(f"At most {limit} findings per report")
+            finding = fmt.parse(item)
+            if finding is None:
+                summary["skipped"] += 1
+                continue
+            batch.append(finding)
+            if len(batch) >= INGEST_BATCH_SIZE:
+                await _insert_batch(db, batch, fmt, reported_by, summary)
+                batch = []
+        if batch:
+            await _insert_batch(db, batch, fmt, reported_by, summary)
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    if summary["inserted"] or summary["merged"]:
+        invalidate_issue_statistics()
+    return summary
+
+
+async def _insert_batch(
+    db: AsyncSession,
+    findings: List[Dict],
+    fmt: ReportFormat,
+    reported_by: int,
+    summary: Dict,
+) -> None:
+    rows = await classify_batch(
+        [
+            {
+                "title": f["title"],
+                "description": f["description"],
+                "component": f["component"],
+            }
+            for f in findings
+        ]
+    )
+    now = datetime.utcnow()
+    values = []
+    for finding, row in zip(findings, rows):
+        if finding["severity"]:
+            row = _classifier.apply_severity(
+                row, finding["severity"], finding["title"], finding["component"]
+            )
+        values.append(
+            {
+                "title": finding["title"],
+                "description": finding["description"],
+                "affected_component": finding["component"] or None,
+                "issue_type": SecurityIssueType[row["issue_type"]],
+                "severity": SecuritySeverity[row["severity"]],
+                "confidence_score": Decimal(str(row["confidence_score"])),
+                "vulnerability_id": finding["vulnerability_id"]
+                or row["vulnerability_id"],
+                "detection_method": f"{fmt.tool} report",
+                "tags": json.dumps(row["tags"]),
+                "remediation_suggestion": row["remediation_suggestion"],
+                "remediation_priority": row["remediation_priority"],
+                "estimated_effort": row["estimated_effort"],
+                "status": SecurityIssueStatus.OPEN,
+                "reported_by": reported_by,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        by_type, by_severity = summary["by_type"], summary["by_severity"]
+        by_type[row["issue_type"]] = by_type.get(row["issue_type"], 0) + 1
+        by_severity[row["severity"]] = by_severity.get(row["severity"], 0) + 1
+
+    new = await upsert_issues(db, values)
+    summary["inserted"] += new
+    summary["merged"] += len(values) - new
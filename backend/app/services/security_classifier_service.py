@@ -3,10 +3,23 @@ AI-powered Security Issue Classifier Service
 Classifies security testing issues (SCA, SAST, DAST) and provides remediation suggestions
 """
 
+import hashlib
 import json
 import re
 from decimal import Decimal
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from app.utils.cache import TTLCache
+
+# Scanners re-report the same findings every run, so results are cached by
+# a hash of the inputs and the rule set version (see classification_key)
+CLASSIFICATION_CACHE = "classifications"
+CLASSIFICATION_CACHE_SIZE = 10_000
+CLASSIFICATION_CACHE_TTL = 24 * 3600
+
+classification_cache = TTLCache(
+    CLASSIFICATION_CACHE, CLASSIFICATION_CACHE_SIZE, CLASSIFICATION_CACHE_TTL
+)
 
 
 class SecurityClassifierService:
@@ -127,6 +140,22 @@ class SecurityClassifierService:
         "INFO": ["info", "informational", "notice", "suggestion"],
     }
 
+    # Vulnerability id patterns, tried in order
+    VULN_ID_PATTERNS = [r"CVE-\d{4}-\d+", r"(GHSA|OSV)-[\w-]+"]
+
+    # Common security tags: keyword -> tag
+    TAG_KEYWORDS = {
+        "injection": "injection",
+        "xss": "xss",
+        "authentication": "auth",
+        "authorization": "authz",
+        "cryptography": "crypto",
+        "dependency": "dependencies",
+        "configuration": "config",
+        "api": "api",
+        "web": "web",
+    }
+
     # Remediation templates
     REMEDIATION_TEMPLATES = {
         "SCA": {
@@ -155,6 +184,9 @@ class SecurityClassifierService:
         """
         Classify a security issue using AI-based pattern matching
 
+        Results are served from the classification cache when the same
+        issue was classified before under the same rule set.
+
         Args:
             title: Issue title
             description: Issue description
@@ -163,24 +195,62 @@ class SecurityClassifierService:
         Returns:
             Dictionary with classification results
         """
+        key = self.classification_key(title, description, affected_component)
+        result = classification_cache.get(key)
+        if result is None:
+            result = self.classify_issue_uncached(
+                title, description, affected_component
+            )
+            classification_cache.set(key, result)
+        return dict(result)
+
+    def ruleset_version(self) -> str:
+        """Version of the rule set; changes whenever a rule changes"""
+        return self._rules().version
+
+    def classification_key(
+        self, title: str, description: str, affected_component: str = ""
+    ) -> str:
+        """
+        Cache key of an issue: a hash of the rule set version and the
+        normalized inputs. Classification reads the lowercased combined
+        text, the lowercased title and the component as given, so issues
+        with equal keys always classify the same way.
+        """
+        combined_text = f"{title} {description} {affected_component}".lower()
+        parts = [
+            self.ruleset_version(),
+            combined_text,
+            title.lower(),
+            affected_component,
+        ]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def classify_issue_uncached(
+        self, title: str, description: str, affected_component: str = ""
+    ) -> Dict:
+        """Classify a security issue without consulting the cache"""
         combined_text = f"{title} {description} {affected_component}".lower()
 
+        # One scan of the compiled rule set finds every keyword and pattern hit
+        hits = self._rules().scan(combined_text)
+
         # Calculate scores for each type
-        sca_score = self._calculate_type_score(combined_text, self.SCA_PATTERNS)
-        sast_score = self._calculate_type_score(combined_text, self.SAST_PATTERNS)
-        dast_score = self._calculate_type_score(combined_text, self.DAST_PATTERNS)
+        sca_score = self._calculate_type_score(hits, self.SCA_PATTERNS)
+        sast_score = self._calculate_type_score(hits, self.SAST_PATTERNS)
+        dast_score = self._calculate_type_score(hits, self.DAST_PATTERNS)
 
         # Determine issue type and confidence
         issue_type, confidence = self._determine_type(sca_score, sast_score, dast_score)
 
         # Determine severity
-        severity = self._determine_severity(combined_text)
+        severity = self._determine_severity(hits)
 
         # Extract vulnerability details
-        vuln_id = self._extract_vulnerability_id(combined_text)
+        vuln_id = self._extract_vulnerability_id(hits)
 
         # Generate tags
-        tags = self._generate_tags(combined_text, issue_type)
+        tags = self._generate_tags(hits, issue_type)
 
         # Generate remediation suggestion
         remediation = self._generate_remediation(
@@ -205,19 +275,45 @@ class SecurityClassifierService:
             "detection_method": "AI Pattern Matching",
         }
 
-    def _calculate_type_score(self, text: str, patterns: Dict) -> float:
+    def apply_severity(
+        self, result: Dict, severity: str, title: str, affected_component: str = ""
+    ) -> Dict:
+        """
+        Copy of a classification result with a severity rated elsewhere (for
+        example by a scanner), and the remediation, priority and effort that
+        follow from it
+        """
+        confidence = float(result["confidence_score"])
+        return {
+            **result,
+            "severity": severity,
+            "remediation_suggestion": self._generate_remediation(
+                result["issue_type"], severity, title, affected_component
+            ),
+            "remediation_priority": self._calculate_priority(severity, confidence),
+            "estimated_effort": self._estimate_effort(severity, result["issue_type"]),
+        }
+
+    @classmethod
+    def _rules(cls) -> "CompiledRules":
+        """The rule set compiled once per class"""
+        rules = cls.__dict__.get("_compiled_rules")
+        if rules is None:
+            rules = CompiledRules(cls)
+            cls._compiled_rules = rules
+        return rules
+
+    def _calculate_type_score(self, hits: "RuleHits", patterns: Dict) -> float:
         """Calculate matching score for a specific issue type"""
         score = 0.0
 
         # Keyword matching
-        keyword_matches = sum(1 for kw in patterns["keywords"] if kw in text)
+        keyword_matches = sum(1 for kw in patterns["keywords"] if kw in hits.keywords)
         score += keyword_matches * 2
 
         # Pattern matching (regex)
         pattern_matches = sum(
-            1
-            for pattern in patterns["indicators"]
-            if re.search(pattern, text, re.IGNORECASE)
+            1 for pattern in patterns["indicators"] if hits.matches[pattern]
         )
         score += pattern_matches * 3
 
@@ -247,45 +343,28 @@ class SecurityClassifierService:
         else:
             return "DAST", confidence
 
-    def _determine_severity(self, text: str) -> str:
+    def _determine_severity(self, hits: "RuleHits") -> str:
         """Determine severity based on keywords"""
         for severity, keywords in self.SEVERITY_KEYWORDS.items():
-            if any(kw in text for kw in keywords):
+            if any(kw in hits.keywords for kw in keywords):
                 return severity
         return "MEDIUM"  # Default
 
-    def _extract_vulnerability_id(self, text: str) -> str:
-        """Extract CVE or vulnerability ID"""
-        cve_match = re.search(r"CVE-\d{4}-\d+", text, re.IGNORECASE)
-        if cve_match:
-            return cve_match.group(0).upper()
-
-        # Look for other common vulnerability IDs (GHSA, OSV)
-        vuln_match = re.search(r"(GHSA|OSV)-[\w-]+", text, re.IGNORECASE)
-        if vuln_match:
-            return vuln_match.group(0).upper()
+    def _extract_vulnerability_id(self, hits: "RuleHits") -> str:
+        """Extract CVE or vulnerability ID (GHSA, OSV)"""
+        for pattern in self.VULN_ID_PATTERNS:
+            match = hits.matches[pattern]
+            if match:
+                return match.group(0).upper()
 
         return None
 
-    def _generate_tags(self, text: str, issue_type: str) -> List[str]:
+    def _generate_tags(self, hits: "RuleHits", issue_type: str) -> List[str]:
         """Generate relevant tags for the issue"""
         tags = [issue_type]
 
-        # Common security tags
-        tag_keywords = {
-            "injection": "injection",
-            "xss": "xss",
-            "authentication": "auth",
-            "authorization": "authz",
-            "cryptography": "crypto",
-            "dependency": "dependencies",
-            "configuration": "config",
-            "api": "api",
-            "web": "web",
-        }
-
-        for keyword, tag in tag_keywords.items():
-            if keyword in text:
+        for keyword, tag in self.TAG_KEYWORDS.items():
+            if keyword in hits.keywords:
                 tags.append(tag)
 
         return list(set(tags))  # Remove duplicates
@@ -396,3 +475,92 @@ class SecurityClassifierService:
             )
             / total,
         }
+
+
+class RuleHits(NamedTuple):
+    """Keywords found in a text, and the first match of every pattern"""
+
+    keywords: Set[str]
+    matches: Dict[str, Optional[re.Match]]
+
+
+class CompiledRules:
+    """
+    Keyword and regex rules of a classifier, compiled for a single scan
+
+    Keywords shared by the type, severity and tag rules are tested once.
+    Plain substring tests run in C; on issue-sized text they beat both a
+    pure-Python Aho-Corasick automaton and one regex alternating every
+    keyword (which also misses overlapping keywords).
+
+    Every distinct pattern is compiled once and searched once per text;
+    the CVE indicator and the CVE id extraction share one search. The
+    patterns are written for case-insensitive matching of lowercased text.
+    For ASCII text that is the same as a case-sensitive search with
+    lowercased literals, which lets the regex engine use its fast literal
+    prefix scan, so that variant is used whenever the text is ASCII.
+    """
+
+    def __init__(self, classifier: type):
+        # Changes whenever a rule or remediation template changes, so cached
+        # classifications made under other rules are never served
+        rules = {
+            name: getattr(classifier, name)
+            for name in (
+                "SCA_PATTERNS",
+                "SAST_PATTERNS",
+                "DAST_PATTERNS",
+                "SEVERITY_KEYWORDS",
+                "VULN_ID_PATTERNS",
+                "TAG_KEYWORDS",
+                "REMEDIATION_TEMPLATES",
+            )
+        }
+        self.version = hashlib.sha256(
+            json.dumps(rules, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+        keyword_sets = [
+            classifier.SCA_PATTERNS["keywords"],
+            classifier.SAST_PATTERNS["keywords"],
+            classifier.DAST_PATTERNS["keywords"],
+            list(classifier.TAG_KEYWORDS),
+            *classifier.SEVERITY_KEYWORDS.values(),
+        ]
+        self.keywords = sorted({kw for kws in keyword_sets for kw in kws})
+
+        patterns = list(
+            dict.fromkeys(
+                classifier.SCA_PATTERNS["indicators"]
+                + classifier.SAST_PATTERNS["indicators"]
+                + classifier.DAST_PATTERNS["indicators"]
+                + classifier.VULN_ID_PATTERNS
+            )
+        )
+        self.unicode_patterns = [
+            (pattern, re.compile(pattern, re.IGNORECASE)) for pattern in patterns
+        ]
+        self.ascii_patterns = [
+            (pattern, re.compile(_lowercase_literals(pattern))) for pattern in patterns
+        ]
+
+    def scan(self, text: str) -> RuleHits:
+        """Scan lowercased ``text`` for every keyword and pattern"""
+        found = {keyword for keyword in self.keywords if keyword in text}
+        compiled = self.ascii_patterns if text.isascii() else self.unicode_patterns
+        matches = {pattern: regex.search(text) for pattern, regex in compiled}
+        return RuleHits(found, matches)
+
+
+def _lowercase_literals(pattern: str) -> str:
+    """Lowercase a regex, leaving escapes such as \\D or \\W untouched"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            out.append(pattern[i : i + 2])
+            i += 2
+        else:
+            out.append(pattern[i].lower())
+            i += 1
+    return "".join(out)
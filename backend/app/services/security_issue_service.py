@@ -0,0 +1,277 @@
+"""
+Queries over stored security issues.
+
+Statistics come from a single GROUP BY over (issue_type, severity, status):
+at most a few dozen rows travel back however many issues are stored, and
+the covering index ix_security_issues_stats lets the database aggregate
+from the index without touching the table rows. The result is reused for
+settings.SECURITY_STATS_CACHE_SECONDS (0 disables the cache) and dropped
+as soon as this worker creates, updates or deletes an issue; changes made
+by other workers show up when the entry expires.
+
+Issues are written with upsert_issues: a unique index on the fingerprint
+(vulnerability id plus affected component) turns a repeated report into
+an update of occurrence_count and last_seen instead of a new row.
+
+SecurityIssue.tags stays the JSON list the classifier produced. Each new
+issue's tags are also written, in the same transaction, to the normalized
+security_issue_tags table, so responses, the tag filter and tag counts
+read indexed rows instead of parsing JSON per issue.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.models import (
+    SecurityIssue,
+    SecurityIssueTag,
+    security_issue_fingerprint,
+)
+from app.utils.cache import TTLCache
+
+SECURITY_STATS_CACHE = "security-stats"
+_STATS_KEY = "all"
+# 标签最大长度  # Longest tag stored
+MAX_TAG_LENGTH = 50
+# 重建时每批读取的问题数  # Issues read per rebuild batch
+REBUILD_BATCH = 1000
+
+stats_cache = TTLCache(
+    SECURITY_STATS_CACHE, maxsize=1, ttl=settings.SECURITY_STATS_CACHE_SECONDS
+)
+
+
+async def upsert_issues(db: AsyncSession, values: List[Dict]) -> int:
+    """
+    Insert ``values`` (dicts of SecurityIssue columns) with one executemany.
+    A row whose fingerprint already exists, in the table or earlier in
+    ``values``, instead adds one to that issue's occurrence_count and moves
+    its last_seen. Fills in fingerprint and last_seen on each dict; returns
+    how many distinct fingerprints were new. Does not commit.
+    """
+    now = datetime.utcnow()
+    for row in values:
+        row.setdefault(
+            "fingerprint",
+            security_issue_fingerprint(
+                row.get("vulnerability_id"),
+                row.get("affected_component"),
+                row.get("title"),
+            ),
+        )
+        row.setdefault("last_seen", now)
+        row.setdefault("updated_at", now)
+    fingerprints = {row["fingerprint"] for row in values}
+    existing = await db.scalars(
+        select(SecurityIssue.fingerprint).where(
+            SecurityIssue.fingerprint.in_(fingerprints)
+        )
+    )
+    new_fingerprints = fingerprints.difference(existing)
+
+    if _is_mysql(db):
+        stmt = mysql_insert(SecurityIssue)
+        incoming = stmt.inserted
+        stmt = stmt.on_duplicate_key_update(
+            occurrence_count=SecurityIssue.occurrence_count + 1,
+            last_seen=incoming.last_seen,
+            updated_at=incoming.updated_at,
+        )
+    else:
+        # 测试数据库 SQLite  # SQLite, the test database
+        stmt = sqlite_insert(SecurityIssue)
+        incoming = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SecurityIssue.fingerprint],
+            set_={
+                "occurrence_count": SecurityIssue.occurrence_count + 1,
+                "last_seen": incoming.last_seen,
+                "updated_at": incoming.updated_at,
+            },
+        )
+    await db.execute(stmt, values)
+    if new_fingerprints:
+        await _insert_new_issue_tags(db, values, new_fingerprints)
+    return len(new_fingerprints)
+
+
+def _is_mysql(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+async def _insert_new_issue_tags(
+    db: AsyncSession, values: List[Dict], fingerprints: set
+) -> None:
+    # 同一批中先到的行被插入  # The first row of a fingerprint is the one inserted
+    first: Dict[str, Dict] = {}
+    for row in values:
+        first.setdefault(row["fingerprint"], row)
+    result = await db.execute(
+        select(SecurityIssue.fingerprint, SecurityIssue.id).where(
+            SecurityIssue.fingerprint.in_(fingerprints)
+        )
+    )
+    tag_values = [
+        {"issue_id": issue_id, "tag": tag}
+        for fingerprint, issue_id in result.all()
+        for tag in normalize_tags(first[fingerprint].get("tags"))
+    ]
+    if not tag_values:
+        return
+    # 并发写入同一新问题时忽略重复标签
+    # A concurrent writer may have tagged the same new issue already
+    if _is_mysql(db):
+        stmt = mysql_insert(SecurityIssueTag).prefix_with("IGNORE")
+    else:
+        stmt = sqlite_insert(SecurityIssueTag).on_conflict_do_nothing()
+    await db.execute(stmt, tag_values)
+
+
+def normalize_tags(tags: Optional[str]) -> List[str]:
+    """JSON tag list text to the sorted, distinct rows of security_issue_tags."""
+    try:
+        parsed = json.loads(tags) if tags else []
+    except ValueError:
+        return []
+    if not isinstance(parsed, list):
+        return []
+    return sorted(
+        {str(tag).strip()[:MAX_TAG_LENGTH] for tag in parsed if str(tag).strip()}
+    )
+
+
+async def load_issue_tags(
+    db: AsyncSession, issue_ids: Iterable[int]
+) -> Dict[int, List[str]]:
+    """Tags of each of ``issue_ids`` in one query; issues without tags map to []."""
+    tags: Dict[int, List[str]] = {issue_id: [] for issue_id in issue_ids}
+    if not tags:
+        return tags
+    result = await db.execute(
+        select(SecurityIssueTag.issue_id, SecurityIssueTag.tag)
+        .where(SecurityIssueTag.issue_id.in_(list(tags)))
+        .order_by(SecurityIssueTag.issue_id, SecurityIssueTag.tag)
+    )
+    for issue_id, tag in result.all():
+        tags[issue_id].append(tag)
+    return tags
+
+
+async def get_tag_counts(db: AsyncSession, conditions: List = ()) -> List[Dict]:
+    """
+    Number of issues per tag, most used first. ``conditions`` (filters on
+    SecurityIssue columns) restrict the issues counted.
+    """
+    count = func.count().label("count")
+    query = (
+        select(SecurityIssueTag.tag, count)
+        .group_by(SecurityIssueTag.tag)
+        .order_by(count.desc(), SecurityIssueTag.tag)
+    )
+    if conditions:
+        query = query.join(
+            SecurityIssue, SecurityIssue.id == SecurityIssueTag.issue_id
+        ).where(*conditions)
+    result = await db.execute(query)
+    return [{"tag": tag, "count": n} for tag, n in result.all()]
+
+
+async def delete_issue_tags(db: AsyncSession, issue_id: int) -> None:
+    """Remove the tag rows of ``issue_id``; call before deleting the issue."""
+    await db.execute(
+        delete(SecurityIssueTag).where(SecurityIssueTag.issue_id == issue_id)
+    )
+
+
+async def rebuild_security_issue_tags(db: AsyncSession) -> int:
+    """
+    Rebuild security_issue_tags from every SecurityIssue.tags and commit.
+    Returns the number of tag rows written.
+    """
+    await db.execute(delete(SecurityIssueTag))
+    last_id, total = 0, 0
+    while True:
+        result = await db.execute(
+            select(SecurityIssue.id, SecurityIssue.tags)
+            .where(SecurityIssue.id > last_id)
+            .order_by(SecurityIssue.id)
+            .limit(REBUILD_BATCH)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        values = [
+            {"issue_id": row.id, "tag": tag}
+            for row in rows
+            for tag in normalize_tags(row.tags)
+        ]
+        if values:
+            await db.execute(insert(SecurityIssueTag), values)
+        total += len(values)
+        last_id = rows[-1].id
+    await db.commit()
+    return total
+
+
+def invalidate_issue_statistics() -> None:
+    """Drop the cached statistics after this worker changed an issue."""
+    stats_cache.invalidate(_STATS_KEY)
+
+
+async def get_issue_statistics(db: AsyncSession) -> Dict:
+    """
+    Issue counts by type, severity and status, plus the total and the
+    average confidence (rounded to 2 places). Empty table: zero counts and
+    empty distributions.
+    """
+    use_cache = stats_cache.ttl > 0
+    if use_cache:
+        cached = stats_cache.get(_STATS_KEY)
+        if cached is not None:
+            return _copy(cached)
+
+    result = await db.execute(
+        select(
+            SecurityIssue.issue_type,
+            SecurityIssue.severity,
+            SecurityIssue.status,
+            func.count(),
+            func.sum(SecurityIssue.confidence_score),
+        ).group_by(
+            SecurityIssue.issue_type, SecurityIssue.severity, SecurityIssue.status
+        )
+    )
+    total = 0
+    total_confidence = 0.0
+    by_type: Dict[str, int] = {}
+    by_severity: Dict[str, int] = {}
+    by_status: Dict[str, int] = {}
+    for issue_type, severity, issue_status, count, confidence in result.all():
+        total += count
+        total_confidence += float(confidence or 0)
+        by_type[issue_type.value] = by_type.get(issue_type.value, 0) + count
+        by_severity[severity.value] = by_severity.get(severity.value, 0) + count
+        if issue_status is not None:
+            by_status[issue_status.value] = by_status.get(issue_status.value, 0) + count
+
+    stats = {
+        "total": total,
+        "by_type": by_type,
+        "by_severity": by_severity,
+        "by_status": by_status,
+        "avg_confidence": round(total_confidence / total, 2) if total else 0.0,
+    }
+    if use_cache:
+        stats_cache.set(_STATS_KEY, stats)
+    return _copy(stats)
+
+
+def _copy(stats: Dict) -> Dict:
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in stats.items()}
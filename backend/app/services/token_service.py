@@ -0,0 +1,244 @@
+"""
+Access token revocation and refresh token rotation.
+
+Every access token carries a ``jti``. Logging out stores that jti in
+revoked_tokens until the token would have expired anyway. Each worker keeps
+the unexpired revoked ids in memory, so get_current_user checks revocation
+with a dict lookup and no database query:
+
+- the worker that revokes a token adds it to its own set immediately;
+- revocation_sync_loop (started with the app) pulls rows revoked by other
+  workers every REVOCATION_SYNC_SECONDS, reading only rows it has not seen.
+
+Only tokens revoked within their short lifetime are kept, so the set stays
+small enough that a plain dict beats a Bloom filter (no false positives,
+nothing to rebuild). Tokens issued before jti was added cannot be revoked
+and simply expire.
+
+Refresh tokens are opaque random strings stored as SHA-256 hashes. Each
+login starts a family; /auth/refresh exchanges a token for a new one in
+the same family and marks the old one used. Presenting a used token again
+means it was copied, so the whole family is revoked and its holder has to
+log in again.
+"""
+
+import asyncio
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import RefreshToken, RevokedToken, User
+from app.utils.ids import uuid7
+
+# 其他进程撤销的令牌多久同步一次  # How often revocations from other workers are pulled
+REVOCATION_SYNC_SECONDS = 5
+# 自增 id 在提交前分配，重读最近的撤销以免漏掉晚提交的行
+# Ids are allocated before commit, so recent rows are re-read for late commits
+SYNC_LOOKBACK = timedelta(seconds=30)
+# 刷新令牌有效期  # Refresh token lifetime
+REFRESH_TOKEN_EXPIRE_DAYS = 14
+
+
+class RevocationSet:
+    """Unexpired revoked jtis of this worker, jti -> expiry (epoch seconds)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._revoked: Dict[str, float] = {}
+        self.last_id: Optional[int] = None
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        self._revoked[jti] = _epoch(expires_at)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def prune(self) -> int:
+        now = time.time()
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocations = RevocationSet()
+
+
+def _epoch(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+async def revoke_token(
+    db: AsyncSession, jti: str, user_id: int, expires_at: datetime
+) -> None:
+    """
+    Revoke ``jti`` until ``expires_at`` (naive UTC) and commit. Revoking an
+    already revoked token is a no-op.
+    """
+    try:
+        async with db.begin_nested():
+            db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            await db.flush()
+    except IntegrityError:
+        pass  # 已撤销  # Already revoked
+    await db.commit()
+    revocations.add(jti, expires_at)
+
+
+async def sync_revocations(db: AsyncSession) -> int:
+    """
+    Load revocations this worker has not seen yet; the first call loads
+    every unexpired one. Returns the number of rows read.
+    """
+    now = datetime.utcnow()
+    query = select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).where(
+        RevokedToken.expires_at > now
+    )
+    if revocations.last_id is not None:
+        query = query.where(
+            or_(
+                RevokedToken.id > revocations.last_id,
+                RevokedToken.revoked_at >= now - SYNC_LOOKBACK,
+            )
+        )
+    rows = (await db.execute(query)).all()
+    for row in rows:
+        revocations.add(row.jti, row.expires_at)
+    if rows:
+        revocations.last_id = max(revocations.last_id or 0, max(r.id for r in rows))
+    elif revocations.last_id is None:
+        revocations.last_id = 0
+    revocations.prune()
+    return len(rows)
+
+
+async def revocation_sync_loop(session_factory, interval: float = None) -> None:
+    """Keep this worker's revocation set in step; run as a background task."""
+    while True:
+        try:
+            async with session_factory() as db:
+                await sync_revocations(db)
+        except Exception as e:
+            print(f"⚠️  令牌撤销同步失败 // Token revocation sync failed: {e}")
+        await asyncio.sleep(interval or REVOCATION_SYNC_SECONDS)
+
+
+async def purge_expired_revocations(db: AsyncSession) -> int:
+    """Delete revocations of tokens that have expired anyway, and commit."""
+    result = await db.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+class RefreshTokenError(ValueError):
+    """Refresh token rejected; the client has to log in again."""
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(
+    db: AsyncSession, user_id: int, family_id: Optional[str] = None
+) -> str:
+    """
+    Add a refresh token for ``user_id`` (a new family unless ``family_id``)
+    and return it in clear text; only its hash is stored. Does not commit.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            family_id=family_id or str(uuid7()),
+            token_hash=_hash_token(token),
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def _revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[int, int, str]:
+    """
+    Exchange ``token`` for a new refresh token in the same family and
+    commit. Returns (user_id, role_id, new_token). Raises RefreshTokenError
+    for unknown, expired or revoked tokens, and revokes the family when a
+    token is used twice.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(
+            RefreshToken.id,
+            RefreshToken.user_id,
+            RefreshToken.family_id,
+            RefreshToken.expires_at,
+            RefreshToken.used_at,
+            RefreshToken.revoked_at,
+            User.role_id,
+        )
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == _hash_token(token))
+    )
+    row = result.first()
+    if row is None or row.revoked_at is not None or row.expires_at <= now:
+        raise RefreshTokenError("Invalid refresh token")
+
+    # 原子地标记为已使用，并发重放只有一个能成功
+    # Mark used atomically so only one of two concurrent uses wins
+    marked = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    )
+    if row.used_at is not None or not marked.rowcount:
+        await _revoke_family(db, row.family_id)
+        await db.commit()
+        raise RefreshTokenError("Refresh token reuse detected")
+
+    new_token = issue_refresh_token(db, row.user_id, row.family_id)
+    await db.commit()
+    return row.user_id, row.role_id, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """Revoke the family of ``token`` (logout) and commit; False if unknown."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == _hash_token(token)
+        )
+    )
+    family_id = result.scalar()
+    if family_id is None:
+        return False
+    await _revoke_family(db, family_id)
+    await db.commit()
+    return True
+
+
+async def purge_expired_refresh_tokens(db: AsyncSession) -> int:
+    """Delete expired refresh tokens and commit."""
+    result = await db.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at <= datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount or 0
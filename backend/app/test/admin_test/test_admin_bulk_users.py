@@ -0,0 +1,149 @@
+# app/test/admin_test/test_admin_bulk_users.py
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.models import CustomerProfile, ProviderProfile, User
+from app.services import provisioning_service
+from app.services.provisioning_service import parse_ndjson, provision_users
+from app.utils.process_pool import shutdown_process_pool
+
+
+@pytest.fixture(scope="module", autouse=True)
+def hash_pool():
+    yield
+    shutdown_process_pool()
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def ndjson(*rows):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows)
+
+
+def account(name, role_id=1):
+    return {
+        "username": name,
+        "email": f"{name}@test.com",
+        "password": "secret123",
+        "role_id": role_id,
+    }
+
+
+class TestBulkProvisioning:
+    """批量创建用户测试"""
+
+    def test_route_reports_each_line(self, client, admin_token, customer_user):
+        """测试逐行返回创建、重复与无效结果"""
+        body = ndjson(
+            account("amy"),
+            account("ben", role_id=2),
+            "{not json",
+            "",
+            {"username": "cat", "email": "cat@test.com", "role_id": 1},
+            account("dan", role_id=99),
+            {"username": "eve", "email": "customer@test.com", "password": "x", "role_id": 1},
+            account("amy"),
+        )
+        response = client.post(
+            "/admin/users/bulk",
+            content=body,
+            headers={**auth(admin_token), "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["duplicates"], data["invalid"]) == (2, 2, 3)
+        assert [(r["line"], r["status"]) for r in data["results"]] == [
+            (1, "created"),
+            (2, "created"),
+            (3, "invalid"),
+            (5, "invalid"),
+            (6, "invalid"),
+            (7, "duplicate"),
+            (8, "duplicate"),
+        ]
+
+        # 新用户可以登录，且带有对应资料  # New users can log in and have profiles
+        token = client.post(
+            "/auth/login", json={"email": "ben@test.com", "password": "secret123"}
+        ).json()["access_token"]
+        assert client.get("/profile/me", headers=auth(token)).json()["role"] == "provider"
+
+    @pytest.mark.asyncio
+    async def test_batches_and_profiles(self, db_session, monkeypatch):
+        """测试分批写入，用户与资料数量一致"""
+        monkeypatch.setattr(provisioning_service, "BATCH_SIZE", 3)
+        rows = [account(f"user{i}", role_id=1 + i % 2) for i in range(7)]
+        results = await provision_users(db_session, parse_ndjson(ndjson(*rows)))
+        assert {r["status"] for r in results} == {"created"}
+        assert len({r["id"] for r in results}) == 7
+
+        async def count(model):
+            return (await db_session.execute(select(func.count()).select_from(model))).scalar()
+
+        assert await count(User) == 7
+        assert await count(CustomerProfile) == 4
+        assert await count(ProviderProfile) == 3
+
+    @pytest.mark.asyncio
+    async def test_duplicates_ignore_case(self, db_session, customer_user):
+        """测试用户名和邮箱重复检查不区分大小写"""
+        rows = [
+            {**account("amy"), "email": "CUSTOMER@test.com"},
+            account("bob"),
+            {**account("BOB"), "email": "other@test.com"},
+            {**account("cat"), "email": "Bob@Test.com"},
+        ]
+        results = await provision_users(db_session, parse_ndjson(ndjson(*rows)))
+        assert [r["status"] for r in results] == [
+            "duplicate",
+            "created",
+            "duplicate",
+            "duplicate",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_conflict_reports_only_colliding_rows(
+        self, db_session, monkeypatch
+    ):
+        """测试批次冲突时逐行重试，只有冲突行标记为重复"""
+        hash_passwords = provisioning_service.hash_passwords
+
+        async def signup_during_hashing(passwords):
+            # 预检查之后出现的并发注册  # A signup racing the pre-check
+            late = account("late")
+            db_session.add(
+                User(
+                    username=late["username"],
+                    email=late["email"],
+                    password_hash="x",
+                    role_id=1,
+                )
+            )
+            await db_session.commit()
+            return await hash_passwords(passwords)
+
+        monkeypatch.setattr(
+            provisioning_service, "hash_passwords", signup_during_hashing
+        )
+        rows = [account("early"), account("late"), account("after")]
+        results = await provision_users(db_session, parse_ndjson(ndjson(*rows)))
+        assert [r["status"] for r in results] == ["created", "duplicate", "created"]
+        users = await db_session.scalars(select(User.username).order_by(User.username))
+        assert list(users) == ["after", "early", "late"]
+
+    def test_too_many_rows(self, monkeypatch):
+        """测试超过上限时拒绝整个上传"""
+        monkeypatch.setattr(provisioning_service, "MAX_BULK_ROWS", 2)
+        with pytest.raises(ValueError):
+            parse_ndjson(ndjson(account("a"), account("b"), account("c")))
+
+    def test_admin_only(self, client, customer_token):
+        """测试仅限管理员"""
+        response = client.post(
+            "/admin/users/bulk", content=ndjson(account("zed")), headers=auth(customer_token)
+        )
+        assert response.status_code == 403
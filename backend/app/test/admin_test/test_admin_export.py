@@ -0,0 +1,119 @@
+# app/test/admin_test/test_admin_export.py
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models.models import Payment, PaymentStatusEnum, Review
+from app.services.export_service import stream_export
+
+TRANSACTION_ID = "01920d6e-4b2a-7c3d-8e4f-5a6b7c8d9e0f"
+
+
+class TestAdminExport:
+    """管理员数据导出测试"""
+
+    def test_export_orders_csv(self, client, admin_token, sample_order, completed_order):
+        """测试导出订单CSV"""
+        response = client.get(
+            "/admin/export/orders",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [int(r["id"]) for r in rows] == [sample_order.id, completed_order.id]
+        assert rows[1]["status"] == "completed"
+        assert rows[1]["price"] == "250.00"
+
+    def test_export_orders_status_filter_ndjson(
+        self, client, admin_token, sample_order, completed_order
+    ):
+        """测试按状态过滤并导出NDJSON"""
+        response = client.get(
+            "/admin/export/orders?status=completed&format=ndjson",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["id"] == completed_order.id
+        assert lines[0]["location"] == "WEST"
+
+    def test_export_requires_admin(self, client, customer_token, completed_order):
+        """测试非管理员不能导出"""
+        response = client.get(
+            "/admin/export/orders",
+            headers={"Authorization": f"Bearer {customer_token}"},
+        )
+        assert response.status_code == 403
+
+    def test_export_invalid_status(self, client, admin_token):
+        """测试非法状态过滤返回422"""
+        response = client.get(
+            "/admin/export/orders?status=unknown",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_export_payments_gzip(
+        self, client, admin_token, db_session, completed_order
+    ):
+        """测试导出gzip压缩的支付记录"""
+        db_session.add(
+            Payment(
+                id=1,
+                order_id=completed_order.id,
+                customer_id=completed_order.customer_id,
+                provider_id=completed_order.provider_id,
+                amount=completed_order.price,
+                status=PaymentStatusEnum.completed,
+                transaction_id=TRANSACTION_ID,
+                created_at=datetime.now(),
+            )
+        )
+        await db_session.commit()
+
+        response = client.get(
+            "/admin/export/payments?gzip=true",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        text = gzip.decompress(response.content).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert len(rows) == 1
+        assert rows[0]["transaction_id"] == TRANSACTION_ID
+
+    @pytest.mark.asyncio
+    async def test_stream_export_reviews_in_batches(
+        self, db_session, completed_order, customer_user, provider_user
+    ):
+        """测试评价导出按批次输出"""
+        db_session.add(
+            Review(
+                id=1,
+                order_id=completed_order.id,
+                customer_id=customer_user.id,
+                provider_id=provider_user.id,
+                stars=4,
+                content="Good, with a comma",
+                created_at=datetime.now(),
+            )
+        )
+        await db_session.commit()
+
+        chunks = [
+            chunk
+            async for chunk in stream_export(
+                db_session, "reviews", provider_id=provider_user.id, batch_size=1
+            )
+        ]
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        assert len(rows) == 1
+        assert rows[0]["content"] == "Good, with a comma"
+        assert rows[0]["stars"] == "4"
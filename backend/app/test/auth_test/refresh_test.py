@@ -0,0 +1,78 @@
+# app/test/auth_test/refresh_test.py
+from sqlalchemy import select
+
+from app.models.models import RefreshToken
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def login(client):
+    response = client.post(
+        "/auth/login", json={"email": "customer@test.com", "password": "password123"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestRefreshTokens:
+    """刷新令牌轮换测试"""
+
+    async def test_login_stores_only_hash(self, client, db_session, customer_user):
+        """测试登录返回刷新令牌，数据库只存哈希"""
+        data = login(client)
+        assert data["refresh_token"] and data["expires_in"] == 15 * 60
+        hashes = (await db_session.execute(select(RefreshToken.token_hash))).scalars()
+        assert data["refresh_token"] not in list(hashes)
+
+    def test_rotation(self, client, customer_user):
+        """测试刷新后获得新令牌，新访问令牌可用"""
+        first = login(client)
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": first["refresh_token"]}
+        )
+        assert response.status_code == 200
+        second = response.json()
+        assert second["refresh_token"] != first["refresh_token"]
+        assert client.get("/auth/me", headers=auth(second["access_token"])).json()[
+            "id"
+        ] == customer_user.id
+
+    def test_reuse_revokes_family(self, client, customer_user):
+        """测试重放旧刷新令牌会使整个家族失效"""
+        first = login(client)["refresh_token"]
+        second = client.post("/auth/refresh", json={"refresh_token": first}).json()[
+            "refresh_token"
+        ]
+        response = client.post("/auth/refresh", json={"refresh_token": first})
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Refresh token reuse detected"
+        # 合法持有者的新令牌也随家族一起失效
+        response = client.post("/auth/refresh", json={"refresh_token": second})
+        assert response.status_code == 401
+
+        # 其他登录会话不受影响
+        other = login(client)["refresh_token"]
+        assert client.post(
+            "/auth/refresh", json={"refresh_token": other}
+        ).status_code == 200
+
+    def test_logout_revokes_refresh_family(self, client, customer_user):
+        """测试注销同时作废刷新令牌"""
+        data = login(client)
+        response = client.post(
+            "/auth/logout",
+            json={"refresh_token": data["refresh_token"]},
+            headers=auth(data["access_token"]),
+        )
+        assert response.status_code == 200
+        response = client.post(
+            "/auth/refresh", json={"refresh_token": data["refresh_token"]}
+        )
+        assert response.status_code == 401
+
+    def test_unknown_token(self, client):
+        """测试未知刷新令牌"""
+        response = client.post("/auth/refresh", json={"refresh_token": "nope"})
+        assert response.status_code == 401
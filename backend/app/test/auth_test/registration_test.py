@@ -0,0 +1,74 @@
+# app/test/auth_test/registration_test.py
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from app.models.models import CustomerProfile, ProviderProfile, User
+from app.services.auth_service import register_user
+
+
+class TestRegistration:
+    """单事务注册测试"""
+
+    @pytest.mark.asyncio
+    async def test_customer_and_profile_in_one_commit(self, db_session):
+        """测试用户与客户资料同一次提交创建"""
+        commits = []
+
+        def listener(session):
+            commits.append(session)
+
+        event.listen(db_session.sync_session, "after_commit", listener)
+        try:
+            user = await register_user(
+                db_session, "alice", "alice@test.com", "secret123", 1
+            )
+        finally:
+            event.remove(db_session.sync_session, "after_commit", listener)
+        assert len(commits) == 1
+        assert user.id is not None
+        profile = await db_session.get(CustomerProfile, user.id)
+        assert profile is not None and float(profile.balance) == 0
+        assert user.verify_password("secret123")
+
+    @pytest.mark.asyncio
+    async def test_provider_gets_provider_profile(self, db_session):
+        """测试服务商注册时创建服务商资料"""
+        user = await register_user(db_session, "bob", "bob@test.com", "secret123", 2)
+        assert await db_session.get(ProviderProfile, user.id) is not None
+        assert await db_session.get(CustomerProfile, user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_duplicate_leaves_nothing_behind(self, db_session):
+        """测试重复注册失败时不残留用户或资料"""
+        await register_user(db_session, "carol", "carol@test.com", "secret123", 1)
+        with pytest.raises(HTTPException) as exc:
+            await register_user(db_session, "carol2", "carol@test.com", "secret123", 1)
+        assert exc.value.status_code == 400
+        users = await db_session.execute(select(func.count()).select_from(User))
+        profiles = await db_session.execute(
+            select(func.count()).select_from(CustomerProfile)
+        )
+        assert (users.scalar(), profiles.scalar()) == (1, 1)
+
+    def test_register_and_login_route(self, client):
+        """测试注册接口后可以登录并读取资料"""
+        response = client.post(
+            "/auth/register",
+            json={
+                "username": "new_provider",
+                "email": "new_provider@test.com",
+                "password": "secret123",
+                "role_id": 2,
+            },
+        )
+        assert response.status_code == 200
+        token = client.post(
+            "/auth/login",
+            json={"email": "new_provider@test.com", "password": "secret123"},
+        ).json()["access_token"]
+        profile = client.get(
+            "/profile/me", headers={"Authorization": f"Bearer {token}"}
+        ).json()
+        assert profile["role"] == "provider"
+        assert profile["hourly_rate"] == 0.0
@@ -0,0 +1,73 @@
+# app/test/auth_test/revocation_test.py
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from app.models.models import RevokedToken
+from app.services.auth_service import ALGORITHM, SECRET_KEY
+from app.services.token_service import (
+    purge_expired_revocations,
+    revocations,
+    sync_revocations,
+)
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestTokenRevocation:
+    """令牌撤销测试"""
+
+    def test_tokens_carry_unique_jti(self, client, customer_user):
+        """测试每个令牌带唯一 jti"""
+        tokens = [
+            client.post(
+                "/auth/login",
+                json={"email": "customer@test.com", "password": "password123"},
+            ).json()["access_token"]
+            for _ in range(2)
+        ]
+        jtis = {jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM])["jti"] for t in tokens}
+        assert len(jtis) == 2
+
+    def test_logout_revokes_only_that_token(self, client, customer_user, customer_token):
+        """测试注销后该令牌失效，其他令牌不受影响"""
+        other = client.post(
+            "/auth/login",
+            json={"email": "customer@test.com", "password": "password123"},
+        ).json()["access_token"]
+        assert client.get("/auth/me", headers=auth(customer_token)).status_code == 200
+
+        response = client.post("/auth/logout", headers=auth(customer_token))
+        assert response.status_code == 200
+        response = client.get("/auth/me", headers=auth(customer_token))
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token revoked"
+        assert client.get("/auth/me", headers=auth(other)).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_sync_picks_up_other_workers(self, db_session):
+        """测试同步其他进程写入的撤销记录，忽略已过期的"""
+        now = datetime.utcnow()
+        db_session.add_all(
+            [
+                RevokedToken(jti="live", user_id=1, expires_at=now + timedelta(minutes=30)),
+                RevokedToken(jti="old", user_id=1, expires_at=now - timedelta(minutes=1)),
+            ]
+        )
+        await db_session.commit()
+        assert await sync_revocations(db_session) == 1
+        assert revocations.is_revoked("live")
+        assert not revocations.is_revoked("old")
+
+        # 增量同步只读新行  # Incremental sync reads only new rows
+        db_session.add(
+            RevokedToken(jti="later", user_id=1, expires_at=now + timedelta(minutes=30))
+        )
+        await db_session.commit()
+        await sync_revocations(db_session)
+        assert revocations.is_revoked("later")
+
+        assert await purge_expired_revocations(db_session) == 1
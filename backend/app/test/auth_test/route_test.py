@@ -88,10 +88,12 @@ class TestAuthRoutes:
 
     @patch("app.routes.auth.authenticate_user", new_callable=AsyncMock)
     @patch("app.routes.auth.create_access_token_with_role")
+    @patch("app.routes.auth.issue_refresh_token")
     @patch("app.routes.auth.get_db")
     def test_login_success(
         self,
         mock_get_db,
+        mock_issue_refresh_token,
         mock_create_access_token_with_role,
         mock_authenticate_user,
         client,
@@ -102,12 +104,14 @@ class TestAuthRoutes:
             "User", (), {"id": 1, "role_id": 1}
         )()
         mock_create_access_token_with_role.return_value = "sometoken"
+        mock_issue_refresh_token.return_value = "somerefresh"
         mock_get_db.return_value.__aenter__.return_value = AsyncMock()
         response = client.post("/auth/login", json=sample_login_data)
         assert response.status_code == 200
         data = response.json()
         assert data["access_token"] == "sometoken"
         assert data["token_type"] == "bearer"
+        assert data["refresh_token"] == "somerefresh"
         mock_authenticate_user.assert_awaited_once()
         mock_create_access_token_with_role.assert_called_once_with(1, 1)
 
@@ -9,6 +9,9 @@ from httpx import AsyncClient, ASGITransport
 from app.main import app
 from app.config import get_db
 from app.models.models import Base, User, Role, Order, Review, Payment, CustomerInbox, ProviderInbox
+from app.services.reference_service import role_cache
+from app.services.token_service import revocations
+from app.utils.cache import CACHE_REGISTRY
 from app.utils.security import get_password_hash
 from datetime import datetime, timedelta
 
@@ -59,6 +62,13 @@ async def setup_db():
     
     # Override dependency
     app.dependency_overrides[get_db] = get_test_session
+
+    # 每个测试使用全新的进程内缓存
+    for cache in CACHE_REGISTRY.values():
+        cache.clear()
+        cache.reset_stats()
+    role_cache.reset()
+    revocations.reset()
     
     yield _test_session
     
@@ -279,3 +289,60 @@ async def completed_order(db_session, customer_user, provider_user):
     await db_session.commit()
     await db_session.refresh(order)
     return order
+
+
+@pytest.fixture
+def make_orders(db_session):
+    """
+    订单工厂：make_orders(customer_id, provider_id, prices, first_id)
+    Order factory: one order per price, ids from first_id, completed and
+    unpaid unless **fields says otherwise; pass session= to write elsewhere.
+    """
+    from app.models.models import LocationEnum, OrderStatus, PaymentStatus, ServiceType
+
+    async def make(customer_id, provider_id, prices, first_id, session=None, **fields):
+        session = session or db_session
+        now = datetime.now()
+        orders = [
+            Order(
+                **{
+                    "id": first_id + i,
+                    "customer_id": customer_id,
+                    "provider_id": provider_id,
+                    "title": f"Order {first_id + i}",
+                    "description": "Test",
+                    "service_type": ServiceType.other,
+                    "status": OrderStatus.completed,
+                    "price": price,
+                    "location": LocationEnum.NORTH,
+                    "address": "Test",
+                    "payment_status": PaymentStatus.unpaid,
+                    "created_at": now,
+                    "updated_at": now,
+                    **fields,
+                }
+            )
+            for i, price in enumerate(prices)
+        ]
+        session.add_all(orders)
+        await session.commit()
+        return orders
+
+    return make
+
+
+@pytest_asyncio.fixture
+async def customer_profile(db_session, customer_user):
+    """创建带余额的客户资料"""
+    from decimal import Decimal
+    from app.models.models import CustomerProfile, LocationEnum
+    profile = CustomerProfile(
+        id=customer_user.id,
+        location=LocationEnum.WEST,
+        address="1 Customer Street",
+        balance=Decimal("1000.00"),
+    )
+    db_session.add(profile)
+    await db_session.commit()
+    await db_session.refresh(profile)
+    return profile
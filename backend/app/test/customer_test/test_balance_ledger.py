@@ -0,0 +1,210 @@
+# app/test/customer_test/test_balance_ledger.py
+import asyncio
+import random
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.models import (
+    BalanceLedgerEntry,
+    BalanceSnapshot,
+    Base,
+    CustomerProfile,
+    Payment,
+    PaymentStatusEnum,
+    User,
+)
+from app.services import balance_service
+from app.services.balance_service import (
+    credit_balance,
+    debit_balance,
+    get_balance_history,
+)
+
+
+class TestBalanceLedgerApi:
+    """余额流水接口测试"""
+
+    def test_recharge_and_pay_write_ledger(
+        self, client, customer_token, customer_profile, completed_order
+    ):
+        """测试充值与支付都记入流水"""
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        response = client.post(
+            "/customer/payments/recharge", headers=headers, json={"amount": 50.5}
+        )
+        assert response.status_code == 200
+        assert response.json()["balance"] == 1050.5
+
+        response = client.post(
+            "/customer/payments/pay",
+            headers=headers,
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 200
+
+        response = client.get("/customer/payments/ledger", headers=headers)
+        assert response.status_code == 200
+        entries = response.json()
+        assert [(e["entry_type"], e["amount"], e["balance_after"]) for e in entries] == [
+            ("payment", -250.0, 800.5),
+            ("recharge", 50.5, 1050.5),
+        ]
+        assert entries[0]["order_id"] == completed_order.id
+
+    @pytest.mark.asyncio
+    async def test_pay_rejected_when_balance_short(
+        self, client, customer_token, db_session, customer_profile, completed_order
+    ):
+        """测试余额不足时支付失败且不落数据"""
+        customer_profile.balance = Decimal("100.00")
+        await db_session.commit()
+
+        response = client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 400
+
+        await db_session.refresh(customer_profile)
+        assert customer_profile.balance == Decimal("100.00")
+        count = await db_session.execute(select(func.count(BalanceLedgerEntry.id)))
+        assert count.scalar() == 0
+
+    def test_pay_without_profile(self, client, customer_token, completed_order):
+        """测试无客户资料时支付返回404"""
+        response = client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 404
+
+
+class TestBalanceHistory:
+    """余额快照与历史测试"""
+
+    @pytest.mark.asyncio
+    async def test_history_starts_from_snapshots(
+        self, db_session, customer_profile, monkeypatch
+    ):
+        """测试分页历史与快照回放结果一致"""
+        monkeypatch.setattr(balance_service, "SNAPSHOT_INTERVAL", 4)
+        customer_id = customer_profile.id
+        for i in range(1, 12):
+            await credit_balance(db_session, customer_id, i)
+        await debit_balance(db_session, customer_id, 30)
+        await db_session.commit()
+
+        snapshots = await db_session.execute(
+            select(BalanceSnapshot.seq).where(BalanceSnapshot.customer_id == customer_id)
+        )
+        assert sorted(snapshots.scalars().all()) == [0, 4, 8, 12]
+
+        first = await get_balance_history(db_session, customer_id, limit=5)
+        assert [e["seq"] for e in first] == [12, 11, 10, 9, 8]
+        assert first[0]["balance_after"] == 1036.0
+        older = await get_balance_history(
+            db_session, customer_id, limit=5, before_seq=first[-1]["seq"]
+        )
+        assert [e["seq"] for e in older] == [7, 6, 5, 4, 3]
+        # 1000 + 1 + ... + 7
+        assert older[0]["balance_after"] == 1028.0
+        assert older[-1]["balance_after"] == 1006.0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_recharges_and_payments(tmp_path):
+    """并发充值与扣款不丢失更新且余额不为负"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'ledger.db'}",
+        connect_args={"timeout": 30},
+    )
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessions() as session:
+        session.add(
+            User(id=1, username="ledger", email="ledger@test.com", password_hash="x", role_id=1)
+        )
+        session.add(
+            CustomerProfile(id=1, location="WEST", address="x", balance=Decimal("20.00"))
+        )
+        await session.commit()
+
+    operations = [("credit", Decimal("10.00"))] * 40 + [("debit", Decimal("7.00"))] * 60
+    random.Random(7).shuffle(operations)
+    applied = []
+
+    async def run(kind, amount):
+        async with sessions() as session:
+            try:
+                if kind == "credit":
+                    await credit_balance(session, 1, amount)
+                    applied.append(amount)
+                else:
+                    await debit_balance(session, 1, amount)
+                    applied.append(-amount)
+                await session.commit()
+            except ValueError:
+                await session.rollback()
+
+    try:
+        await asyncio.gather(*(run(kind, amount) for kind, amount in operations))
+
+        async with sessions() as session:
+            profile = await session.get(CustomerProfile, 1)
+            ledger = await session.execute(
+                select(BalanceLedgerEntry.seq, BalanceLedgerEntry.amount)
+                .where(BalanceLedgerEntry.customer_id == 1)
+                .order_by(BalanceLedgerEntry.seq)
+            )
+            rows = ledger.all()
+    finally:
+        await engine.dispose()
+
+    assert profile.balance == Decimal("20.00") + sum(applied)
+    assert profile.balance == Decimal("20.00") + sum(amount for _, amount in rows)
+    assert [seq for seq, _ in rows] == list(range(1, len(applied) + 1))
+    assert profile.ledger_seq == len(rows)
+    running = Decimal("20.00")
+    for _, amount in rows:
+        running += amount
+        assert running >= 0
+    # 所有充值都必须生效  # Every recharge must land
+    assert sum(1 for a in applied if a > 0) == 40
+
+
+class TestInsertFirstPayment:
+    """支付先插入后依赖唯一约束的测试"""
+
+    @pytest.mark.asyncio
+    async def test_existing_payment_row_rejects_second_payment(
+        self, client, customer_token, db_session, customer_profile, completed_order
+    ):
+        """测试状态未更新但已有支付记录时，唯一约束拒绝重复支付"""
+        # 模拟另一请求已插入支付但尚未更新订单状态
+        # Simulate a concurrent request that inserted its payment first
+        db_session.add(
+            Payment(
+                order_id=completed_order.id,
+                customer_id=customer_profile.id,
+                amount=completed_order.price,
+                status=PaymentStatusEnum.completed,
+            )
+        )
+        await db_session.commit()
+
+        response = client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 400
+        await db_session.refresh(customer_profile)
+        assert customer_profile.balance == Decimal("1000.00")
+        count = await db_session.execute(select(func.count(BalanceLedgerEntry.id)))
+        assert count.scalar() == 0
@@ -0,0 +1,113 @@
+# app/test/customer_test/test_batch_payments.py
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.models import (
+    BalanceLedgerEntry,
+    CustomerInbox,
+    Order,
+    Payment,
+    PaymentStatus,
+    ProviderEarningsSummary,
+    ProviderInbox,
+)
+
+
+class TestBatchPayments:
+    """批量结算测试"""
+
+    @pytest.mark.asyncio
+    async def test_pay_batch_reports_per_order(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        provider_user,
+        customer_profile,
+        sample_order,
+        make_orders,
+    ):
+        """测试批量支付成功与逐单失败原因"""
+        orders = await make_orders(
+            customer_user.id, provider_user.id, [100, 50.5, 20], first_id=5000
+        )
+        orders[2].payment_status = PaymentStatus.paid
+        await db_session.commit()
+
+        response = client.post(
+            "/customer/payments/pay-batch",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={
+                "order_ids": [o.id for o in orders] + [sample_order.id, 999999]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["paid_count"] == 2
+        assert data["total_amount"] == 150.5
+        assert data["balance"] == 849.5
+        errors = {r["order_id"]: r["error"] for r in data["results"]}
+        assert errors == {
+            orders[0].id: None,
+            orders[1].id: None,
+            orders[2].id: "Order is already paid.",
+            sample_order.id: "Order is not completed.",
+            999999: "Order not found.",
+        }
+
+        payments = await db_session.execute(select(func.count(Payment.id)))
+        assert payments.scalar() == 2
+        ledger = await db_session.execute(select(BalanceLedgerEntry.amount))
+        assert ledger.scalars().all() == [Decimal("-150.50")]
+        summary = await db_session.get(ProviderEarningsSummary, provider_user.id)
+        await db_session.refresh(summary)
+        assert summary.paid_order_count == 2
+        for model in (CustomerInbox, ProviderInbox):
+            count = await db_session.execute(select(func.count(model.id)))
+            assert count.scalar() == 2
+        paid = await db_session.execute(
+            select(func.count(Order.id)).where(Order.payment_status == PaymentStatus.paid)
+        )
+        assert paid.scalar() == 3
+
+    @pytest.mark.asyncio
+    async def test_pay_batch_insufficient_balance_writes_nothing(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        provider_user,
+        customer_profile,
+        make_orders,
+    ):
+        """测试余额不足时整批不落数据"""
+        orders = await make_orders(
+            customer_user.id, provider_user.id, [600, 600], first_id=5000
+        )
+        response = client.post(
+            "/customer/payments/pay-batch",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_ids": [o.id for o in orders]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["paid_count"] == 0
+        assert {r["error"] for r in data["results"]} == {"Insufficient balance."}
+
+        payments = await db_session.execute(select(func.count(Payment.id)))
+        assert payments.scalar() == 0
+        await db_session.refresh(customer_profile)
+        assert customer_profile.balance == Decimal("1000.00")
+
+    def test_pay_batch_rejects_empty_list(self, client, customer_token):
+        """测试空列表被拒绝"""
+        response = client.post(
+            "/customer/payments/pay-batch",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_ids": []},
+        )
+        assert response.status_code == 422
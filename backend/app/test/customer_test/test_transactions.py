@@ -0,0 +1,118 @@
+# app/test/customer_test/test_transactions.py
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.models.models import Payment, PaymentStatusEnum
+from app.utils.ids import uuid7, uuid7_floor, uuid7_time
+
+
+class TestUuid7:
+    """UUIDv7 生成测试"""
+
+    def test_ids_are_version_7_and_monotonic(self):
+        """测试版本位与单调递增"""
+        ids = [uuid7() for _ in range(5000)]
+        assert all(i.version == 7 and i.variant == uuid.RFC_4122 for i in ids)
+        assert [i.bytes for i in ids] == sorted(i.bytes for i in ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_floor_and_embedded_time(self):
+        """测试时间下界与嵌入时间"""
+        moment = datetime(2026, 3, 1, 12, 30, tzinfo=UTC)
+        floor = uuid7_floor(moment)
+        assert uuid7_time(floor) == moment
+        assert uuid7_floor(moment + timedelta(milliseconds=1)) > floor
+
+
+class TestTransactionLookup:
+    """交易号查询测试"""
+
+    @pytest.mark.asyncio
+    async def test_pay_stores_binary_uuid7(
+        self, client, customer_token, db_session, customer_profile, completed_order
+    ):
+        """测试支付生成UUIDv7并按交易号查询"""
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        response = client.post(
+            "/customer/payments/pay",
+            headers=headers,
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 200
+        transaction_id = response.json()["transaction_id"]
+        assert uuid.UUID(transaction_id).version == 7
+
+        raw = await db_session.execute(text("SELECT transaction_id FROM payments"))
+        assert len(raw.scalar()) == 16
+
+        response = client.get(
+            f"/customer/payments/transactions/{transaction_id}", headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["order_id"] == completed_order.id
+
+        response = client.get(
+            f"/customer/payments/transactions/{uuid7()}", headers=headers
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_time_range_uses_transaction_order(
+        self, client, customer_token, db_session, customer_user
+    ):
+        """测试按时间区间查询交易"""
+        base = datetime(2026, 5, 1, 8, 0)
+        for i in range(4):
+            created = base + timedelta(hours=i)
+            # 在创建时间处生成的UUIDv7  # A UUIDv7 as if generated at `created`
+            ms = int(created.replace(tzinfo=UTC).timestamp() * 1000)
+            tail = uuid7().int & ((1 << 80) - 1)
+            db_session.add(
+                Payment(
+                    order_id=9000 + i,
+                    customer_id=customer_user.id,
+                    amount=10 + i,
+                    status=PaymentStatusEnum.completed,
+                    transaction_id=uuid.UUID(int=(ms << 80) | tail),
+                    created_at=created,
+                )
+            )
+        await db_session.commit()
+
+        response = client.get(
+            "/customer/payments/transactions",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            params={"start": "2026-05-01T09:00:00", "end": "2026-05-01T11:00:00"},
+        )
+        assert response.status_code == 200
+        assert [t["order_id"] for t in response.json()] == [9001, 9002]
+
+        # 迁移前的 uuid4 交易号按创建时间查到  # Legacy uuid4 ids match by created_at
+        for order_id, created in ((9010, base), (9011, base + timedelta(minutes=90))):
+            db_session.add(
+                Payment(
+                    order_id=order_id,
+                    customer_id=customer_user.id,
+                    amount=5,
+                    status=PaymentStatusEnum.completed,
+                    transaction_id=uuid.uuid4(),
+                    created_at=created,
+                )
+            )
+        await db_session.commit()
+        response = client.get(
+            "/customer/payments/transactions",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            params={"start": "2026-05-01T09:00:00", "end": "2026-05-01T11:00:00"},
+        )
+        assert [t["order_id"] for t in response.json()] == [9001, 9011, 9002]
+
+        response = client.get(
+            "/customer/payments/transactions",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            params={"start": "2026-05-02T00:00:00", "end": "2026-05-01T00:00:00"},
+        )
+        assert response.status_code == 400
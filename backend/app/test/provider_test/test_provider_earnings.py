@@ -0,0 +1,231 @@
+# app/test/provider_test/test_provider_earnings.py
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.models.models import (
+    CustomerSpendingDaily,
+    Payment,
+    ProviderEarningsSummary,
+)
+from app.services.earnings_service import (
+    get_provider_earnings_series,
+    rebuild_daily_rollups,
+    rebuild_provider_earnings,
+    record_payments,
+)
+
+
+class TestProviderEarnings:
+    """服务商收入汇总测试"""
+
+    def test_total_earnings_without_payments(self, client, provider_token):
+        """测试无收入时返回0"""
+        response = client.get(
+            "/provider/earnings/total",
+            headers={"Authorization": f"Bearer {provider_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_earnings"] == 0.0
+        assert data["paid_order_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pay_order_updates_summary(
+        self,
+        client,
+        customer_token,
+        provider_token,
+        db_session,
+        customer_user,
+        provider_user,
+        customer_profile,
+        completed_order,
+        make_orders,
+    ):
+        """测试支付在同一事务内更新收入汇总"""
+        [second] = await make_orders(
+            customer_user.id, provider_user.id, [99.5], first_id=4001
+        )
+        for order_id in (completed_order.id, second.id):
+            response = client.post(
+                "/customer/payments/pay",
+                headers={"Authorization": f"Bearer {customer_token}"},
+                json={"order_id": order_id},
+            )
+            assert response.status_code == 200
+
+        summary = await db_session.get(ProviderEarningsSummary, provider_user.id)
+        await db_session.refresh(summary)
+        assert summary.total_earnings == Decimal("349.50")
+        assert summary.paid_order_count == 2
+        assert summary.last_payment_at is not None
+
+        response = client.get(
+            "/provider/earnings/total",
+            headers={"Authorization": f"Bearer {provider_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_earnings"] == 349.5
+        assert data["paid_order_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rebuild_repairs_drift(
+        self,
+        client,
+        customer_token,
+        db_session,
+        provider_user,
+        customer_profile,
+        completed_order,
+    ):
+        """测试从支付记录重建汇总"""
+        response = client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 200
+
+        # 人为制造漂移  # Introduce drift
+        await db_session.execute(
+            update(ProviderEarningsSummary).values(
+                total_earnings=1, paid_order_count=7
+            )
+        )
+        await db_session.commit()
+
+        assert await rebuild_provider_earnings(db_session) == 1
+        result = await db_session.execute(
+            select(ProviderEarningsSummary).where(
+                ProviderEarningsSummary.provider_id == provider_user.id
+            )
+        )
+        summary = result.scalars().one()
+        await db_session.refresh(summary)
+        assert summary.total_earnings == Decimal("250.00")
+        assert summary.paid_order_count == 1
+
+
+class TestProviderEarningsSeries:
+    """服务商收入时间序列测试"""
+
+    @pytest.mark.asyncio
+    async def test_series_buckets_derived_from_daily_rows(
+        self, db_session, customer_user, provider_user
+    ):
+        """测试周/月桶由日汇总推导"""
+        paid_days = [
+            (datetime(2026, 3, 2, 10), "10.00"),  # Monday
+            (datetime(2026, 3, 2, 18), "5.00"),
+            (datetime(2026, 3, 8, 9), "20.00"),  # Sunday, same ISO week
+            (datetime(2026, 4, 1, 12), "7.50"),
+        ]
+        await record_payments(
+            db_session,
+            [
+                Payment(
+                    customer_id=customer_user.id,
+                    provider_id=provider_user.id,
+                    amount=Decimal(amount),
+                    created_at=paid_at,
+                )
+                for paid_at, amount in paid_days
+            ],
+        )
+        await db_session.commit()
+
+        daily = await get_provider_earnings_series(
+            db_session, provider_user.id, date(2026, 3, 1), date(2026, 3, 3)
+        )
+        assert [(b["period_start"], b["amount"], b["payment_count"]) for b in daily] == [
+            (date(2026, 3, 1), 0.0, 0),
+            (date(2026, 3, 2), 15.0, 2),
+            (date(2026, 3, 3), 0.0, 0),
+        ]
+
+        weekly = await get_provider_earnings_series(
+            db_session, provider_user.id, date(2026, 3, 1), date(2026, 3, 15), "week"
+        )
+        assert [(b["period_start"], b["amount"]) for b in weekly] == [
+            (date(2026, 2, 23), 0.0),
+            (date(2026, 3, 2), 35.0),
+            (date(2026, 3, 9), 0.0),
+        ]
+
+        monthly = await get_provider_earnings_series(
+            db_session, provider_user.id, date(2026, 1, 15), date(2026, 4, 30), "month"
+        )
+        assert [(b["period_start"], b["amount"]) for b in monthly] == [
+            (date(2026, 1, 1), 0.0),
+            (date(2026, 2, 1), 0.0),
+            (date(2026, 3, 1), 35.0),
+            (date(2026, 4, 1), 7.5),
+        ]
+
+    def test_series_endpoint_after_payment(
+        self, client, customer_token, provider_token, customer_profile, completed_order
+    ):
+        """测试支付后收入和支出序列接口"""
+        response = client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        assert response.status_code == 200
+
+        response = client.get(
+            "/provider/earnings/series?granularity=month",
+            headers={"Authorization": f"Bearer {provider_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_amount"] == 250.0
+        assert data["buckets"][-1]["payment_count"] == 1
+
+        response = client.get(
+            "/customer/payments/series",
+            headers={"Authorization": f"Bearer {customer_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["buckets"]) == 30
+        assert data["buckets"][-1]["amount"] == 250.0
+
+    def test_series_rejects_inverted_range(self, client, provider_token):
+        """测试开始日期晚于结束日期"""
+        response = client.get(
+            "/provider/earnings/series?start=2026-03-10&end=2026-03-01",
+            headers={"Authorization": f"Bearer {provider_token}"},
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_rebuild_daily_rollups(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        customer_profile,
+        completed_order,
+    ):
+        """测试从支付记录重建日汇总"""
+        client.post(
+            "/customer/payments/pay",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": completed_order.id},
+        )
+        await db_session.execute(delete(CustomerSpendingDaily))
+        await db_session.commit()
+
+        assert await rebuild_daily_rollups(db_session) == 2
+        result = await db_session.execute(
+            select(CustomerSpendingDaily).where(
+                CustomerSpendingDaily.customer_id == customer_user.id
+            )
+        )
+        assert result.scalars().one().amount == Decimal("250.00")
@@ -3,7 +3,12 @@
 覆盖auth_service的create_access_token和logout_user
 """
 import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from app.models.models import RevokedToken
 from app.services import auth_service
+from app.services.token_service import revocations
 from datetime import timedelta
 
 
@@ -30,12 +35,22 @@ class TestFinalCoverage:
         assert len(token) > 0
     
     @pytest.mark.asyncio
-    async def test_logout_user(self):
-        """测试登出用户"""
-        result = await auth_service.logout_user()
+    async def test_logout_user(self, db_session):
+        """测试登出用户并撤销令牌"""
+        token = auth_service.create_access_token_with_role(100, 1)
+        payload = jwt.decode(
+            token, auth_service.SECRET_KEY, algorithms=[auth_service.ALGORITHM]
+        )
+        result = await auth_service.logout_user(db_session, payload)
         assert result is not None
         assert "msg" in result
         assert result["msg"] == "Logout successful"
+        assert revocations.is_revoked(payload["jti"])
+        result = await db_session.execute(
+            select(RevokedToken).where(RevokedToken.jti == payload["jti"])
+        )
+        revoked = result.scalar_one()
+        assert revoked.user_id == 100
     
     def test_create_access_token_with_role(self):
         """测试使用role创建token"""
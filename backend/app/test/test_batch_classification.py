@@ -0,0 +1,171 @@
+# app/test/test_batch_classification.py
+import json
+
+import pytest
+
+from app.services import batch_classification_service
+from app.services.batch_classification_service import (
+    BatchTimeBudgetExceeded,
+    _row,
+    classify_batch,
+    classify_chunk,
+)
+from app.services.security_classifier_service import (
+    SecurityClassifierService,
+    classification_cache,
+)
+from app.utils.process_pool import shutdown_process_pool
+
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    shutdown_process_pool()
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """小批量也走进程池  # Send even small batches through the pool"""
+    monkeypatch.setattr(batch_classification_service, "INLINE_MAX_ISSUES", 2)
+    monkeypatch.setattr(batch_classification_service, "CHUNK_SIZE", 2)
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+ISSUES = [
+    {"title": title, "description": description, "component": component}
+    for title, description, component in [
+        ("SQL injection in login", "found at line 42", "auth"),
+        ("Outdated package", "lodash version 4.17.15 CVE-2020-8203", ""),
+        ("Missing header", "GET /api/orders header missing", "api"),
+        ("Weak cryptography", "MD5 used for passwords", "users"),
+        ("Informational", "best practice suggestion", ""),
+    ]
+]
+
+
+def request_body(issues):
+    return {
+        "issues": [
+            {
+                "title": i["title"],
+                "description": i["description"],
+                "affected_component": i["component"],
+            }
+            for i in issues
+        ]
+    }
+
+
+class TestBatchClassification:
+    """批量分类测试"""
+
+    async def test_pool_results_match_inline(self, small_chunks):
+        """测试进程池分块结果与直接分类一致且保持顺序"""
+        expected = [_row(i, r) for i, r in zip(ISSUES, classify_chunk(ISSUES))]
+        results = await classify_batch([dict(i) for i in ISSUES])
+
+        # 标签顺序来自 set，随进程的哈希种子变化  # Tag order follows set/hash order
+        def normalized(rows):
+            return [{**row, "tags": sorted(row["tags"])} for row in rows]
+
+        assert normalized(results) == normalized(expected)
+
+    async def test_time_budget(self, small_chunks):
+        """测试超出时间预算"""
+        with pytest.raises(BatchTimeBudgetExceeded):
+            await classify_batch([dict(i) for i in ISSUES], time_budget=0)
+
+    async def test_cached_and_repeated_issues_classified_once(self):
+        """测试批内重复问题只分类一次，再次提交全部命中缓存"""
+        issues = [dict(ISSUES[0]) for _ in range(3)] + [dict(ISSUES[1])]
+        first = await classify_batch(issues)
+        assert classification_cache.stats()["misses"] == 2
+        assert len(classification_cache) == 2
+
+        classification_cache.reset_stats()
+        assert await classify_batch(issues) == first
+        assert classification_cache.stats()["hits"] == 4
+        assert first[0] == first[1] == first[2]
+
+    def test_route_inline(self, client, customer_token):
+        """测试小批量接口返回 JSON 列表"""
+        response = client.post(
+            "/api/security/batch-classify",
+            json=request_body(ISSUES[:2]),
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["issue_type"] for r in data] == ["SAST", "SCA"]
+        assert data[1]["vulnerability_id"] == "CVE-2020-8203"
+        assert isinstance(data[0]["tags"], list)
+
+    def test_stream_covers_every_issue(self, client, customer_token, small_chunks):
+        """测试流式接口逐块返回，每个问题一行"""
+        response = client.post(
+            "/api/security/batch-classify/stream",
+            json=request_body(ISSUES),
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["index"] for line in lines) == list(range(len(ISSUES)))
+        by_index = {line["index"]: line for line in lines}
+        assert by_index[0]["title"] == ISSUES[0]["title"]
+
+    def test_max_batch_size(self, client, customer_token, monkeypatch):
+        """测试超过最大批量返回 413"""
+        monkeypatch.setenv("BATCH_CLASSIFY_MAX_ISSUES", "3")
+        for path in (
+            "/api/security/batch-classify",
+            "/api/security/batch-classify/stream",
+        ):
+            response = client.post(
+                path, json=request_body(ISSUES), headers=auth(customer_token)
+            )
+            assert response.status_code == 413
+
+
+class TestClassificationCache:
+    """分类结果缓存测试"""
+
+    def test_hit_returns_same_result(self):
+        """测试重复分类命中缓存且结果一致，返回副本"""
+        service = SecurityClassifierService()
+        first = service.classify_issue("XSS in search", "reflected payload", "web")
+        first["severity"] = "changed"
+        second = service.classify_issue("XSS in search", "reflected payload", "web")
+        assert second == service.classify_issue_uncached(
+            "XSS in search", "reflected payload", "web"
+        )
+        assert classification_cache.stats()["hits"] == 1
+
+    def test_rule_change_changes_key(self):
+        """测试规则变化后缓存键随之变化"""
+
+        class Stricter(SecurityClassifierService):
+            SEVERITY_KEYWORDS = {
+                **SecurityClassifierService.SEVERITY_KEYWORDS,
+                "CRITICAL": ["xss"],
+            }
+
+        base, stricter = SecurityClassifierService(), Stricter()
+        assert base.ruleset_version() != stricter.ruleset_version()
+        args = ("XSS in search", "reflected payload", "web")
+        assert base.classification_key(*args) != stricter.classification_key(*args)
+        assert base.classify_issue(*args)["severity"] == "HIGH"
+        assert stricter.classify_issue(*args)["severity"] == "CRITICAL"
+
+    def test_statistics_report_hit_rate(self, client, customer_token):
+        """测试统计接口返回缓存命中率"""
+        SecurityClassifierService().classify_issue("XSS", "reflected", "web")
+        SecurityClassifierService().classify_issue("XSS", "reflected", "web")
+        response = client.get("/api/security/statistics", headers=auth(customer_token))
+        assert response.status_code == 200
+        cache = response.json()["classification_cache"]
+        assert (cache["hits"], cache["misses"], cache["hit_rate"]) == (1, 1, 0.5)
+        assert cache["ruleset_version"]
@@ -0,0 +1,32 @@
+# app/test/test_classifier_rules.py
+from app.services.security_classifier_service import SecurityClassifierService
+from benchmarks.classifier_benchmark import LegacyClassifier, generate_issues
+
+
+class TestCompiledClassifierRules:
+    """预编译分类规则测试"""
+
+    def test_same_results_as_per_helper_matching(self):
+        """测试单次扫描与逐条匹配结果一致"""
+        legacy, compiled = LegacyClassifier(), SecurityClassifierService()
+        for issue in generate_issues(2000, seed=11):
+            args = (issue["title"], issue["description"], issue["component"])
+            assert compiled.classify_issue(*args) == legacy.classify_issue(*args)
+
+    def test_non_ascii_keeps_case_insensitive_semantics(self):
+        """测试非 ASCII 文本仍按忽略大小写匹配（ſ 视同 s）"""
+        service = SecurityClassifierService()
+        result = service.classify_issue("Hardcoded paſſword", "in the SDK", "")
+        assert result == LegacyClassifier().classify_issue(
+            "Hardcoded paſſword", "in the SDK", ""
+        )
+        hits = service._rules().scan("hardcoded paſſword")
+        assert hits.matches[r"hardcoded.*(password|secret|key|token)"]
+
+    def test_vulnerability_ids(self):
+        """测试提取 CVE 与 GHSA 编号"""
+        service = SecurityClassifierService()
+        cve = service.classify_issue("Log4Shell", "cve-2021-44228 in log4j", "")
+        assert cve["vulnerability_id"] == "CVE-2021-44228"
+        ghsa = service.classify_issue("Advisory", "see GHSA-jf85-cpcp-j695", "")
+        assert ghsa["vulnerability_id"] == "GHSA-JF85-CPCP-J695"
@@ -0,0 +1,90 @@
+# app/test/test_list_projection.py
+"""
+列表接口只加载需要的列
+List loaders must never load Order.description; detail loaders still do.
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect
+
+from app.models.models import OrderStatus
+from app.services import admin_service, customer_service, provider_service
+
+
+@pytest_asyncio.fixture
+async def seeded_orders(db_session, customer_user, provider_user, make_orders):
+    """一个待接单、一个已完成订单，描述都很长"""
+    description = "x" * 10_000
+    await make_orders(
+        customer_user.id,
+        None,
+        [50.0],
+        first_id=15000,
+        status=OrderStatus.pending,
+        description=description,
+    )
+    await make_orders(
+        customer_user.id,
+        provider_user.id,
+        [50.0],
+        first_id=15001,
+        description=description,
+    )
+    # 清空身份映射，确保下面的查询真正从数据库加载
+    # Empty the identity map so the loaders below really hit the database
+    db_session.expunge_all()
+
+
+def _description_unloaded(orders):
+    return all("description" in inspect(o).unloaded for o in orders)
+
+
+class TestListProjection:
+    """列表查询列投影测试"""
+
+    @pytest.mark.asyncio
+    async def test_list_loaders_skip_description(
+        self, db_session, customer_user, provider_user, seeded_orders
+    ):
+
+        loaders = [
+            provider_service.list_available_orders(db_session),
+            provider_service.list_provider_order_history(
+                db_session, provider_id=provider_user.id
+            ),
+            customer_service.get_my_orders(db_session, customer_user.id),
+            customer_service.get_order_history(db_session, customer_user.id),
+            admin_service.list_all_orders(db_session),
+            admin_service.get_pending_review_orders(db_session),
+        ]
+        for loader in loaders:
+            orders = await loader
+            assert _description_unloaded(orders)
+
+    @pytest.mark.asyncio
+    async def test_detail_loader_keeps_description(
+        self, db_session, customer_user, seeded_orders
+    ):
+
+        detail = await customer_service.get_order_detail(
+            db_session, customer_user.id, 15001
+        )
+        assert detail["description"] == "x" * 10_000
+
+    def test_list_routes_still_render(
+        self, client, provider_token, customer_token, completed_order
+    ):
+        response = client.get(
+            "/provider/orders/history",
+            headers={"Authorization": f"Bearer {provider_token}"},
+        )
+        assert response.status_code == 200
+        assert response.json()["items"][0]["id"] == completed_order.id
+
+        response = client.get(
+            "/customer/orders/history",
+            headers={"Authorization": f"Bearer {customer_token}"},
+        )
+        assert response.status_code == 200
+        assert response.json()[0]["payment_status"] == "unpaid"
@@ -0,0 +1,145 @@
+# app/test/test_profile_cache.py
+import pytest
+
+from app.models.models import CacheInvalidation
+from app.services.balance_service import credit_balance
+from app.services.cache_service import reset_sync_state, sync_invalidations
+from app.services.profile_service import (
+    _cached,
+    _load_customer_profile,
+    get_customer_profile,
+    invalidate_profile,
+    profile_cache,
+)
+from app.utils.cache import TTLCache
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestTTLCache:
+    """进程内 TTL/LRU 缓存测试"""
+
+    def test_lru_eviction_and_stats(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = TTLCache("test-lru", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # a 变为最近使用
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+    def test_ttl_expiry(self):
+        """测试过期条目视为未命中"""
+        cache = TTLCache("test-ttl", maxsize=10, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestProfileCache:
+    """资料读缓存与写入失效测试"""
+
+    def test_me_is_cached(self, client, customer_token, customer_profile):
+        """测试重复读取 /profile/me 命中缓存"""
+        first = client.get("/profile/me", headers=auth(customer_token))
+        assert first.status_code == 200
+        misses = profile_cache.misses
+        second = client.get("/profile/me", headers=auth(customer_token))
+        assert second.json() == first.json()
+        assert profile_cache.misses == misses
+        assert profile_cache.hits >= 2  # 角色 + 客户资料
+
+    def test_update_user_info_invalidates(self, client, customer_token, customer_profile):
+        """测试修改用户名后 /profile/me 立即可见"""
+        client.get("/profile/me", headers=auth(customer_token))
+        response = client.put(
+            "/profile/update_user_info",
+            json={"username": "renamed", "email": "renamed@test.com"},
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 200
+        data = client.get("/profile/me", headers=auth(customer_token)).json()
+        assert data["username"] == "renamed"
+        assert data["email"] == "renamed@test.com"
+
+    def test_update_customer_profile_invalidates(
+        self, client, customer_token, customer_profile
+    ):
+        """测试更新客户资料后缓存失效"""
+        client.get("/profile/me", headers=auth(customer_token))
+        response = client.put(
+            "/profile/update_customer_profile",
+            json={"address": "2 New Street"},
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 200
+        data = client.get("/profile/me", headers=auth(customer_token)).json()
+        assert data["address"] == "2 New Street"
+
+    @pytest.mark.asyncio
+    async def test_balance_change_invalidates(self, db_session, customer_profile):
+        """测试余额变动使缓存的客户资料失效"""
+        cached = await get_customer_profile(db_session, customer_profile.id)
+        assert cached["balance"] == 1000.0
+        cached["balance"] = -1  # 修改副本不影响缓存
+        await credit_balance(db_session, customer_profile.id, 50)
+        await db_session.commit()
+        profile = await get_customer_profile(db_session, customer_profile.id)
+        assert profile["balance"] == 1050.0
+
+    @pytest.mark.asyncio
+    async def test_read_racing_a_commit_is_not_cached(self, db_session, customer_profile):
+        """测试读取期间有写入提交时不回写旧资料"""
+
+        async def racing_loader(db, user_id):
+            value = await _load_customer_profile(db, user_id)
+            # 读取完成后、写缓存前另一个写入提交  # A write commits before the cache set
+            await invalidate_profile(db, user_id)
+            await db.commit()
+            return value
+
+        key = ("customer", customer_profile.id)
+        value = await _cached(db_session, "customer", customer_profile.id, racing_loader)
+        assert value["balance"] == 1000.0
+        assert key not in profile_cache._data
+
+        await get_customer_profile(db_session, customer_profile.id)
+        assert key in profile_cache._data
+
+    @pytest.mark.asyncio
+    async def test_cross_worker_signal(self, db_session, customer_profile, monkeypatch):
+        """测试其他进程写入的失效信号被轮询应用"""
+        monkeypatch.setenv("CACHE_INVALIDATION_SYNC", "1")
+        reset_sync_state()
+        try:
+            await sync_invalidations(db_session, force=True)  # 建立起点
+            await get_customer_profile(db_session, customer_profile.id)
+            assert ("customer", customer_profile.id) in profile_cache._data
+
+            # 模拟另一个进程提交的失效信号
+            db_session.add(
+                CacheInvalidation(cache_name="profiles", cache_key=str(customer_profile.id))
+            )
+            await db_session.commit()
+            assert await sync_invalidations(db_session, force=True) >= 1
+            assert ("customer", customer_profile.id) not in profile_cache._data
+        finally:
+            reset_sync_state()
+
+    def test_admin_cache_stats(self, client, admin_token, customer_token, customer_profile):
+        """测试管理员查看缓存统计，其他角色被拒绝"""
+        client.get("/profile/me", headers=auth(customer_token))
+        response = client.get("/admin/cache/stats", headers=auth(admin_token))
+        assert response.status_code == 200
+        data = response.json()
+        profiles = next(c for c in data["caches"] if c["name"] == "profiles")
+        assert profiles["misses"] >= 1
+        assert data["sync"]["enabled"] is False
+
+        response = client.get("/admin/cache/stats", headers=auth(customer_token))
+        assert response.status_code == 403
@@ -0,0 +1,121 @@
+# app/test/test_provider_search.py
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.models.models import LocationEnum, ProviderProfile, ProviderSkill, User
+from app.services.provider_search_service import (
+    normalize_skills,
+    rebuild_provider_skills,
+)
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture
+async def skilled_providers(db_session):
+    """四个服务商，技能/区域/时薪各不相同"""
+    specs = [
+        (601, '["Plumbing", "Electrical"]', LocationEnum.NORTH, 50, 10),
+        (602, "plumbing, painting", LocationEnum.NORTH, 80, 3),
+        (603, "gardening", LocationEnum.SOUTH, 30, 5),
+        (604, '["painting"]', LocationEnum.NORTH, 120, 8),
+    ]
+    for provider_id, skills, location, rate, years in specs:
+        db_session.add(
+            User(
+                id=provider_id,
+                username=f"provider_{provider_id}",
+                email=f"p{provider_id}@test.com",
+                password_hash="x",
+                role_id=2,
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+        )
+        db_session.add(
+            ProviderProfile(
+                id=provider_id,
+                skills=skills,
+                location=location,
+                hourly_rate=rate,
+                experience_years=years,
+            )
+        )
+    await db_session.commit()
+    await rebuild_provider_skills(db_session)
+
+
+def search(client, token, **params):
+    response = client.get("/providers/search", params=params, headers=auth(token))
+    assert response.status_code == 200, response.text
+    data = response.json()
+    return [item["provider_id"] for item in data["items"]], data["next_cursor"]
+
+
+class TestProviderSearch:
+    """服务商技能搜索测试"""
+
+    def test_normalize_skills(self):
+        """测试技能文本规范化"""
+        assert normalize_skills('["B", "a", " a "]') == ["a", "b"]
+        assert normalize_skills("") == []
+
+    def test_filters(self, client, customer_token, skilled_providers):
+        """测试技能 any/all、区域、时薪与经验过滤"""
+        assert search(client, customer_token, skills="plumbing,painting")[0] == [
+            601,
+            602,
+            604,
+        ]
+        assert search(
+            client, customer_token, skills="plumbing,painting", match="all"
+        )[0] == [602]
+        assert search(client, customer_token, location="SOUTH")[0] == [603]
+        assert search(client, customer_token, min_rate=60, max_rate=100)[0] == [602]
+        assert search(
+            client, customer_token, skills="Painting", min_experience=5
+        )[0] == [604]
+
+    def test_keyset_pagination(self, client, customer_token, skilled_providers):
+        """测试按游标翻页"""
+        first, cursor = search(client, customer_token, limit=3)
+        assert first == [601, 602, 603] and cursor == 603
+        second, cursor = search(client, customer_token, limit=3, after=cursor)
+        assert second == [604] and cursor is None
+
+    def test_invalid_range(self, client, customer_token, skilled_providers):
+        """测试非法时薪区间"""
+        response = client.get(
+            "/providers/search",
+            params={"min_rate": 100, "max_rate": 10},
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_profile_update_syncs_skills(
+        self, client, db_session, provider_user, provider_token
+    ):
+        """测试更新服务商资料时同步技能表"""
+        db_session.add(ProviderProfile(id=provider_user.id, skills=""))
+        await db_session.commit()
+        response = client.put(
+            "/profile/update_provider_profile",
+            json={"skills": '["Roofing", "Welding"]'},
+            headers=auth(provider_token),
+        )
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(ProviderSkill.skill)
+            .where(ProviderSkill.provider_id == provider_user.id)
+            .order_by(ProviderSkill.skill)
+        )
+        assert result.scalars().all() == ["roofing", "welding"]
+        assert search(client, provider_token, skills="welding")[0] == [
+            provider_user.id
+        ]
@@ -0,0 +1,102 @@
+# app/test/test_reference_data.py
+import pytest
+from sqlalchemy import update
+
+from app.models.models import Role
+from app.services import reference_service
+from app.services.reference_service import (
+    get_role_id,
+    get_role_name,
+    refresh_reference_data,
+    role_cache,
+)
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestRoleReferenceData:
+    """角色参考数据缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_served_from_memory_until_refresh(self, db_session):
+        """测试加载后不再查询，显式刷新后生效"""
+        assert await get_role_name(db_session, 2) == "provider"
+        assert await get_role_id(db_session, "admin") == 3
+
+        await db_session.execute(
+            update(Role).where(Role.id == 2).values(role_name="vendor")
+        )
+        await db_session.commit()
+        assert await get_role_name(db_session, 2) == "provider"
+
+        assert await refresh_reference_data(db_session) == {
+            1: "customer",
+            2: "vendor",
+            3: "admin",
+        }
+        assert await get_role_name(db_session, 2) == "vendor"
+
+    @pytest.mark.asyncio
+    async def test_unknown_role_reloads_rate_limited(self, db_session, monkeypatch):
+        """测试未知角色不会每次都重新加载，间隔过后或显式刷新后可见"""
+        loads = []
+        load = role_cache.load
+
+        async def counting_load(db):
+            loads.append(db)
+            await load(db)
+
+        monkeypatch.setattr(role_cache, "load", counting_load)
+        assert await get_role_name(db_session, 1) == "customer"
+        for _ in range(5):
+            assert await get_role_name(db_session, 99) is None
+            assert await get_role_id(db_session, "wizard") is None
+        assert len(loads) == 1
+
+        db_session.add(Role(id=4, role_name="auditor"))
+        await db_session.commit()
+        assert await get_role_name(db_session, 4) is None
+        monkeypatch.setattr(reference_service, "MISS_RELOAD_SECONDS", 0)
+        assert await get_role_name(db_session, 4) == "auditor"
+        assert len(loads) == 2
+
+    def test_register_rejects_unknown_role(self, client):
+        """测试注册时拒绝不存在的角色"""
+        response = client.post(
+            "/auth/register",
+            json={
+                "username": "ghost",
+                "email": "ghost@test.com",
+                "password": "secret123",
+                "role_id": 99,
+            },
+        )
+        assert response.status_code == 400
+
+    def test_admin_list_by_role_name(
+        self, client, admin_token, customer_user, provider_user
+    ):
+        """测试管理员按角色名筛选用户"""
+        response = client.get(
+            "/admin/users/", params={"role": "provider"}, headers=auth(admin_token)
+        )
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [(u["id"], u["role"]) for u in items] == [(provider_user.id, "provider")]
+
+        response = client.get(
+            "/admin/users/", params={"role": "wizard"}, headers=auth(admin_token)
+        )
+        assert response.status_code == 422
+
+    def test_refresh_endpoint_is_admin_only(self, client, admin_token, customer_token):
+        """测试参考数据刷新接口仅限管理员"""
+        response = client.post("/admin/cache/reference/refresh", headers=auth(admin_token))
+        assert response.status_code == 200
+        assert response.json()["roles"]["2"] == "provider"
+        response = client.post(
+            "/admin/cache/reference/refresh", headers=auth(customer_token)
+        )
+        assert response.status_code == 403
@@ -0,0 +1,318 @@
+# app/test/test_review_ratings.py
+import asyncio
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.models import (
+    Base,
+    PaymentStatus,
+    ProviderRatingSummary,
+    User,
+)
+from app.services.customer_service import ReviewData, review_order
+from app.services.review_service import (
+    ReviewError,
+    create_review,
+    get_provider_rating,
+    get_provider_ratings,
+    rebuild_provider_ratings,
+)
+
+
+class TestProviderRatingSummary:
+    """服务商评分汇总测试"""
+
+    @pytest.mark.asyncio
+    async def test_both_review_paths_update_summary(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        provider_user,
+        make_orders,
+    ):
+        """测试两条评价路径都在同一事务内更新汇总"""
+        orders = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10] * 3,
+            first_id=6000,
+            payment_status=PaymentStatus.paid,
+        )
+        for order, stars in zip(orders[:2], (5, 3)):
+            response = client.post(
+                "/reviews/",
+                headers={"Authorization": f"Bearer {customer_token}"},
+                json={"order_id": order.id, "stars": stars, "content": "ok"},
+            )
+            assert response.status_code == 201
+        await review_order(db_session, customer_user.id, ReviewData(orders[2].id, 5))
+
+        response = client.get(f"/reviews/provider/{provider_user.id}/rating")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_reviews"] == 3
+        assert data["average_rating"] == pytest.approx(13 / 3)
+        assert data["histogram"] == {"1": 0, "2": 0, "3": 1, "4": 0, "5": 2}
+
+    def test_rating_without_reviews(self, client, provider_user):
+        """测试无评价时返回0"""
+        response = client.get(f"/reviews/provider/{provider_user.id}/rating")
+        assert response.status_code == 200
+        assert response.json()["total_reviews"] == 0
+        assert response.json()["average_rating"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_invalid_stars_rejected(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        provider_user,
+        make_orders,
+    ):
+        """测试星级越界被拒绝"""
+        orders = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10],
+            first_id=6000,
+            payment_status=PaymentStatus.paid,
+        )
+        response = client.post(
+            "/reviews/",
+            headers={"Authorization": f"Bearer {customer_token}"},
+            json={"order_id": orders[0].id, "stars": 6},
+        )
+        assert response.status_code == 400
+        with pytest.raises(ValueError):
+            await review_order(db_session, customer_user.id, ReviewData(orders[0].id, 0))
+
+    @pytest.mark.asyncio
+    async def test_rebuild_repairs_drift(
+        self, db_session, customer_user, provider_user, make_orders
+    ):
+        """测试从评价表重建汇总"""
+        orders = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10] * 2,
+            first_id=6000,
+            payment_status=PaymentStatus.paid,
+        )
+        for order, stars in zip(orders, (4, 1)):
+            await review_order(db_session, customer_user.id, ReviewData(order.id, stars))
+
+        await db_session.execute(
+            update(ProviderRatingSummary).values(review_count=9, stars_sum=1)
+        )
+        await db_session.commit()
+
+        assert await rebuild_provider_ratings(db_session) == 1
+        provider_id = provider_user.id
+        db_session.expire_all()
+        rating = await get_provider_rating(db_session, provider_id)
+        assert rating["total_reviews"] == 2
+        assert rating["average_rating"] == 2.5
+        assert rating["histogram"]["1"] == 1 and rating["histogram"]["4"] == 1
+
+
+class TestBatchRatings:
+    """批量评分查询测试"""
+
+    @pytest.mark.asyncio
+    async def test_batch_lookup_and_embedding(
+        self,
+        client,
+        customer_token,
+        admin_token,
+        db_session,
+        customer_user,
+        provider_user,
+        make_orders,
+    ):
+        """测试批量接口及列表内嵌评分"""
+        orders = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10] * 2,
+            first_id=6000,
+            payment_status=PaymentStatus.paid,
+        )
+        for order, stars in zip(orders, (5, 4)):
+            await review_order(db_session, customer_user.id, ReviewData(order.id, stars))
+
+        response = client.get(
+            f"/reviews/providers/ratings?ids={provider_user.id},424242,{provider_user.id}"
+        )
+        assert response.status_code == 200
+        assert [(r["provider_id"], r["total_reviews"]) for r in response.json()] == [
+            (provider_user.id, 2),
+            (424242, 0),
+        ]
+
+        response = client.get(
+            "/customer/orders/history",
+            headers={"Authorization": f"Bearer {customer_token}"},
+        )
+        assert response.status_code == 200
+        rated = [o for o in response.json() if o["provider_id"] == provider_user.id]
+        assert rated and all(o["provider_rating"]["average_rating"] == 4.5 for o in rated)
+
+        response = client.get(
+            "/admin/users/", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        by_role = {u["role_id"]: u for u in response.json()["items"]}
+        assert by_role[2]["rating"]["total_reviews"] == 2
+        assert by_role[1]["rating"] is None
+
+    def test_batch_lookup_validation(self, client):
+        """测试参数校验"""
+        assert client.get("/reviews/providers/ratings?ids=1,x").status_code == 400
+        too_many = ",".join(str(i) for i in range(600))
+        response = client.get(f"/reviews/providers/ratings?ids={too_many}")
+        assert response.status_code == 400
+        assert response.json()["detail"] == (
+            "At most 500 providers can be requested at once."
+        )
+
+    @pytest.mark.asyncio
+    async def test_batch_service_splits_large_id_lists(
+        self, db_session, customer_user, provider_user, make_orders
+    ):
+        """测试内部调用可传入超过单条查询上限的服务商 id"""
+        (order,) = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10],
+            first_id=6050,
+            payment_status=PaymentStatus.paid,
+        )
+        await review_order(db_session, customer_user.id, ReviewData(order.id, 3))
+
+        ids = list(range(900000, 901200)) + [provider_user.id]
+        ratings = await get_provider_ratings(db_session, ids)
+        assert len(ratings) == len(ids)
+        assert ratings[provider_user.id]["total_reviews"] == 1
+        assert ratings[900000]["total_reviews"] == 0
+
+
+class TestInsertFirstReviews:
+    """评价先插入后依赖唯一约束的测试"""
+
+    @pytest.mark.asyncio
+    async def test_route_messages_for_unpaid_orders(
+        self, client, customer_token, customer_user, provider_user, make_orders
+    ):
+        """测试两个评价接口对未支付订单各自的错误信息"""
+        (unpaid,) = await make_orders(
+            customer_user.id, provider_user.id, [10], first_id=6100
+        )
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        response = client.post(
+            "/reviews/", headers=headers, json={"order_id": unpaid.id, "stars": 4}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "You can only review paid orders"
+        response = client.post(
+            "/customer/orders/review",
+            headers=headers,
+            json={"order_id": unpaid.id, "stars": 4},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Only paid orders can be reviewed!"
+
+    @pytest.mark.asyncio
+    async def test_duplicate_review_rejected_by_constraint(
+        self,
+        client,
+        customer_token,
+        db_session,
+        customer_user,
+        provider_user,
+        make_orders,
+    ):
+        """测试重复评价返回400且汇总只计一次"""
+        orders = await make_orders(
+            customer_user.id,
+            provider_user.id,
+            [10],
+            first_id=6000,
+            payment_status=PaymentStatus.paid,
+        )
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        payload = {"order_id": orders[0].id, "stars": 5}
+        assert client.post("/reviews/", headers=headers, json=payload).status_code == 201
+        response = client.post("/reviews/", headers=headers, json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "This order has already been reviewed"
+        response = client.post(
+            "/reviews/", headers=headers, json={"order_id": 987654, "stars": 5}
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == (
+            "Order not found or you don't have permission to review this order"
+        )
+
+        # 客户订单接口保留自己的信息  # The customer endpoint keeps its own messages
+        response = client.post("/customer/orders/review", headers=headers, json=payload)
+        assert response.json()["detail"] == "Order already reviewed!"
+
+        rating = await get_provider_rating(db_session, provider_user.id)
+        assert rating["total_reviews"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reviews_for_one_order(tmp_path, make_orders):
+    """并发评价同一订单只有一条成功"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'reviews.db'}",
+        connect_args={"timeout": 30},
+    )
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessions() as session:
+        for user_id, role_id in ((1, 1), (2, 2)):
+            session.add(
+                User(
+                    id=user_id,
+                    username=f"user{user_id}",
+                    email=f"user{user_id}@test.com",
+                    password_hash="x",
+                    role_id=role_id,
+                )
+            )
+        await make_orders(
+            1,
+            2,
+            [10],
+            first_id=6000,
+            session=session,
+            payment_status=PaymentStatus.paid,
+        )
+
+    async def attempt(stars):
+        async with sessions() as session:
+            try:
+                await create_review(session, 1, 6000, stars)
+                return "ok"
+            except ReviewError as e:
+                await session.rollback()
+                return str(e)
+
+    try:
+        outcomes = await asyncio.gather(*(attempt(1 + i % 5) for i in range(20)))
+        async with sessions() as session:
+            rating = await get_provider_rating(session, 2)
+    finally:
+        await engine.dispose()
+
+    assert outcomes.count("ok") == 1
+    assert set(outcomes) == {"ok", "Order already reviewed!"}
+    assert rating["total_reviews"] == 1
@@ -0,0 +1,178 @@
+# app/test/test_scanner_ingestion.py
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.models import SecurityIssue
+from app.services import scanner_ingestion_service
+from app.services.scanner_ingestion_service import parse_safety
+from app.utils.json_stream import JSONStreamError, iter_array_items
+from app.utils.process_pool import shutdown_process_pool
+
+REPORTS = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    shutdown_process_pool()
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def collect(data: bytes, key, chunk_size):
+    async def chunks():
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    return [item async for item in iter_array_items(chunks(), key)]
+
+
+async def count_issues(db_session):
+    return await db_session.scalar(select(func.count()).select_from(SecurityIssue))
+
+
+class TestJsonStream:
+    """流式 JSON 解析测试"""
+
+    async def test_items_match_json_load(self):
+        """测试任意分块大小下结果与 json.load 一致"""
+        data = (REPORTS / "sast_bandit_report.json").read_bytes()
+        expected = json.loads(data)["results"]
+        for chunk_size in (1, 13, 65536):
+            assert await collect(data, "results", chunk_size) == expected
+
+    async def test_numbers_split_across_chunks(self):
+        """测试跨块的数字"""
+        data = b'{"results": [12345, -1.5e3, {"n": 10}]}'
+        assert await collect(data, "results", 1) == [12345, -1500.0, {"n": 10}]
+
+    async def test_values_spanning_chunks(self):
+        """测试跨多块的字符串、转义与被跳过的成员"""
+        tricky = 'quote " backslash \\ brackets ]}{[ é ' * 50
+        document = {
+            "metrics": {"files": [{"name": tricky, "loc": i} for i in range(50)]},
+            "results": [{"code": tricky, "line": 1}, tricky, [[], {}]],
+        }
+        data = json.dumps(document, ensure_ascii=False).encode()
+        for chunk_size in (1, 7, 4096):
+            assert await collect(data, "results", chunk_size) == document["results"]
+
+    async def test_banner_and_project_list(self):
+        """测试跳过命令行横幅，支持多项目数组"""
+        data = b"+==== banner ====+\n" + json.dumps(
+            [{"vulnerabilities": [1, 2]}, {"ok": True}, {"vulnerabilities": [3]}]
+        ).encode()
+        assert await collect(data, "vulnerabilities", 5) == [1, 2, 3]
+
+    @pytest.mark.parametrize(
+        "data", [b"no json here", b'{"results": [1, 2', b'{"results": [1 2]}']
+    )
+    async def test_malformed(self, data):
+        """测试格式错误"""
+        with pytest.raises(JSONStreamError):
+            await collect(data, "results", 4)
+
+
+class TestScannerIngestion:
+    """扫描报告导入测试"""
+
+    def test_ingest_snyk_report(self, client, customer_token):
+        """测试导入 Snyk 报告并更新统计"""
+        response = client.post(
+            "/api/security/ingest/snyk",
+            content=(REPORTS / "snyk-report.json").read_bytes(),
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 201
+        summary = response.json()
+        # 同一漏洞经多条依赖路径上报，合并为一条
+        # Snyk repeats a vulnerability per dependency path; those merge
+        counts = {key: summary[key] for key in ("findings", "inserted", "merged")}
+        assert counts == {"findings": 12, "inserted": 8, "merged": 4}
+        assert summary["by_type"] == {"SCA": 12}
+        assert summary["by_severity"] == {"HIGH": 7, "MEDIUM": 5}
+
+        issues = client.get(
+            "/api/security/issues", params={"limit": 100}, headers=auth(customer_token)
+        ).json()
+        aiomysql = [i for i in issues if i["affected_component"] == "aiomysql@0.2.0"]
+        assert aiomysql[0]["vulnerability_id"] == "CVE-2025-62611"
+        assert aiomysql[0]["detection_method"] == "Snyk report"
+
+        stats = client.get("/api/security/statistics", headers=auth(customer_token))
+        assert stats.json()["total"] == 8
+
+    async def test_ingest_bandit_in_batches(
+        self, client, customer_token, db_session, monkeypatch
+    ):
+        """测试 Bandit 报告分批分类写入"""
+        monkeypatch.setattr(scanner_ingestion_service, "INGEST_BATCH_SIZE", 50)
+        response = client.post(
+            "/api/security/ingest/bandit",
+            content=(REPORTS / "sast_bandit_report.json").read_bytes(),
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 201
+        summary = response.json()
+        # 每个发现位置不同，不合并  # Every finding has its own file:line
+        assert (summary["inserted"], summary["merged"]) == (124, 0)
+        assert await count_issues(db_session) == 124
+        components = await db_session.scalars(
+            select(SecurityIssue.affected_component).where(
+                SecurityIssue.affected_component.like("%orders_test.py:%")
+            )
+        )
+        assert len(set(components)) == 39
+
+    def test_safety_formats(self):
+        """测试 Safety 新旧两种格式"""
+        current = parse_safety(
+            {
+                "package_name": "jinja2",
+                "analyzed_version": "2.10",
+                "vulnerable_spec": "<2.11.3",
+                "advisory": "ReDoS in the urlize filter",
+                "vulnerability_id": "39525",
+                "CVE": "CVE-2020-28493",
+                "severity": {"cvssv3": {"base_severity": "MEDIUM"}},
+            }
+        )
+        legacy = parse_safety(["jinja2", "<2.11.3", "2.10", "ReDoS", "39525"])
+        assert (current["vulnerability_id"], current["severity"]) == (
+            "CVE-2020-28493",
+            "MEDIUM",
+        )
+        assert (legacy["vulnerability_id"], legacy["severity"]) == ("PYUP-39525", None)
+        assert current["component"] == legacy["component"] == "jinja2@2.10"
+
+    async def test_rejected_reports_store_nothing(
+        self, client, customer_token, db_session, monkeypatch
+    ):
+        """测试无效报告返回错误且不写入任何数据"""
+        # 仓库中的 Safety 报告只有弃用横幅  # The checked-in safety report is only a banner
+        cases = [
+            ("safety", (REPORTS / "sast_safety_reportbefore.json").read_bytes(), 400),
+            ("snyk", b'{"vulnerabilities": [{"title": "x"}, ', 400),
+            ("nessus", b"{}", 404),
+        ]
+        for report_format, body, expected in cases:
+            response = client.post(
+                f"/api/security/ingest/{report_format}",
+                content=body,
+                headers=auth(customer_token),
+            )
+            assert response.status_code == expected
+
+        monkeypatch.setenv("SECURITY_INGEST_MAX_FINDINGS", "10")
+        response = client.post(
+            "/api/security/ingest/snyk",
+            content=(REPORTS / "snyk-report.json").read_bytes(),
+            headers=auth(customer_token),
+        )
+        assert response.status_code == 413
+        assert await count_issues(db_session) == 0
@@ -0,0 +1,79 @@
+# app/test/test_security_issue_dedup.py
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from app.models.models import SecurityIssue, security_issue_fingerprint
+from app.utils.process_pool import shutdown_process_pool
+
+SNYK_REPORT = Path(__file__).resolve().parents[2] / "snyk-report.json"
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def teardown_module():
+    shutdown_process_pool()
+
+
+class TestSecurityIssueDedup:
+    """安全问题指纹去重测试"""
+
+    def test_fingerprint_normalization(self):
+        """测试指纹忽略大小写和首尾空白，区分组件"""
+        base = security_issue_fingerprint("CVE-2021-44228", "log4j", "a")
+        assert base == security_issue_fingerprint(" cve-2021-44228 ", "Log4J ", "b")
+        assert base != security_issue_fingerprint("CVE-2021-44228", "other", "a")
+        # 没有漏洞编号时按标题  # Without an id the title decides
+        assert security_issue_fingerprint(None, "api", "Open  Redirect") == (
+            security_issue_fingerprint("", "API", "open redirect")
+        )
+
+    async def test_create_twice_bumps_occurrence(
+        self, client, customer_token, db_session
+    ):
+        """测试重复上报返回原问题并累加次数"""
+        body = {
+            "title": "Outdated package",
+            "description": "lodash version 4.17.15 CVE-2020-8203",
+            "affected_component": "web",
+        }
+        first = client.post(
+            "/api/security/issues", json=body, headers=auth(customer_token)
+        )
+        assert first.status_code == 201
+        assert first.json()["occurrence_count"] == 1
+
+        body["title"] = "lodash prototype pollution"
+        second = client.post(
+            "/api/security/issues", json=body, headers=auth(customer_token)
+        )
+        assert second.status_code == 201
+        assert second.json()["id"] == first.json()["id"]
+        assert second.json()["occurrence_count"] == 2
+        assert second.json()["last_seen"] >= first.json()["last_seen"]
+        count = await db_session.scalar(
+            select(func.count()).select_from(SecurityIssue)
+        )
+        assert count == 1
+
+    async def test_reingesting_report_adds_no_rows(
+        self, client, customer_token, db_session
+    ):
+        """测试重复导入同一报告只更新次数"""
+        for _ in range(2):
+            response = client.post(
+                "/api/security/ingest/snyk",
+                content=SNYK_REPORT.read_bytes(),
+                headers=auth(customer_token),
+            )
+            assert response.status_code == 201
+        assert (response.json()["inserted"], response.json()["merged"]) == (0, 12)
+
+        rows = (
+            await db_session.execute(
+                select(func.count(), func.sum(SecurityIssue.occurrence_count))
+            )
+        ).one()
+        assert tuple(rows) == (8, 24)
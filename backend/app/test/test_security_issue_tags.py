@@ -0,0 +1,108 @@
+# app/test/test_security_issue_tags.py
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.models.models import SecurityIssue, SecurityIssueTag
+from app.services.security_issue_service import (
+    normalize_tags,
+    rebuild_security_issue_tags,
+)
+from app.utils.process_pool import shutdown_process_pool
+
+SNYK_REPORT = Path(__file__).resolve().parents[2] / "snyk-report.json"
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def teardown_module():
+    shutdown_process_pool()
+
+
+@pytest_asyncio.fixture
+async def snyk_issues(client, customer_token, db_session):
+    """导入 Snyk 报告，返回 {id: JSON 列中的标签}"""
+    response = client.post(
+        "/api/security/ingest/snyk",
+        content=SNYK_REPORT.read_bytes(),
+        headers=auth(customer_token),
+    )
+    assert response.status_code == 201
+    result = await db_session.execute(select(SecurityIssue.id, SecurityIssue.tags))
+    return {issue_id: sorted(json.loads(tags)) for issue_id, tags in result.all()}
+
+
+async def tag_rows(db_session):
+    result = await db_session.execute(
+        select(SecurityIssueTag.issue_id, SecurityIssueTag.tag)
+    )
+    return sorted(result.all())
+
+
+class TestSecurityIssueTags:
+    """安全问题标签表测试"""
+
+    def test_normalize_tags(self):
+        """测试标签文本规范化"""
+        assert normalize_tags('["web", "SCA", "web", " "]') == ["SCA", "web"]
+        assert normalize_tags("not json") == normalize_tags(None) == []
+
+    def test_list_reads_tag_table(self, client, customer_token, snyk_issues):
+        """测试列表标签来自标签表且与 JSON 列一致"""
+        issues = client.get(
+            "/api/security/issues", params={"limit": 100}, headers=auth(customer_token)
+        ).json()
+        assert {i["id"]: i["tags"] for i in issues} == snyk_issues
+
+    def test_tag_filter(self, client, customer_token, snyk_issues):
+        """测试按标签过滤"""
+        for tag in ("crypto", "SCA", "missing"):
+            issues = client.get(
+                "/api/security/issues",
+                params={"tag": tag, "limit": 100},
+                headers=auth(customer_token),
+            ).json()
+            expected = {i for i, tags in snyk_issues.items() if tag in tags}
+            assert {i["id"] for i in issues} == expected
+
+    def test_tag_facet(self, client, customer_token, snyk_issues):
+        """测试标签计数，支持与列表相同的过滤"""
+        response = client.get("/api/security/tags", headers=auth(customer_token))
+        assert response.status_code == 200
+        facet = response.json()
+        expected = Counter(tag for tags in snyk_issues.values() for tag in tags)
+        assert {f["tag"]: f["count"] for f in facet} == expected
+        assert facet[0] == {"tag": "SCA", "count": len(snyk_issues)}
+        assert [f["count"] for f in facet] == sorted(
+            (f["count"] for f in facet), reverse=True
+        )
+
+        filtered = client.get(
+            "/api/security/tags",
+            params={"issue_type": "SAST"},
+            headers=auth(customer_token),
+        )
+        assert filtered.json() == []
+
+    async def test_rebuild_matches_writes(self, db_session, snyk_issues):
+        """测试从 JSON 列重建的标签表与写入时一致"""
+        written = await tag_rows(db_session)
+        assert len(written) == sum(len(tags) for tags in snyk_issues.values())
+        await rebuild_security_issue_tags(db_session)
+        assert await tag_rows(db_session) == written
+
+    async def test_delete_removes_tags(
+        self, client, admin_token, db_session, snyk_issues
+    ):
+        """测试删除问题同时删除标签"""
+        issue_id = next(iter(snyk_issues))
+        response = client.delete(
+            f"/api/security/issues/{issue_id}", headers=auth(admin_token)
+        )
+        assert response.status_code == 204
+        assert all(row[0] != issue_id for row in await tag_rows(db_session))
@@ -0,0 +1,101 @@
+# app/test/test_security_statistics.py
+from datetime import datetime
+from decimal import Decimal
+
+import pytest_asyncio
+
+from app.models.models import (
+    SecurityIssue,
+    SecurityIssueStatus,
+    SecurityIssueType,
+    SecuritySeverity,
+)
+from app.services.security_issue_service import (
+    get_issue_statistics,
+    invalidate_issue_statistics,
+    stats_cache,
+)
+
+
+def make_issue(issue_id, issue_type, severity, status, confidence, reported_by):
+    now = datetime.utcnow()
+    return SecurityIssue(
+        id=issue_id,
+        title=f"Issue {issue_id}",
+        description="seeded",
+        issue_type=issue_type,
+        severity=severity,
+        status=status,
+        confidence_score=Decimal(confidence),
+        reported_by=reported_by,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest_asyncio.fixture
+async def seeded_issues(db_session, customer_user):
+    rows = [
+        (SecurityIssueType.SAST, SecuritySeverity.HIGH, SecurityIssueStatus.OPEN, "80"),
+        (SecurityIssueType.SAST, SecuritySeverity.HIGH, SecurityIssueStatus.RESOLVED, "60"),
+        (SecurityIssueType.SCA, SecuritySeverity.LOW, SecurityIssueStatus.OPEN, "45.50"),
+    ]
+    issues = [
+        make_issue(i, *row, reported_by=customer_user.id)
+        for i, row in enumerate(rows, start=1)
+    ]
+    db_session.add_all(issues)
+    await db_session.commit()
+    return issues
+
+
+EXPECTED = {
+    "total": 3,
+    "by_type": {"SAST": 2, "SCA": 1},
+    "by_severity": {"HIGH": 2, "LOW": 1},
+    "by_status": {"OPEN": 2, "RESOLVED": 1},
+    "avg_confidence": 61.83,
+}
+
+
+class TestSecurityStatistics:
+    """安全问题统计测试"""
+
+    async def test_empty_table(self, db_session):
+        """测试无数据时返回零值"""
+        assert await get_issue_statistics(db_session) == {
+            "total": 0,
+            "by_type": {},
+            "by_severity": {},
+            "by_status": {},
+            "avg_confidence": 0.0,
+        }
+
+    async def test_grouped_counts(self, db_session, seeded_issues):
+        """测试分组聚合结果"""
+        assert await get_issue_statistics(db_session) == EXPECTED
+
+    async def test_cached_until_invalidated(self, db_session, seeded_issues):
+        """测试缓存复用，写入后失效"""
+        first = await get_issue_statistics(db_session)
+        first["by_type"]["SAST"] = 99
+
+        seeded_issues[2].status = SecurityIssueStatus.RESOLVED
+        await db_session.commit()
+        assert await get_issue_statistics(db_session) == EXPECTED
+        assert stats_cache.stats()["hits"] == 1
+
+        invalidate_issue_statistics()
+        stats = await get_issue_statistics(db_session)
+        assert stats["by_status"] == {"OPEN": 1, "RESOLVED": 2}
+
+    def test_route(self, client, customer_token, seeded_issues):
+        """测试统计接口"""
+        response = client.get(
+            "/api/security/statistics",
+            headers={"Authorization": f"Bearer {customer_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        for key, value in EXPECTED.items():
+            assert data[key] == value
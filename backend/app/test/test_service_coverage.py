@@ -11,9 +11,9 @@ from sqlalchemy import select
 
 from app.models.models import (
     User, Order, Review, ServiceType, OrderStatus, PaymentStatus,
-    LocationEnum, CustomerProfile, ProviderProfile
+    LocationEnum, CustomerProfile, ProviderProfile, Payment
 )
-from app.services import customer_service, provider_service, profile_service
+from app.services import customer_service, earnings_service, provider_service, profile_service
 
 
 class TestCustomerService:
@@ -798,6 +798,16 @@ class TestProviderService:
             )
             db_session.add(order)
         await db_session.commit()
+        # 收入读取支付时维护的汇总表  # Earnings are read from the summary kept at payment time
+        await earnings_service.record_payments(
+            db_session,
+            [
+                Payment(provider_id=provider_user.id, amount=Decimal(str(price)), created_at=datetime.now())
+                for payment_status, price in orders_data
+                if payment_status == PaymentStatus.paid
+            ],
+        )
+        await db_session.commit()
         
         earnings = await provider_service.calculate_provider_total_earnings(
             db_session, provider_id=provider_user.id
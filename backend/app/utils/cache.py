@@ -0,0 +1,87 @@
+"""
+Bounded in-process cache with per-entry TTL and LRU eviction.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+# 所有已创建的缓存，供管理员查看统计  # Every cache created, for the admin stats view
+CACHE_REGISTRY: Dict[str, "TTLCache"] = {}
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire ``ttl`` seconds after being set.
+
+    Args:
+        name: Name shown in the stats (must be unique)
+        maxsize: Maximum number of entries before the least recently used is dropped
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        CACHE_REGISTRY[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING or item[0] <= time.monotonic():
+            if item is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._data.pop(key, _MISSING) is not _MISSING:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_stats(names: Optional[List[str]] = None) -> List[dict]:
+    """Stats of the registered caches, optionally limited to ``names``."""
+    return [
+        cache.stats()
+        for name, cache in sorted(CACHE_REGISTRY.items())
+        if names is None or name in names
+    ]
@@ -0,0 +1,238 @@
+"""
+Incremental reading of large JSON documents.
+
+Scanner reports keep their findings in one array (snyk "vulnerabilities",
+bandit "results", ...). iter_array_items walks the document as its bytes
+arrive and yields the array's items one by one, so a report never has
+to be held, or parsed, as a whole. Text already consumed is dropped from
+the buffer.
+
+Each value's extent is found first by scanning for brackets and quotes,
+resuming where the previous chunk stopped, so every character is scanned
+once however many chunks a value spans. The item is then decoded once with
+json.JSONDecoder.raw_decode; members outside the array (bandit's
+"metrics", ...) are skipped without being decoded.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Optional
+
+_NON_SPACE = re.compile(r"\S")
+_DOCUMENT_START = re.compile(r"[\[{]")
+_SCALAR_END = re.compile(r"[\s,\]}]")
+# 完整的字符串、开括号、闭括号，或缓冲区里未结束的字符串的引号
+# A whole string, an opening bracket, a closing bracket, or the quote of a
+# string the buffer ends inside
+_TOKEN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")|([\[{])|([\]}])|"', re.DOTALL)
+_STRING_SPECIAL = re.compile(r'["\\]')
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    """The input is not the JSON document that was expected."""
+
+
+class _Reader:
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        # 已丢弃文本的长度，用于报错位置  # Length of dropped text, for error offsets
+        self.dropped = 0
+        self.eof = False
+
+    async def fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the input is exhausted."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+            text = self._utf8.decode(chunk)
+        except StopAsyncIteration:
+            self.eof = True
+            text = self._utf8.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise JSONStreamError("Input is not valid UTF-8") from None
+        self.dropped += self.pos
+        self.buffer = self.buffer[self.pos :] + text
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> JSONStreamError:
+        return JSONStreamError(f"{message} at offset {self.dropped + self.pos}")
+
+    async def seek(self, pattern: re.Pattern) -> str:
+        """Move to the next match of ``pattern`` and return its character ('' at EOF)."""
+        while True:
+            match = pattern.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not await self.fill():
+                return ""
+
+    async def peek(self) -> str:
+        """The next non-whitespace character ('' at EOF)."""
+        return await self.seek(_NON_SPACE)
+
+    async def expect(self, *chars: str) -> str:
+        char = await self.peek()
+        if char not in chars:
+            raise self.error(f"Expected {' or '.join(map(repr, chars))}")
+        self.pos += 1
+        return char
+
+    async def value_end(self) -> int:
+        """
+        Read until the JSON value at the reader is complete and return the
+        buffer index just past it. Only brackets and strings are tracked;
+        raw_decode (in value) checks the rest.
+        """
+        char = await self.peek()
+        if not char:
+            raise self.error("Unexpected end of input")
+        if char not in '[{"':
+            # 标量（数字等）只有看到后面的分隔符才算完整
+            # A scalar (number, true, ...) ends only at a delimiter
+            while True:
+                match = _SCALAR_END.search(self.buffer, self.pos)
+                if match:
+                    return match.start()
+                if not await self.fill():
+                    return len(self.buffer)
+
+        depth = 0
+        in_string = False
+        # 相对 pos 的扫描进度，fill() 会移动缓冲区
+        # Scan progress relative to pos, which fill() rebases
+        scanned = 0
+        while True:
+            buffer = self.buffer
+            i = self.pos + scanned
+            while True:
+                if in_string:
+                    # 跨块的字符串，逐个转义扫描  # A string split across chunks
+                    match = _STRING_SPECIAL.search(buffer, i)
+                    if not match:
+                        i = len(buffer)
+                        break
+                    if match.group() == "\\":
+                        if match.end() == len(buffer):
+                            # 转义字符还没到  # The escaped character has not arrived
+                            i = match.start()
+                            break
+                        i = match.end() + 1
+                        continue
+                    i = match.end()
+                    in_string = False
+                    if depth == 0:
+                        return i
+                    continue
+                match = _TOKEN.search(buffer, i)
+                if not match:
+                    i = len(buffer)
+                    break
+                i = match.end()
+                token = match.lastindex
+                if token is None:
+                    # 字符串在缓冲区末尾还没结束  # A string the buffer ends inside
+                    in_string = True
+                elif token == 2:
+                    depth += 1
+                elif token == 1 and depth == 0:
+                    return i
+                elif token == 3:
+                    depth -= 1
+                    if depth == 0:
+                        return i
+            scanned = i - self.pos
+            if not await self.fill():
+                raise self.error("Malformed JSON")
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        end = await self.value_end()
+        try:
+            value, stop = _decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            stop = None
+        if stop != end:
+            raise self.error("Malformed JSON")
+        self.pos = end
+        return value
+
+    async def skip(self) -> None:
+        """Move past the next JSON value without decoding it."""
+        self.pos = await self.value_end()
+
+
+async def _array_items(reader: _Reader) -> AsyncIterator[Any]:
+    await reader.expect("[")
+    if await reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield await reader.value()
+        if await reader.expect(",", "]") == "]":
+            return
+
+
+async def _object_items(reader: _Reader, key: str) -> AsyncIterator[Any]:
+    """Items of the array at ``key`` in the object at the reader; skips other members."""
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        if await reader.peek() != '"':
+            raise reader.error("Expected an object key")
+        name = await reader.value()
+        await reader.expect(":")
+        if name == key and await reader.peek() == "[":
+            async for item in _array_items(reader):
+                yield item
+        else:
+            await reader.skip()
+        if await reader.expect(",", "}") == "}":
+            return
+
+
+async def iter_array_items(
+    chunks: AsyncIterator[bytes], key: Optional[str] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield the items of the array stored under ``key`` in the top-level
+    object of the UTF-8 JSON document read from ``chunks``; with no key,
+    the items of a top-level array.
+
+    A top-level array is accepted for a key too: object elements are
+    searched for ``key`` (one report per project), other elements are
+    yielded as items. Text before the document, such as a CLI banner, is
+    skipped. Raises JSONStreamError for input that is not such a document.
+    """
+    reader = _Reader(chunks)
+    start = await reader.seek(_DOCUMENT_START)
+    if not start:
+        raise JSONStreamError("No JSON document found")
+    if start == "{":
+        if key is None:
+            raise reader.error("Expected an array")
+        async for item in _object_items(reader, key):
+            yield item
+        return
+
+    await reader.expect("[")
+    if await reader.peek() == "]":
+        return
+    while True:
+        if key is not None and await reader.peek() == "{":
+            async for item in _object_items(reader, key):
+                yield item
+        else:
+            yield await reader.value()
+        if await reader.expect(",", "]") == "]":
+            return
@@ -0,0 +1,38 @@
+"""
+Process pool shared by CPU-bound work that must not run on the event loop
+(bcrypt during bulk provisioning, large classification batches).
+
+Started on first use with the spawn method, so worker processes inherit
+neither the event loop nor its threads; stopped on app shutdown.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def worker_count() -> int:
+    """Number of processes in the pool."""
+    return settings.PROCESS_POOL_WORKERS
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The shared pool, started on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the pool; queued work is cancelled. The next use starts a new one."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
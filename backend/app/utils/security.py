@@ -1,6 +1,8 @@
 """
 Security utilities for password hashing and verification.
 """
+from typing import List
+
 import bcrypt
 
 
@@ -17,6 +19,19 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """
+    Hash several passwords; the unit of work sent to a hashing process pool.
+
+    Args:
+        passwords: Plain text passwords
+
+    Returns:
+        Hashed passwords, in input order
+    """
+    return [get_password_hash(password) for password in passwords]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
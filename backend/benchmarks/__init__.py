@@ -0,0 +1,2 @@
+# Standalone performance benchmarks. Run from the backend directory, e.g.
+#   python -m benchmarks.export_benchmark --rows 1000000
@@ -0,0 +1,69 @@
+"""
+Benchmark bulk user provisioning.
+
+Creates N customers once through auth_service.register_user, one after
+another as a script calling /auth/register would, and once through
+provisioning_service.provision_users (process-pool bcrypt, one pre-check
+query, multi-row INSERTs per batch). Hashing dominates both; the bulk path
+scales it with PROCESS_POOL_WORKERS and replaces 2N round trips with a
+handful per batch.
+
+    python -m benchmarks.bulk_provisioning_benchmark --users 200
+"""
+
+import argparse
+import asyncio
+import json
+
+from app.services.auth_service import register_user
+from app.services.provisioning_service import (
+    hash_passwords,
+    parse_ndjson,
+    provision_users,
+)
+from app.utils.process_pool import shutdown_process_pool
+from benchmarks.common import benchmark_database, timed
+
+
+def rows(prefix: str, users: int):
+    return [
+        {
+            "username": f"{prefix}_{i}",
+            "email": f"{prefix}_{i}@bench.test",
+            "password": "Secret123!",
+            "role_id": 1,
+        }
+        for i in range(users)
+    ]
+
+
+async def run(users: int):
+    # 预热进程池，不计入结果  # Start the pool outside the timed section
+    await hash_passwords(["warmup"])
+
+    async with benchmark_database() as session_factory:
+        with timed("register_user, one by one", users):
+            async with session_factory() as db:
+                for row in rows("single", users):
+                    await register_user(
+                        db, row["username"], row["email"], row["password"], 1
+                    )
+
+    async with benchmark_database() as session_factory:
+        body = "\n".join(json.dumps(row) for row in rows("bulk", users))
+        with timed("bulk NDJSON provisioning", users):
+            async with session_factory() as db:
+                results = await provision_users(db, parse_ndjson(body))
+        assert all(r["status"] == "created" for r in results)
+    shutdown_process_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark SecurityClassifierService.classify_issue.
+
+Classifies N generated issues (SCA/SAST/DAST-flavoured titles and
+descriptions, CVE/GHSA ids, some non-ASCII text) with the compiled
+single-scan rule set, and with the previous implementation that lowercased
+once but then ran every keyword test and uncompiled re.search separately in
+each helper. A third pass goes through the classification cache, modelling
+scanners that keep re-reporting the same F distinct findings. All passes
+must produce identical results for every issue; the run fails otherwise.
+
+    python -m benchmarks.classifier_benchmark --issues 100000 --findings 5000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from app.services.security_classifier_service import (
+    SecurityClassifierService,
+    classification_cache,
+)
+
+FRAGMENTS = [
+    "SQL injection in login endpoint",
+    "Reflected XSS via search parameter",
+    "cross-site scripting in comments",
+    "Outdated package lodash version 4.17.15",
+    "vulnerable package in requirements.txt",
+    "dependency has a known vulnerability",
+    "npm audit reports",
+    "hardcoded password in config module",
+    "insecure random used for session token",
+    "Remote code execution via deserialization",
+    "authentication bypass on /api/admin/users",
+    "Missing security header X-Frame-Options, header missing",
+    "GET /api/orders returns status code 500",
+    "HTTP/1.1 response leaks server version",
+    "weak cryptography (MD5) found at line 42",
+    "informational: best practice suggestion",
+    "privilege escalation through role parameter",
+    "SSRF in webhook URL handler",
+    "CORS policy allows any origin",
+    "code smell flagged by static analysis",
+    "function parse_input is vulnerable",
+    "Potential path traversal in file download",
+    "low risk notice about cookie flags",
+    "critical flaw in TLS certificate validation",
+    "Ünïcödé påyload in the configuration pipeline",
+    "paſſword hardcoded in KEY store",
+]
+IDS = ["CVE-2021-44228", "cve-2020-8203", "GHSA-jf85-cpcp-j695", "OSV-2022-1", ""]
+COMPONENTS = ["auth-service", "orders-api", "payment-gateway", "web frontend", ""]
+
+
+class LegacyClassifier(SecurityClassifierService):
+    """The pre-compilation classify_issue helpers, kept for comparison."""
+
+    def classify_issue(self, title, description, affected_component=""):
+        combined_text = f"{title} {description} {affected_component}".lower()
+        sca = self._legacy_type_score(combined_text, self.SCA_PATTERNS)
+        sast = self._legacy_type_score(combined_text, self.SAST_PATTERNS)
+        dast = self._legacy_type_score(combined_text, self.DAST_PATTERNS)
+        issue_type, confidence = self._determine_type(sca, sast, dast)
+        severity = self._legacy_severity(combined_text)
+        vuln_id = self._legacy_vulnerability_id(combined_text)
+        tags = self._legacy_tags(combined_text, issue_type)
+        return {
+            "issue_type": issue_type,
+            "severity": severity,
+            "confidence_score": self._confidence(confidence),
+            "vulnerability_id": vuln_id,
+            "tags": self._json(tags),
+            "remediation_suggestion": self._generate_remediation(
+                issue_type, severity, title, affected_component
+            ),
+            "remediation_priority": self._calculate_priority(severity, confidence),
+            "estimated_effort": self._estimate_effort(severity, issue_type),
+            "detection_method": "AI Pattern Matching",
+        }
+
+    @staticmethod
+    def _confidence(confidence):
+        from decimal import Decimal
+
+        return Decimal(str(round(confidence, 2)))
+
+    @staticmethod
+    def _json(tags):
+        import json
+
+        return json.dumps(tags)
+
+    def _legacy_type_score(self, text: str, patterns: Dict) -> float:
+        score = sum(1 for kw in patterns["keywords"] if kw in text) * 2
+        score += 3 * sum(
+            1
+            for pattern in patterns["indicators"]
+            if re.search(pattern, text, re.IGNORECASE)
+        )
+        return float(score)
+
+    def _legacy_severity(self, text: str) -> str:
+        for severity, keywords in self.SEVERITY_KEYWORDS.items():
+            if any(kw in text for kw in keywords):
+                return severity
+        return "MEDIUM"
+
+    def _legacy_vulnerability_id(self, text: str):
+        cve_match = re.search(r"CVE-\d{4}-\d+", text, re.IGNORECASE)
+        if cve_match:
+            return cve_match.group(0).upper()
+        vuln_match = re.search(r"(GHSA|OSV)-[\w-]+", text, re.IGNORECASE)
+        if vuln_match:
+            return vuln_match.group(0).upper()
+        return None
+
+    def _legacy_tags(self, text: str, issue_type: str) -> List[str]:
+        tags = [issue_type]
+        for keyword, tag in self.TAG_KEYWORDS.items():
+            if keyword in text:
+                tags.append(tag)
+        return list(set(tags))
+
+
+def generate_issues(count: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    issues = []
+    for _ in range(count):
+        title = rng.choice(FRAGMENTS)
+        description = " ".join(rng.sample(FRAGMENTS, rng.randint(1, 4)))
+        description = f"{description} {rng.choice(IDS)}".strip()
+        issues.append(
+            {
+                "title": title,
+                "description": description,
+                "component": rng.choice(COMPONENTS),
+            }
+        )
+    return issues
+
+
+def run(classify, issues):
+    start = time.perf_counter()
+    results = [classify(i["title"], i["description"], i["component"]) for i in issues]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=100000)
+    parser.add_argument("--findings", type=int, default=5000)
+    args = parser.parse_args()
+
+    issues = generate_issues(args.issues)
+    service = SecurityClassifierService()
+    legacy, legacy_time = run(LegacyClassifier().classify_issue, issues)
+    compiled, compiled_time = run(service.classify_issue_uncached, issues)
+    # 扫描器反复上报同一批发现  # Scanners re-reporting the same findings
+    findings = min(args.findings, args.issues)
+    rescans = [issues[i % findings] for i in range(args.issues)]
+    cached, cached_time = run(service.classify_issue, rescans)
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    mismatches += sum(
+        1 for i, result in enumerate(cached) if result != legacy[i % findings]
+    )
+
+    for label, elapsed in (
+        ("legacy", legacy_time),
+        ("compiled", compiled_time),
+        ("rescans", cached_time),
+    ):
+        print(
+            f"{label:<9} {elapsed:6.2f}s   "
+            f"{args.issues / elapsed:>9,.0f} issues/s   "
+            f"{elapsed / args.issues * 1e6:6.1f} us/issue"
+        )
+    print(
+        f"speedup {legacy_time / compiled_time:.1f}x   "
+        f"rescan cache hit rate {classification_cache.stats()['hit_rate']:.0%}   "
+        f"mismatches {mismatches}"
+    )
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
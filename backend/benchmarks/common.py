@@ -0,0 +1,67 @@
+"""
+Shared helpers for the standalone benchmarks.
+
+By default every benchmark runs against a throwaway SQLite file; set
+BENCH_DATABASE_URL to point at a real (empty, disposable) MySQL database.
+"""
+
+import os
+import resource
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.models import Base, Role
+
+
+@asynccontextmanager
+async def benchmark_database():
+    """Yield a session factory bound to a freshly created schema."""
+    url = os.getenv("BENCH_DATABASE_URL")
+    tmp_path = None
+    if not url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db", prefix="bench_")
+        os.close(fd)
+        url = f"sqlite+aiosqlite:///{tmp_path}"
+
+    engine = create_async_engine(url, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as session:
+        session.add_all(
+            [
+                Role(id=1, role_name="customer"),
+                Role(id=2, role_name="provider"),
+                Role(id=3, role_name="admin"),
+            ]
+        )
+        await session.commit()
+    try:
+        yield session_factory
+    finally:
+        await engine.dispose()
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+@contextmanager
+def timed(label: str, count: int = None):
+    """Print the wall time (and rate, when count is given) of a block."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if count:
+        print(f"{label}: {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+    else:
+        print(f"{label}: {elapsed:.3f}s")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,99 @@
+"""
+Benchmark the streaming admin export.
+
+Seeds N orders (one million by default), then streams them through
+export_service.stream_export and reports throughput, output size and the
+peak Python heap seen while exporting. The heap peak should stay flat as
+--rows grows.
+
+    python -m benchmarks.export_benchmark --rows 1000000 --format csv --gzip
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models.models import (
+    LocationEnum,
+    Order,
+    OrderStatus,
+    PaymentStatus,
+    ServiceType,
+    User,
+)
+from app.services.export_service import stream_export
+from benchmarks.common import benchmark_database, peak_rss_mb, timed
+
+SEED_BATCH = 10_000
+
+
+async def seed_orders(session_factory, rows: int):
+    now = datetime(2025, 1, 1)
+    async with session_factory() as db:
+        db.add(
+            User(
+                id=1,
+                username="bench_customer",
+                email="bench_customer@example.com",
+                password_hash="x",
+                role_id=1,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        await db.commit()
+        for start in range(1, rows + 1, SEED_BATCH):
+            batch = [
+                {
+                    "id": i,
+                    "customer_id": 1,
+                    "title": f"Order {i}",
+                    "description": "Seeded benchmark order " * 4,
+                    "service_type": ServiceType.other,
+                    "status": OrderStatus.completed,
+                    "price": 100 + i % 500,
+                    "location": LocationEnum.NORTH,
+                    "address": "1 Benchmark Road",
+                    "payment_status": PaymentStatus.paid,
+                    "created_at": now + timedelta(seconds=i),
+                    "updated_at": now + timedelta(seconds=i),
+                }
+                for i in range(start, min(start + SEED_BATCH, rows + 1))
+            ]
+            await db.execute(insert(Order), batch)
+        await db.commit()
+
+
+async def run(rows: int, fmt: str, gzip: bool):
+    async with benchmark_database() as session_factory:
+        with timed(f"seed {rows:,} orders", rows):
+            await seed_orders(session_factory, rows)
+
+        total_bytes = 0
+        tracemalloc.start()
+        async with session_factory() as db:
+            with timed(f"export {rows:,} orders as {fmt}{' (gzip)' if gzip else ''}", rows):
+                async for chunk in stream_export(db, "orders", fmt=fmt, gzip=gzip):
+                    total_bytes += len(chunk)
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"output size: {total_bytes / 1024 / 1024:,.1f} MiB")
+        print(f"peak Python heap during export: {heap_peak / 1024 / 1024:,.1f} MiB")
+        print(f"peak RSS (whole run): {peak_rss_mb():,.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.format, args.gzip))
+
+
+if __name__ == "__main__":
+    main()
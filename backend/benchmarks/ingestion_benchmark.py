@@ -0,0 +1,143 @@
+"""
+Benchmark scanner report ingestion.
+
+Builds reports from the checked-in snyk-report.json and
+sast_bandit_report.json, with each finding repeated --copies times under
+a distinct package/file name so every copy is a new classification, and
+stores them twice:
+
+- one by one:  what a script calling POST /api/security/issues per finding
+  does (classify, upsert, COMMIT each);
+- pipeline:    scanner_ingestion_service.ingest_report, streaming the
+  report in 64 KiB chunks, classifying INGEST_BATCH_SIZE findings at a
+  time and writing each batch with one executemany upsert.
+
+(The checked-in safety report holds only safety's deprecation banner, so
+it has no findings to benchmark.)
+
+    python -m benchmarks.ingestion_benchmark --copies 50
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+from pathlib import Path
+
+from app.models.models import (
+    SecurityIssueStatus,
+    SecurityIssueType,
+    SecuritySeverity,
+    User,
+)
+from app.services.batch_classification_service import classify_chunk
+from app.services.scanner_ingestion_service import REPORT_FORMATS, ingest_report
+from app.services.security_classifier_service import (
+    SecurityClassifierService,
+    classification_cache,
+)
+from app.services.security_issue_service import upsert_issues
+from app.utils.process_pool import get_process_pool, shutdown_process_pool
+from benchmarks.common import benchmark_database, timed
+
+REPORTS = Path(__file__).resolve().parents[1]
+CHUNK = 64 * 1024
+SOURCES = {
+    "snyk": ("snyk-report.json", "packageName"),
+    "bandit": ("sast_bandit_report.json", "filename"),
+}
+
+
+def build_report(report_format: str, copies: int):
+    """The report as bytes, and its number of findings."""
+    file_name, renamed = SOURCES[report_format]
+    report = json.loads((REPORTS / file_name).read_text())
+    key = REPORT_FORMATS[report_format].key
+    findings = []
+    for i in range(copies):
+        for finding in report[key]:
+            finding = copy.deepcopy(finding)
+            finding[renamed] = f"copy{i}/{finding[renamed]}"
+            findings.append(finding)
+    report[key] = findings
+    return json.dumps(report).encode("utf-8"), len(findings)
+
+
+async def chunks(body: bytes):
+    for start in range(0, len(body), CHUNK):
+        yield body[start : start + CHUNK]
+
+
+async def one_by_one(session_factory, report_format: str, body: bytes) -> int:
+    fmt = REPORT_FORMATS[report_format]
+    classifier = SecurityClassifierService()
+    count = 0
+    async with session_factory() as db:
+        for item in json.loads(body)[fmt.key]:
+            finding = fmt.parse(item)
+            result = classifier.classify_issue(
+                finding["title"], finding["description"], finding["component"]
+            )
+            values = {
+                "title": finding["title"],
+                "description": finding["description"],
+                "affected_component": finding["component"],
+                "issue_type": SecurityIssueType[result["issue_type"]],
+                "severity": SecuritySeverity[result["severity"]],
+                "confidence_score": result["confidence_score"],
+                "vulnerability_id": result["vulnerability_id"],
+                "detection_method": result["detection_method"],
+                "tags": result["tags"],
+                "remediation_suggestion": result["remediation_suggestion"],
+                "remediation_priority": result["remediation_priority"],
+                "estimated_effort": result["estimated_effort"],
+                "reported_by": 1,
+                "status": SecurityIssueStatus.OPEN,
+            }
+            await upsert_issues(db, [values])
+            await db.commit()
+            count += 1
+    return count
+
+
+async def pipeline(session_factory, report_format: str, body: bytes) -> int:
+    async with session_factory() as db:
+        summary = await ingest_report(db, report_format, chunks(body), reported_by=1)
+    return summary["inserted"] + summary["merged"]
+
+
+async def run(copies: int):
+    # 预热进程池，不计入结果  # Start the pool outside the timed section
+    get_process_pool().submit(classify_chunk, []).result()
+    for report_format in SOURCES:
+        body, count = build_report(report_format, copies)
+        print(f"{report_format}: {count:,} findings, {len(body) / 2**20:.1f} MiB")
+        for label, ingest in (("one by one", one_by_one), ("pipeline", pipeline)):
+            classification_cache.clear()
+            async with benchmark_database() as session_factory:
+                async with session_factory() as db:
+                    db.add(
+                        User(
+                            id=1,
+                            username="bench",
+                            email="bench@bench.test",
+                            password_hash="x",
+                            role_id=3,
+                        )
+                    )
+                    await db.commit()
+                with timed(f"  {label}", count):
+                    inserted = await ingest(session_factory, report_format, body)
+                assert inserted == count, (label, inserted, count)
+    shutdown_process_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--copies", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.copies))
+
+
+if __name__ == "__main__":
+    main()
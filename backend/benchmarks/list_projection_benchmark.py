@@ -0,0 +1,104 @@
+"""
+Benchmark full-entity vs column-projected order list queries.
+
+Seeds N orders with a large description and compares, for each list
+loader's column set, the bytes read from the driver, the number of
+attribute values hydrated and the ORM load time.
+
+    python -m benchmarks.list_projection_benchmark --rows 50000 --description-size 2000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import load_only
+
+from app.models.models import LocationEnum, Order, OrderStatus, PaymentStatus, ServiceType
+from app.services.admin_service import ADMIN_ORDER_LIST_COLUMNS
+from app.services.customer_service import ORDER_SUMMARY_COLUMNS
+from app.services.provider_service import ORDER_LIST_COLUMNS
+from benchmarks.common import benchmark_database
+
+SEED_BATCH = 10_000
+
+
+def _value_bytes(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
+
+
+async def seed(session_factory, rows: int, description_size: int):
+    now = datetime(2025, 1, 1)
+    async with session_factory() as db:
+        for start in range(1, rows + 1, SEED_BATCH):
+            await db.execute(
+                insert(Order),
+                [
+                    {
+                        "id": i,
+                        "customer_id": 1,
+                        "provider_id": 2,
+                        "title": f"Order {i}",
+                        "description": "d" * description_size,
+                        "service_type": ServiceType.other,
+                        "status": OrderStatus.pending,
+                        "price": 100,
+                        "location": LocationEnum.NORTH,
+                        "address": "1 Benchmark Road",
+                        "payment_status": PaymentStatus.unpaid,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for i in range(start, min(start + SEED_BATCH, rows + 1))
+                ],
+            )
+        await db.commit()
+
+
+async def measure(session_factory, label: str, columns):
+    column_list = list(columns) if columns else list(Order.__table__.columns)
+    async with session_factory() as db:
+        result = await db.execute(select(*column_list))
+        read_bytes = sum(_value_bytes(v) for row in result for v in row)
+
+    stmt = select(Order)
+    if columns:
+        stmt = stmt.options(load_only(*columns))
+    async with session_factory() as db:
+        start = time.perf_counter()
+        orders = (await db.execute(stmt)).scalars().all()
+        elapsed = time.perf_counter() - start
+        hydrated = sum(len(o.__dict__) - 1 for o in orders)  # minus _sa_instance_state
+
+    print(
+        f"{label:<22} bytes read {read_bytes / 1024 / 1024:>8.1f} MiB   "
+        f"values hydrated {hydrated:>10,}   ORM load {elapsed:.2f}s"
+    )
+
+
+async def run(rows: int, description_size: int):
+    async with benchmark_database() as session_factory:
+        await seed(session_factory, rows, description_size)
+        await measure(session_factory, "full Order entity", None)
+        await measure(session_factory, "provider list/history", ORDER_LIST_COLUMNS)
+        await measure(session_factory, "customer my/history", ORDER_SUMMARY_COLUMNS)
+        await measure(session_factory, "admin list", ADMIN_ORDER_LIST_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--description-size", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.description_size))
+
+
+if __name__ == "__main__":
+    main()
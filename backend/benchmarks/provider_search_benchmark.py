@@ -0,0 +1,158 @@
+"""
+Benchmark provider search by skill: parsing every profile vs provider_skills.
+
+Seeds N providers with 3-6 skills each drawn from a fixed vocabulary
+(rare skills included), builds provider_skills with the maintenance
+rebuild, then times for several filters:
+
+- scan: load every profile's skills text and filter in Python (the old way)
+- first page / deep page: search_providers, the deep page starting from a
+  cursor half way through the id range
+
+    python -m benchmarks.provider_search_benchmark --providers 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app.models.models import LocationEnum, ProviderProfile, User
+from app.services.leaderboard_service import parse_skills
+from app.services.provider_search_service import (
+    rebuild_provider_skills,
+    search_providers,
+)
+from benchmarks.common import benchmark_database
+
+SEED_BATCH = 5_000
+COMMON_SKILLS = [f"skill-{i}" for i in range(40)]
+RARE_SKILLS = ["welding", "glazing", "roofing"]
+PAGE = 20
+REPEAT = 5
+
+
+async def seed(session_factory, providers: int):
+    rng = random.Random(42)
+    locations = list(LocationEnum)
+    now = datetime(2025, 1, 1)
+    async with session_factory() as db:
+        for start in range(1, providers + 1, SEED_BATCH):
+            ids = range(start, min(start + SEED_BATCH, providers + 1))
+            await db.execute(
+                insert(User),
+                [
+                    {
+                        "id": i,
+                        "username": f"provider_{i}",
+                        "email": f"p{i}@bench.test",
+                        "password_hash": "x",
+                        "role_id": 2,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for i in ids
+                ],
+            )
+            profiles = []
+            for i in ids:
+                skills = rng.sample(COMMON_SKILLS, rng.randint(3, 6))
+                if rng.random() < 0.01:
+                    skills.append(rng.choice(RARE_SKILLS))
+                profiles.append(
+                    {
+                        "id": i,
+                        "skills": json.dumps(skills),
+                        "experience_years": rng.randint(0, 30),
+                        "hourly_rate": rng.randint(10, 200),
+                        "location": rng.choice(locations),
+                    }
+                )
+            await db.execute(insert(ProviderProfile), profiles)
+        await db.commit()
+        start = time.perf_counter()
+        rows = await rebuild_provider_skills(db)
+        print(f"rebuild-skills: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+
+
+async def scan(db, skills, match_all, location, min_rate):
+    """Parse every profile and return the first page, as before provider_skills."""
+    result = await db.execute(
+        select(
+            ProviderProfile.id,
+            ProviderProfile.skills,
+            ProviderProfile.location,
+            ProviderProfile.hourly_rate,
+        ).order_by(ProviderProfile.id)
+    )
+    wanted = set(skills)
+    page = []
+    for row in result:
+        have = parse_skills(row.skills)
+        if match_all and not wanted <= have:
+            continue
+        if not match_all and not wanted & have:
+            continue
+        if location is not None and row.location != location:
+            continue
+        if min_rate is not None and (row.hourly_rate or 0) < min_rate:
+            continue
+        page.append(row.id)
+        if len(page) >= PAGE:
+            break
+    return page
+
+
+async def best_of(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(providers: int):
+    cases = [
+        ("common skill", ["skill-3"], False, None, None),
+        ("rare skill", ["welding"], False, None, None),
+        ("all of 2 skills", ["skill-1", "skill-2"], True, None, None),
+        ("skill+location+rate", ["skill-5"], False, LocationEnum.NORTH, 150),
+    ]
+    async with benchmark_database() as session_factory:
+        await seed(session_factory, providers)
+        async with session_factory() as db:
+            for label, skills, match_all, location, min_rate in cases:
+                filters = dict(
+                    skills=skills,
+                    match_all=match_all,
+                    location=location,
+                    min_rate=min_rate,
+                    limit=PAGE,
+                )
+                scanned = await best_of(
+                    lambda: scan(db, skills, match_all, location, min_rate)
+                )
+                first = await best_of(lambda: search_providers(db, **filters))
+                deep = await best_of(
+                    lambda: search_providers(db, after_id=providers // 2, **filters)
+                )
+                print(
+                    f"{label:<22} scan {scanned:>9.1f} ms   "
+                    f"first page {first:>7.1f} ms   deep page {deep:>7.1f} ms"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--providers", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.providers))
+
+
+if __name__ == "__main__":
+    main()
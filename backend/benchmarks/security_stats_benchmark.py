@@ -0,0 +1,153 @@
+"""
+Benchmark /api/security/statistics as the issue table grows.
+
+Seeds 1k, 10k, 100k and 1M security issues (cumulatively) and times, at
+each size:
+
+- legacy:  select every SecurityIssue and count in a Python loop (skipped
+  above --legacy-max, where it needs minutes and gigabytes);
+- grouped: security_issue_service.get_issue_statistics with the cache off,
+  one GROUP BY answered from ix_security_issues_stats;
+- cached:  the same call served from the short-TTL cache.
+
+The GROUP BY still reads every index entry, so its time grows with the
+table, but only a few dozen rows reach Python; the cached response is flat.
+
+    python -m benchmarks.security_stats_benchmark --sizes 1000,10000,100000,1000000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+
+from app.models.models import (
+    SecurityIssue,
+    SecurityIssueStatus,
+    SecurityIssueType,
+    SecuritySeverity,
+    User,
+)
+from app.services.security_issue_service import get_issue_statistics, stats_cache
+from benchmarks.common import benchmark_database, peak_rss_mb
+
+SEED_BATCH = 20_000
+
+
+async def legacy_statistics(db):
+    """The pre-aggregation statistics loop, kept for comparison."""
+    result = await db.execute(select(SecurityIssue))
+    issues = result.scalars().all()
+    total = len(issues)
+    by_type, by_severity, by_status = {}, {}, {}
+    total_confidence = 0.0
+    for issue in issues:
+        by_type[issue.issue_type.value] = by_type.get(issue.issue_type.value, 0) + 1
+        by_severity[issue.severity.value] = by_severity.get(issue.severity.value, 0) + 1
+        by_status[issue.status.value] = by_status.get(issue.status.value, 0) + 1
+        total_confidence += float(issue.confidence_score)
+    return {
+        "total": total,
+        "by_type": by_type,
+        "by_severity": by_severity,
+        "by_status": by_status,
+        "avg_confidence": round(total_confidence / total, 2) if total else 0.0,
+    }
+
+
+async def seed(session_factory, start: int, stop: int, rng: random.Random):
+    now = datetime.utcnow()
+    types, severities = list(SecurityIssueType), list(SecuritySeverity)
+    statuses = list(SecurityIssueStatus)
+    async with session_factory() as db:
+        for batch_start in range(start, stop, SEED_BATCH):
+            rows = [
+                {
+                    "id": i + 1,
+                    "title": f"Issue {i}",
+                    "description": "Seeded for the statistics benchmark",
+                    "issue_type": rng.choice(types),
+                    "severity": rng.choice(severities),
+                    "status": rng.choice(statuses),
+                    "confidence_score": Decimal(rng.randint(0, 10000)) / 100,
+                    "reported_by": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(batch_start, min(stop, batch_start + SEED_BATCH))
+            ]
+            await db.execute(insert(SecurityIssue), rows)
+        await db.commit()
+
+
+async def median_ms(session_factory, fn, repeat: int = 3):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            result = await fn(db)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def uncached(db):
+    stats_cache.clear()
+    return await get_issue_statistics(db)
+
+
+async def run(sizes, legacy_max):
+    rng = random.Random(3)
+    # 即使环境变量关闭了缓存也测一次缓存命中
+    # Measure cache hits even if the environment disabled the cache
+    stats_cache.ttl = max(stats_cache.ttl, 60)
+    async with benchmark_database() as session_factory:
+        async with session_factory() as db:
+            db.add(
+                User(
+                    id=1,
+                    username="bench",
+                    email="bench@bench.test",
+                    password_hash="x",
+                    role_id=3,
+                )
+            )
+            await db.commit()
+
+        seeded = 0
+        print(f"{'issues':>9} {'legacy':>10} {'grouped':>10} {'cached':>10}   peak RSS")
+        for size in sizes:
+            await seed(session_factory, seeded, size, rng)
+            seeded = size
+
+            grouped_ms, grouped = await median_ms(session_factory, uncached)
+            await median_ms(session_factory, get_issue_statistics, repeat=1)
+            cached_ms, _ = await median_ms(session_factory, get_issue_statistics)
+            if size <= legacy_max:
+                legacy_ms, legacy = await median_ms(session_factory, legacy_statistics)
+                assert legacy == grouped, (legacy, grouped)
+                legacy_text = f"{legacy_ms:8.1f}ms"
+            else:
+                legacy_text = f"{'skipped':>10}"
+            print(
+                f"{size:>9,} {legacy_text} {grouped_ms:8.1f}ms {cached_ms:8.3f}ms"
+                f"   {peak_rss_mb():.0f} MiB"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--legacy-max", type=int, default=100_000)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    asyncio.run(run(sizes, args.legacy_max))
+
+
+if __name__ == "__main__":
+    main()
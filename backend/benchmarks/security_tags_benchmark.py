@@ -0,0 +1,182 @@
+"""
+Benchmark security issue tags: JSON column vs security_issue_tags.
+
+Seeds N issues whose tags (a random subset of the classifier's tags, "xss"
+on about 2% of them) are stored both ways, then times:
+
+- page:   100 newest issues with their tags; json.loads per row vs one
+          load_issue_tags query;
+- filter: 100 newest issues tagged "xss"; scanning the JSON text with
+          LIKE vs ids from the (tag, issue_id) index;
+- facet:  issues per tag; reading and parsing every tags column vs one
+          GROUP BY (get_tag_counts).
+
+Both ways must return the same issues and counts; the run fails otherwise.
+
+    python -m benchmarks.security_tags_benchmark --sizes 10000,100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+
+from app.models.models import (
+    SecurityIssue,
+    SecurityIssueStatus,
+    SecurityIssueTag,
+    SecurityIssueType,
+    SecuritySeverity,
+    User,
+)
+from app.services.security_issue_service import (
+    get_tag_counts,
+    load_issue_tags,
+    normalize_tags,
+)
+from benchmarks.common import benchmark_database
+
+SEED_BATCH = 10_000
+PAGE = 100
+RARE_TAG = "xss"
+COMMON_TAGS = ["injection", "auth", "authz", "crypto", "dependencies", "config"]
+
+
+def random_tags(rng: random.Random, issue_type: SecurityIssueType) -> list:
+    tags = [issue_type.value] + rng.sample(COMMON_TAGS, rng.randint(0, 3))
+    if rng.random() < 0.02:
+        tags.append(RARE_TAG)
+    return tags
+
+
+async def seed(session_factory, start: int, stop: int, rng: random.Random):
+    epoch = datetime(2025, 1, 1)
+    types = list(SecurityIssueType)
+    async with session_factory() as db:
+        for batch_start in range(start, stop, SEED_BATCH):
+            issues, tag_rows = [], []
+            for i in range(batch_start, min(stop, batch_start + SEED_BATCH)):
+                issue_type = rng.choice(types)
+                tags = json.dumps(random_tags(rng, issue_type))
+                created = epoch + timedelta(seconds=i)
+                issues.append(
+                    {
+                        "id": i + 1,
+                        "title": f"Issue {i}",
+                        "description": "Seeded for the tags benchmark",
+                        "issue_type": issue_type,
+                        "severity": SecuritySeverity.MEDIUM,
+                        "status": SecurityIssueStatus.OPEN,
+                        "confidence_score": Decimal("50.00"),
+                        "tags": tags,
+                        "reported_by": 1,
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+                tag_rows.extend(
+                    {"issue_id": i + 1, "tag": tag} for tag in normalize_tags(tags)
+                )
+            await db.execute(insert(SecurityIssue), issues)
+            await db.execute(insert(SecurityIssueTag), tag_rows)
+        await db.commit()
+
+
+def newest(query):
+    return query.order_by(SecurityIssue.created_at.desc()).limit(PAGE)
+
+
+async def page_json(db):
+    issues = (await db.execute(newest(select(SecurityIssue)))).scalars().all()
+    return {issue.id: sorted(json.loads(issue.tags)) for issue in issues}
+
+
+async def page_table(db):
+    query = newest(select(SecurityIssue))
+    issues = (await db.execute(query)).scalars().all()
+    return await load_issue_tags(db, [issue.id for issue in issues])
+
+
+async def newest_ids(db, condition):
+    query = newest(select(SecurityIssue.id).where(condition))
+    return list((await db.execute(query)).scalars())
+
+
+async def filter_like(db):
+    return await newest_ids(db, SecurityIssue.tags.like(f'%"{RARE_TAG}"%'))
+
+
+async def filter_index(db):
+    tagged = select(SecurityIssueTag.issue_id).where(SecurityIssueTag.tag == RARE_TAG)
+    return await newest_ids(db, SecurityIssue.id.in_(tagged))
+
+
+async def facet_json(db):
+    counts = Counter()
+    for tags in (await db.execute(select(SecurityIssue.tags))).scalars():
+        counts.update(json.loads(tags))
+    return dict(counts)
+
+
+async def facet_table(db):
+    return {item["tag"]: item["count"] for item in await get_tag_counts(db)}
+
+
+async def median_ms(session_factory, fn, repeat: int = 3):
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            result = await fn(db)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def run(sizes):
+    rng = random.Random(5)
+    async with benchmark_database() as session_factory:
+        async with session_factory() as db:
+            db.add(
+                User(
+                    id=1,
+                    username="bench",
+                    email="bench@bench.test",
+                    password_hash="x",
+                    role_id=3,
+                )
+            )
+            await db.commit()
+
+        seeded = 0
+        print(f"{'issues':>9} {'':<7} {'JSON column':>12} {'tag table':>12}")
+        for size in sizes:
+            await seed(session_factory, seeded, size, rng)
+            seeded = size
+            for label, legacy, indexed in (
+                ("page", page_json, page_table),
+                ("filter", filter_like, filter_index),
+                ("facet", facet_json, facet_table),
+            ):
+                legacy_ms, expected = await median_ms(session_factory, legacy)
+                indexed_ms, result = await median_ms(session_factory, indexed)
+                assert result == expected, label
+                print(f"{size:>9,} {label:<7} {legacy_ms:10.1f}ms {indexed_ms:10.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    asyncio.run(run(sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark signup throughput.
+
+Registers N customers through auth_service.register_user with C signups
+in flight at once (each on its own session), and compares against the
+previous flow: bcrypt on the event loop, commit the user, refresh it,
+SELECT the role, then commit and refresh the profile.
+
+bcrypt dominates a signup. On the event loop it blocks every other request
+in the worker for the whole hash ("max loop stall"); in a thread the loop
+keeps serving, and on multi-core hosts hashes run in parallel (bcrypt
+releases the GIL). Failed signups and users left without a profile are
+counted too.
+
+    python -m benchmarks.signup_benchmark --signups 64 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select
+
+from app.models.models import CustomerProfile, LocationEnum, Role, User
+from app.services.auth_service import register_user
+from app.utils.security import get_password_hash
+from benchmarks.common import benchmark_database
+
+_serial = itertools.count()
+
+
+async def legacy_register(db, username, email, password, role_id):
+    """The pre-single-transaction registration flow, kept for comparison."""
+    user = User(
+        username=username,
+        email=email,
+        password_hash=get_password_hash(password),
+        role_id=role_id,
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    result = await db.execute(select(Role).where(Role.id == role_id))
+    result.scalar_one_or_none()
+    profile = CustomerProfile(
+        id=user.id, location=LocationEnum.NORTH, budget_preference=0, balance=0
+    )
+    db.add(profile)
+    await db.commit()
+    await db.refresh(profile)
+    return user
+
+
+async def run_signups(session_factory, label, register, signups, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+    failures = []
+
+    async def one():
+        n = next(_serial)
+        async with limit, session_factory() as db:
+            try:
+                await register(
+                    db, f"user_{n}", f"user_{n}@bench.test", "Secret123!", 1
+                )
+            except Exception as e:  # lock timeouts etc. under concurrency
+                failures.append(type(e).__name__)
+                await db.rollback()
+
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        # 事件循环卡顿：10ms 定时器的最大延迟  # Worst lateness of a 10 ms timer
+        while not done.is_set():
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stalls.append(time.perf_counter() - tick - 0.01)
+
+    watcher = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(signups)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await watcher
+
+    async with session_factory() as db:
+        orphans = await db.execute(
+            select(func.count())
+            .select_from(User)
+            .outerjoin(CustomerProfile, CustomerProfile.id == User.id)
+            .where(CustomerProfile.id.is_(None))
+        )
+    print(
+        f"{label:<14} concurrency {concurrency:>3}   "
+        f"{signups / elapsed:>6.1f} signups/s   "
+        f"max loop stall {max(stalls) * 1000:>6.1f} ms   "
+        f"failed {len(failures):>3}   users without profile {orphans.scalar():>3}"
+    )
+
+
+async def run(signups: int, concurrency: int):
+    for c in sorted({1, concurrency}):
+        async with benchmark_database() as session_factory:
+            await run_signups(session_factory, "legacy", legacy_register, signups, c)
+        async with benchmark_database() as session_factory:
+            await run_signups(session_factory, "single commit", register_user, signups, c)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signups", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(run(args.signups, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark insert throughput of random vs time-ordered transaction ids.
+
+Inserts N rows into two otherwise identical tables with a unique
+transaction id: one keyed by uuid4() strings in VARCHAR(255) (the old
+scheme), one keyed by UUIDv7 in BINARY(16) (the current Payment column).
+Random keys land all over the unique index, so throughput drops as the
+index outgrows the cache; time-ordered keys always append at its edge.
+Each row set is inserted in batches and the rate of the first and last
+tenth of the run is printed along with the overall rate.
+
+    python -m benchmarks.transaction_id_benchmark --rows 500000
+    BENCH_DATABASE_URL=mysql+aiomysql://... python -m benchmarks.transaction_id_benchmark
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import BigInteger, Column, Integer, MetaData, String, Table, insert
+
+from app.models.models import UUIDBinary
+from app.utils.ids import uuid7
+from benchmarks.common import benchmark_database
+
+BATCH = 1_000
+
+metadata = MetaData()
+random_ids = Table(
+    "bench_tx_uuid4",
+    metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True),
+    Column("transaction_id", String(255), unique=True),
+    Column("amount", Integer),
+)
+ordered_ids = Table(
+    "bench_tx_uuid7",
+    metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True),
+    Column("transaction_id", UUIDBinary, unique=True),
+    Column("amount", Integer),
+)
+
+
+async def insert_rows(session_factory, table, make_id, rows: int):
+    batch_times = []
+    async with session_factory() as db:
+        for start in range(0, rows, BATCH):
+            count = min(BATCH, rows - start)
+            values = [{"transaction_id": make_id(), "amount": 1} for _ in range(count)]
+            begin = time.perf_counter()
+            await db.execute(insert(table), values)
+            await db.commit()
+            batch_times.append((count, time.perf_counter() - begin))
+
+    tenth = max(1, len(batch_times) // 10)
+
+    def rate(part):
+        return sum(c for c, _ in part) / sum(t for _, t in part)
+
+    print(
+        f"{table.name:<16} overall {rate(batch_times):>10,.0f} rows/s   "
+        f"first 10% {rate(batch_times[:tenth]):>10,.0f} rows/s   "
+        f"last 10% {rate(batch_times[-tenth:]):>10,.0f} rows/s"
+    )
+
+
+async def run(rows: int):
+    async with benchmark_database() as session_factory:
+        async with session_factory() as db:
+            await db.run_sync(lambda s: metadata.create_all(s.connection()))
+            await db.commit()
+        try:
+            await insert_rows(session_factory, random_ids, lambda: str(uuid.uuid4()), rows)
+            await insert_rows(session_factory, ordered_ids, uuid7, rows)
+        finally:
+            async with session_factory() as db:
+                await db.run_sync(lambda s: metadata.drop_all(s.connection()))
+                await db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,12 @@ from datetime import UTC, datetime
 
 import bcrypt
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 from app.models.models import Base, Role, User
+from app.services.reference_service import get_role_id, role_cache
 
 DATABASE_URL = settings.DATABASE_URL
 
@@ -23,28 +25,21 @@ async def init_db():
 
     async with AsyncSessionLocal() as session:
         try:
-            # Create roles
+            # Create missing roles (one query for all of them)
+            await role_cache.load(session)
+            existing_roles = set(role_cache.snapshot().values())
             for role_name in ["customer", "provider", "admin"]:
-                from sqlalchemy.future import select
-
-                result = await session.execute(
-                    select(Role).where(Role.role_name == role_name)
-                )
-                existing_role = result.scalar_one_or_none()
-
-                if not existing_role:
-                    new_role = Role(role_name=role_name)
-                    session.add(new_role)
+                if role_name not in existing_roles:
+                    session.add(Role(role_name=role_name))
 
             await session.commit()
+            # Reload the reference data so the new ids are known
+            await role_cache.load(session)
 
             # Create preset admin account
-            result = await session.execute(
-                select(Role).where(Role.role_name == "admin")
-            )
-            admin_role = result.scalar_one_or_none()
+            admin_role_id = await get_role_id(session, "admin")
 
-            if admin_role:
+            if admin_role_id:
                 # Check if admin account already exists
                 result = await session.execute(
                     select(User).where(User.email == "admin@freelancer-platform.com")
@@ -62,7 +57,7 @@ async def init_db():
                         username="system_admin",
                         email="admin@freelancer-platform.com",
                         password_hash=hashed_password,
-                        role_id=admin_role.id,
+                        role_id=admin_role_id,
                         created_at=datetime.now(UTC),
                         updated_at=datetime.now(UTC),
                     )
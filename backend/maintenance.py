@@ -0,0 +1,114 @@
+# backend/maintenance.py
+"""
+Maintenance commands for materialized/aggregate tables.
+
+    python maintenance.py rebuild-earnings
+    python maintenance.py rebuild-rollups
+    python maintenance.py rebuild-ratings
+    python maintenance.py rebuild-skills
+    python maintenance.py rebuild-security-tags
+    python maintenance.py prune-cache-signals
+    python maintenance.py purge-revoked-tokens
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.services.cache_service import prune_invalidations
+from app.services.earnings_service import (
+    rebuild_daily_rollups,
+    rebuild_provider_earnings,
+)
+from app.services.provider_search_service import rebuild_provider_skills
+from app.services.review_service import rebuild_provider_ratings
+from app.services.security_issue_service import rebuild_security_issue_tags
+from app.services.token_service import (
+    purge_expired_refresh_tokens,
+    purge_expired_revocations,
+)
+
+engine = create_async_engine(settings.DATABASE_URL, echo=False)
+AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def rebuild_earnings():
+    """Rebuild provider_earnings_summary from the payments table"""
+    async with AsyncSessionLocal() as session:
+        count = await rebuild_provider_earnings(session)
+    print(f"✅ Rebuilt earnings summary for {count} providers")
+
+
+async def rebuild_rollups():
+    """Rebuild the daily earnings/spending rollups from the payments table"""
+    async with AsyncSessionLocal() as session:
+        count = await rebuild_daily_rollups(session)
+    print(f"✅ Rebuilt {count} daily rollup rows")
+
+
+async def rebuild_ratings():
+    """Rebuild provider_rating_summary from the reviews table"""
+    async with AsyncSessionLocal() as session:
+        count = await rebuild_provider_ratings(session)
+    print(f"✅ Rebuilt rating summary for {count} providers")
+
+
+async def rebuild_skills():
+    """Rebuild provider_skills from provider_profiles.skills"""
+    async with AsyncSessionLocal() as session:
+        count = await rebuild_provider_skills(session)
+    print(f"✅ Rebuilt {count} provider skill rows")
+
+
+async def rebuild_security_tags():
+    """Rebuild security_issue_tags from security_issues.tags"""
+    async with AsyncSessionLocal() as session:
+        count = await rebuild_security_issue_tags(session)
+    print(f"✅ Rebuilt {count} security issue tag rows")
+
+
+async def prune_cache_signals():
+    """Delete old cross-worker cache invalidation rows"""
+    async with AsyncSessionLocal() as session:
+        count = await prune_invalidations(session)
+    print(f"✅ Pruned {count} cache invalidation rows")
+
+
+async def purge_revoked_tokens():
+    """Delete expired token revocations and refresh tokens"""
+    async with AsyncSessionLocal() as session:
+        count = await purge_expired_revocations(session)
+        refresh_count = await purge_expired_refresh_tokens(session)
+    print(f"✅ Purged {count} expired token revocations")
+    print(f"✅ Purged {refresh_count} expired refresh tokens")
+
+
+COMMANDS = {
+    "rebuild-earnings": rebuild_earnings,
+    "rebuild-rollups": rebuild_rollups,
+    "rebuild-ratings": rebuild_ratings,
+    "rebuild-skills": rebuild_skills,
+    "rebuild-security-tags": rebuild_security_tags,
+    "prune-cache-signals": prune_cache_signals,
+    "purge-revoked-tokens": purge_revoked_tokens,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Freelancer marketplace maintenance")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await COMMANDS[args.command]()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 // Admin API service
+import apiService from './api'
+
 const API_BASE_URL = 'http://localhost:8000'
 
 class AdminService {
@@ -30,6 +32,15 @@ class AdminService {
     return !!token
   }
 
+  // Fetch with the current token; on 401 refresh it once and retry
+  async fetchWithAuth(url, options = {}) {
+    const response = await fetch(url, { ...options, headers: this.getAuthHeaders() })
+    if (response.status === 401 && await apiService.refreshAccessToken()) {
+      return fetch(url, { ...options, headers: this.getAuthHeaders() })
+    }
+    return response
+  }
+
   // Handle API response
   async handleResponse(response) {
     if (!response.ok) {
@@ -38,8 +49,7 @@ class AdminService {
       // Handle authentication error
       if (response.status === 401) {
         // Clear invalid token
-        localStorage.removeItem('access_token')
-        sessionStorage.removeItem('access_token')
+        apiService.clearAuthToken()
         sessionStorage.removeItem('currentUser')
         
         // Redirect to login page
@@ -78,10 +88,7 @@ class AdminService {
     const url = `${API_BASE_URL}/admin/orders?${queryParams.toString()}`
     
     try {
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: this.getAuthHeaders()
-      })
+      const response = await this.fetchWithAuth(url, { method: 'GET' })
       return await this.handleResponse(response)
     } catch (error) {
       console.error('Failed to get order list:', error)
@@ -112,10 +119,7 @@ class AdminService {
     const url = `${API_BASE_URL}/admin/users?${queryParams.toString()}`
     
     try {
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: this.getAuthHeaders()
-      })
+      const response = await this.fetchWithAuth(url, { method: 'GET' })
       return await this.handleResponse(response)
     } catch (error) {
       console.error('Failed to get user list:', error)
@@ -131,10 +135,7 @@ class AdminService {
     const url = `${API_BASE_URL}/admin/users/${userId}`
     
     try {
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: this.getAuthHeaders()
-      })
+      const response = await this.fetchWithAuth(url, { method: 'GET' })
       return await this.handleResponse(response)
     } catch (error) {
       console.error('Failed to get user details:', error)
@@ -150,10 +151,7 @@ class AdminService {
     const url = `${API_BASE_URL}/admin/users/${userId}`
     
     try {
-      const response = await fetch(url, {
-        method: 'DELETE',
-        headers: this.getAuthHeaders()
-      })
+      const response = await this.fetchWithAuth(url, { method: 'DELETE' })
       return await this.handleResponse(response)
     } catch (error) {
       console.error('Failed to delete user:', error)
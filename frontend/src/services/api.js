@@ -16,14 +16,59 @@ class ApiService {
     localStorage.setItem('access_token', token)
   }
 
+  // Get refresh token
+  getRefreshToken() {
+    return localStorage.getItem('refresh_token')
+  }
+
+  // Set refresh token
+  setRefreshToken(token) {
+    localStorage.setItem('refresh_token', token)
+  }
+
   // Clear authentication token
   clearAuthToken() {
     localStorage.removeItem('access_token')
     sessionStorage.removeItem('access_token')
+    localStorage.removeItem('refresh_token')
+  }
+
+  // Exchange the refresh token for a new token pair (access tokens live 15 minutes).
+  // Concurrent callers share one request, since each refresh token works only once.
+  async refreshAccessToken() {
+    if (!this.refreshing) {
+      this.refreshing = this.doRefresh().finally(() => {
+        this.refreshing = null
+      })
+    }
+    return this.refreshing
   }
 
-  // Common request method
-  async request(endpoint, options = {}) {
+  async doRefresh() {
+    const refreshToken = this.getRefreshToken()
+    if (!refreshToken) return false
+    try {
+      const response = await fetch(`${this.baseURL}/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      })
+      if (!response.ok) {
+        this.clearAuthToken()
+        return false
+      }
+      const tokens = await response.json()
+      this.setAuthToken(tokens.access_token)
+      this.setRefreshToken(tokens.refresh_token)
+      return true
+    } catch (error) {
+      console.error('Token refresh failed:', error)
+      return false
+    }
+  }
+
+  // Common request method; an expired access token is refreshed once and the request retried
+  async request(endpoint, options = {}, retried = false) {
     const url = `${this.baseURL}${endpoint}`
     const token = this.getAuthToken()
     
@@ -45,6 +90,15 @@ class ApiService {
 
     try {
       const response = await fetch(url, config)
+
+      if (
+        response.status === 401 &&
+        !retried &&
+        !endpoint.startsWith('/auth/') &&
+        await this.refreshAccessToken()
+      ) {
+        return this.request(endpoint, options, true)
+      }
       
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({ detail: 'Request failed' }))
@@ -78,6 +132,9 @@ class ApiService {
     if (response.access_token) {
       this.setAuthToken(response.access_token)
     }
+    if (response.refresh_token) {
+      this.setRefreshToken(response.refresh_token)
+    }
     
     return response
   }
@@ -86,7 +143,8 @@ class ApiService {
   async logout() {
     try {
       await this.request('/auth/logout', {
-        method: 'POST'
+        method: 'POST',
+        body: JSON.stringify({ refresh_token: this.getRefreshToken() })
       })
     } finally {
       this.clearAuthToken()